@@ -0,0 +1,67 @@
+import os
+import tracemalloc
+
+import pytest
+
+os.environ.setdefault('JWT_KEY', 'benchmark-key')
+os.environ.setdefault('JWT_ALGORITHM', 'HS256')
+
+from benchmarks.fakes import (  # noqa: E402
+    InMemoryCityCRUD,
+    InMemoryUserCRUD,
+    make_users,
+)
+from tests.fixtures.cache import MemoryCache  # noqa: E402
+from users_app.cache.codecs import CacheSerializer  # noqa: E402
+from users_app.security.hasher import hasher  # noqa: E402
+from users_app.services.users import UserService  # noqa: E402
+
+USERS = 1000
+CITIES = 50
+# Calls of benchmarked function whose memory is traced after timing.
+TRACED_CALLS = 100
+
+
+def trace_allocations(func, *args) -> dict:
+    '''Returns peak memory allocated by a call and memory retained by calls on average.'''
+    func(*args)
+    tracemalloc.start()
+    try:
+        tracemalloc.reset_peak()
+        started_with, _ = tracemalloc.get_traced_memory()
+        func(*args)
+        current, peak = tracemalloc.get_traced_memory()
+        call_peak = peak - started_with
+        for _ in range(TRACED_CALLS - 1):
+            func(*args)
+        retained, _ = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return {
+        'peak_bytes_per_call': call_peak,
+        'retained_bytes_per_call': (retained - started_with) // TRACED_CALLS,
+    }
+
+
+@pytest.fixture
+def measure(benchmark):
+    '''Benchmarks function and adds its allocations to `extra_info` of the benchmark.'''
+    def measure(func, *args):
+        result = benchmark(func, *args)
+        benchmark.extra_info.update(trace_allocations(func, *args))
+        return result
+    return measure
+
+
+@pytest.fixture
+def user_service_factory():
+    '''Returns factory of `UserService` with in-memory collaborators.'''
+    def factory(fast_serialization: bool = False) -> UserService:
+        return UserService(
+            MemoryCache(serializer=CacheSerializer()),
+            InMemoryUserCRUD(make_users(USERS, CITIES)),
+            InMemoryCityCRUD(CITIES),
+            hasher,
+            fast_serialization,
+        )
+    return factory
@@ -0,0 +1,102 @@
+'''In-memory collaborators of services, so their own overhead is measured without database or Redis.
+
+None of their coroutines suspends, so service calls complete on the first step (see `run_sync`).
+Cache is `MemoryCache` of test fixtures with the serializer of `RedisCache`.
+'''
+from datetime import date
+
+from users_app.database.models import City, User
+from users_app.validation.schemas import (
+    PrivateUpdateUserModel,
+    QueryParams,
+    UpdateUserModel,
+)
+
+
+def run_sync(coroutine):
+    '''Runs coroutine which does not suspend to completion without event loop.'''
+    try:
+        coroutine.send(None)
+    except StopIteration as stop:
+        return stop.value
+    coroutine.close()
+    raise RuntimeError('Coroutine has suspended, benchmarked code must only await in-memory fakes')
+
+
+def make_users(quantity: int, cities: int) -> list[User]:
+    '''Returns transient users with every field filled.'''
+    return [
+        User(
+            id=number,
+            first_name=f'First{number}',
+            last_name=f'Last{number}',
+            other_name=f'Other{number}',
+            email=f'user{number}@example.com',
+            phone=f'+7900{number:07}',
+            birthday=date(1990, 1, 1),
+            city=number % cities + 1,
+            additional_info='Benchmark user',
+            is_admin=False,
+            _hashed_password='hash',
+        )
+        for number in range(1, quantity + 1)
+    ]
+
+
+def make_page(size: int) -> list[User]:
+    '''Returns page of users with realistic field values.'''
+    return [
+        User(
+            id=number,
+            first_name=f'First{number}',
+            last_name=f'Last{number}',
+            _hashed_password='$2b$12$' + 'x' * 53,
+            email=f'user{number}@example.com',
+            is_admin=number % 50 == 0,
+            other_name=f'Other{number}' if number % 2 else None,
+            phone=f'+7900{number:07d}' if number % 3 else None,
+            birthday=date(1980 + number % 30, number % 12 + 1, number % 28 + 1),
+            city=number % 100 + 1,
+            additional_info='Lorem ipsum dolor sit amet.' if number % 4 else None,
+        )
+        for number in range(size)
+    ]
+
+
+class InMemoryUserCRUD:
+    '''`UserCRUD` subset used by read and update paths of `UserService`.'''
+
+    def __init__(self, users: list[User]) -> None:
+        self.users = {user.id: user for user in users}
+
+    async def read_all(self, query: QueryParams, after: tuple | None = None) -> list[User]:
+        '''Pages of users in default `id` order, filters and sorts are not supported.'''
+        users = sorted(self.users.values(), key=lambda user: user.id)
+        if after is not None:
+            return [user for user in users if user.id > after[0]][:query.size]
+        offset = (query.page - 1) * query.size
+        return users[offset:offset + query.size]
+
+    async def read(self, user_id: int) -> User:
+        return self.users[user_id]
+
+    async def read_many(self, user_ids: list[int]) -> list[User]:
+        return [self.users[user_id] for user_id in user_ids if user_id in self.users]
+
+    async def update(self, user: User, data: UpdateUserModel | PrivateUpdateUserModel) -> User:
+        for field, value in data.dict(exclude_unset=True).items():
+            setattr(user, field, value)
+        return user
+
+    async def count_all(self) -> int:
+        return len(self.users)
+
+
+class InMemoryCityCRUD:
+    '''`CityCRUD` subset used by read paths of `UserService`.'''
+
+    def __init__(self, cities: int) -> None:
+        self.cities = {number: City(id=number, name=f'City {number}') for number in range(1, cities + 1)}
+
+    async def read_many(self, city_ids: list[int]) -> list[City]:
+        return [self.cities[city_id] for city_id in city_ids if city_id in self.cities]
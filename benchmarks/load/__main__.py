@@ -0,0 +1,88 @@
+'''Load tests of a running API with scripted scenarios.
+
+Start Postgres and Redis (`docker compose -f docker-compose.test.yaml up -d test_app_db test_app_redis`),
+apply migrations, seed users with `python -m benchmarks.load.seed 10000` and run the API with
+`LOGIN_THROTTLE_ENABLED=false uvicorn users_app.main:app`. Then:
+
+Usage: python -m benchmarks.load [scenario ...] [--base-url URL] [--users N] [--concurrency N]
+       [--duration SECONDS] [--output DIR] [--compare REPORT]
+
+Scenarios: login_storm, hot_current, deep_pages, admin_writes (all by default).
+Report with p50/p95/p99 latency and RPS per request is saved as JSON to `--output`,
+with `--compare` it is printed side by side with a previous report.
+'''
+import argparse
+import asyncio
+import json
+import subprocess
+import time
+from pathlib import Path
+
+from benchmarks.load.runner import run
+from benchmarks.load.scenarios import SCENARIOS
+
+
+def git_revision() -> str | None:
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True,
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_report(report: dict, previous: dict | None) -> None:
+    print(f'{"scenario / request":<34}{"rps":>9}{"p50, ms":>10}{"p95, ms":>10}{"p99, ms":>10}{"errors":>8}')
+    for scenario, requests in report['scenarios'].items():
+        for name, result in requests.items():
+            print(
+                f'{f"{scenario} / {name}":<34}{result["rps"]:9.1f}{result["p50_ms"]:10.2f}'
+                f'{result["p95_ms"]:10.2f}{result["p99_ms"]:10.2f}{result["errors"]:8}'
+            )
+            old = (previous or {}).get('scenarios', {}).get(scenario, {}).get(name)
+            if old:
+                print(
+                    f'{"  previous":<34}{old["rps"]:9.1f}{old["p50_ms"]:10.2f}'
+                    f'{old["p95_ms"]:10.2f}{old["p99_ms"]:10.2f}{old["errors"]:8}'
+                )
+
+
+async def main(args: argparse.Namespace) -> None:
+    report = {
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'revision': git_revision(),
+        'settings': {
+            'base_url': args.base_url,
+            'users': args.users,
+            'concurrency': args.concurrency,
+            'duration': args.duration,
+        },
+        'scenarios': {},
+    }
+    for name in args.scenarios or SCENARIOS:
+        report['scenarios'][name] = await run(
+            SCENARIOS[name](args.users), args.base_url, args.concurrency, args.duration,
+        )
+    output = Path(args.output)
+    output.mkdir(parents=True, exist_ok=True)
+    path = output / f'load-{time.strftime("%Y%m%d-%H%M%S")}.json'
+    path.write_text(json.dumps(report, indent=2))
+    previous = json.loads(Path(args.compare).read_text()) if args.compare else None
+    print_report(report, previous)
+    print(f'report: {path}')
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(prog='python -m benchmarks.load')
+    parser.add_argument('scenarios', nargs='*', help=f'any of: {", ".join(SCENARIOS)}')
+    parser.add_argument('--base-url', default='http://localhost:8000')
+    parser.add_argument('--users', type=int, default=10_000, help='quantity of seeded users')
+    parser.add_argument('--concurrency', type=int, default=50)
+    parser.add_argument('--duration', type=float, default=30.0, help='seconds per scenario')
+    parser.add_argument('--output', default='benchmarks/results')
+    parser.add_argument('--compare', help='previous report to compare with')
+    arguments = parser.parse_args()
+    unknown = set(arguments.scenarios) - set(SCENARIOS)
+    if unknown:
+        parser.error(f'unknown scenarios: {", ".join(sorted(unknown))}')
+    asyncio.run(main(arguments))
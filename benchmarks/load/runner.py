@@ -0,0 +1,80 @@
+import asyncio
+import time
+from collections import Counter, defaultdict
+
+import httpx
+
+PERCENTILES = (50, 95, 99)
+
+
+class Recorder:
+    '''Latencies and statuses of requests grouped by their names.'''
+
+    def __init__(self) -> None:
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.statuses: dict[str, Counter] = defaultdict(Counter)
+
+    async def request(self, client: httpx.AsyncClient, name: str, method: str, url: str,
+                      **kwargs) -> httpx.Response:
+        '''Sends request and records its latency, transport errors are recorded with `error` status.'''
+        started_at = time.perf_counter()
+        try:
+            response = await client.request(method, url, **kwargs)
+        except httpx.HTTPError:
+            self.statuses[name]['error'] += 1
+            raise
+        self.latencies[name].append(time.perf_counter() - started_at)
+        self.statuses[name][str(response.status_code)] += 1
+        return response
+
+
+def percentile(values: list[float], rank: float) -> float:
+    '''Returns nearest-rank percentile of sorted values.'''
+    if not values:
+        return 0.0
+    return values[min(len(values) - 1, max(0, round(rank / 100 * len(values)) - 1))]
+
+
+def summarize(recorder: Recorder, elapsed: float) -> dict:
+    '''Returns throughput, latency percentiles in milliseconds and statuses per request name.'''
+    summary = {}
+    for name, statuses in recorder.statuses.items():
+        latencies = sorted(recorder.latencies[name])
+        errors = sum(count for status, count in statuses.items() if status == 'error' or int(status) >= 400)
+        summary[name] = {
+            'requests': sum(statuses.values()),
+            'rps': round(len(latencies) / elapsed, 1),
+            **{f'p{rank}_ms': round(percentile(latencies, rank) * 1000, 2) for rank in PERCENTILES},
+            'mean_ms': round(sum(latencies) / len(latencies) * 1000, 2) if latencies else 0.0,
+            'max_ms': round(latencies[-1] * 1000, 2) if latencies else 0.0,
+            'errors': errors,
+            'statuses': dict(statuses),
+        }
+    return summary
+
+
+async def run(scenario, base_url: str, concurrency: int, duration: float) -> dict:
+    '''Runs scenario by `concurrency` virtual users for `duration` seconds, returns its summary.
+
+    Every virtual user has a client with its own cookies, its setup is not measured.
+    '''
+    recorder = Recorder()
+    clients = [httpx.AsyncClient(base_url=base_url, timeout=30) for _ in range(concurrency)]
+    try:
+        states = await asyncio.gather(*(
+            scenario.setup(client, number) for number, client in enumerate(clients)
+        ))
+        started_at = time.perf_counter()
+        deadline = started_at + duration
+
+        async def user(client: httpx.AsyncClient, state: dict) -> None:
+            while time.perf_counter() < deadline:
+                try:
+                    await scenario.step(client, state, recorder)
+                except httpx.HTTPError:
+                    await asyncio.sleep(0.1)
+
+        await asyncio.gather(*(user(client, state) for client, state in zip(clients, states)))
+        return summarize(recorder, time.perf_counter() - started_at)
+    finally:
+        await asyncio.gather(*(client.aclose() for client in clients))
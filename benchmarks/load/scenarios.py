@@ -0,0 +1,109 @@
+import random
+
+import httpx
+
+from benchmarks.load.runner import Recorder
+from benchmarks.load.seed import ADMINS, PASSWORD, email
+from users_app.api.v1.routers.constants import (
+    LOGIN,
+    PRIVATE_USER_UPDATE_FULL,
+    PRIVATE_USERS_LIST_FULL,
+    USER_DETAIL_FULL,
+    USERS_LIST_FULL,
+)
+
+PAGE_SIZE = 20
+# Lists fetched after every write of admin write bursts.
+READS_PER_WRITE = 5
+
+
+class Scenario:
+    '''Requests one virtual user makes repeatedly, `users` is quantity of seeded users.'''
+
+    name = ''
+
+    def __init__(self, users: int) -> None:
+        self.users = users
+
+    async def setup(self, client: httpx.AsyncClient, number: int) -> dict:
+        '''Prepares virtual user, returns its state.'''
+        return {}
+
+    async def step(self, client: httpx.AsyncClient, state: dict, recorder: Recorder) -> None:
+        '''Makes measured requests.'''
+        raise NotImplementedError
+
+    async def login(self, client: httpx.AsyncClient, number: int) -> None:
+        response = await client.post(LOGIN, json={'login': email(number), 'password': PASSWORD})
+        response.raise_for_status()
+
+
+class LoginStorm(Scenario):
+    '''Logins of random users, bound by password hashing.'''
+
+    name = 'login_storm'
+
+    async def step(self, client, state, recorder):
+        number = random.randrange(self.users)
+        await recorder.request(client, 'login', 'POST', LOGIN, json={'login': email(number), 'password': PASSWORD})
+
+
+class HotCurrent(Scenario):
+    '''Repeated reads of current user, served from cache.'''
+
+    name = 'hot_current'
+
+    async def setup(self, client, number):
+        await self.login(client, number % self.users)
+        return {}
+
+    async def step(self, client, state, recorder):
+        await recorder.request(client, 'current', 'GET', USER_DETAIL_FULL)
+
+
+class DeepPages(Scenario):
+    '''Users list pages at random depth by page number and by cursor walking to the end.'''
+
+    name = 'deep_pages'
+
+    async def setup(self, client, number):
+        await self.login(client, number % self.users)
+        return {'after': None}
+
+    async def step(self, client, state, recorder):
+        page = random.randint(1, max(self.users // PAGE_SIZE, 1))
+        await recorder.request(
+            client, 'page', 'GET', USERS_LIST_FULL, params={'page': page, 'size': PAGE_SIZE, 'with_total': False},
+        )
+        params = {'size': PAGE_SIZE, 'with_total': False}
+        if state['after'] is not None:
+            params['after'] = state['after']
+        response = await recorder.request(client, 'cursor', 'GET', USERS_LIST_FULL, params=params)
+        state['after'] = response.json()['meta']['pagination']['next_cursor'] if response.is_success else None
+
+
+class AdminWrites(Scenario):
+    '''Bursts of admin updates, each followed by list reads which miss invalidated cache.'''
+
+    name = 'admin_writes'
+
+    async def setup(self, client, number):
+        await self.login(client, number % ADMINS)
+        response = await client.get(PRIVATE_USERS_LIST_FULL, params={'size': 100, 'with_total': False})
+        response.raise_for_status()
+        return {'ids': [user['id'] for user in response.json()['data']], 'writes': 0}
+
+    async def step(self, client, state, recorder):
+        user_id = random.choice(state['ids'])
+        state['writes'] += 1
+        await recorder.request(
+            client, 'update', 'PATCH', PRIVATE_USER_UPDATE_FULL.format(pk=user_id),
+            json={'id': user_id, 'additional_info': f'Load write {state["writes"]}'},
+        )
+        for _ in range(READS_PER_WRITE):
+            await recorder.request(client, 'list after update', 'GET', PRIVATE_USERS_LIST_FULL, params={
+                'page': 1, 'size': PAGE_SIZE,
+            })
+
+
+SCENARIOS = {scenario.name: scenario for scenario in (LoginStorm, HotCurrent, DeepPages, AdminWrites)}
@@ -0,0 +1,63 @@
+'''Fills database configured in environment with users for load tests.
+
+Previously seeded users are replaced, other users are kept. All seeded users share
+`PASSWORD`, the first `ADMINS` of them are admins.
+
+Usage: python -m benchmarks.load.seed [users]
+'''
+import asyncio
+import sys
+
+from sqlalchemy import delete, insert, select
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+
+from users_app.cache.module import get_cache
+from users_app.cache.settings import redis_client
+from users_app.database.models import City, User
+from users_app.database.settings import async_session, engine
+from users_app.security.hasher import hasher
+from users_app.services.users import USERS_COUNT_KEY, USERS_NAMESPACE
+
+PASSWORD = 'load-password'
+ADMINS = 10
+CITIES = 50
+BATCH_SIZE = 5000
+EMAIL_PATTERN = 'load-{number}@example.com'
+
+
+def email(number: int) -> str:
+    return EMAIL_PATTERN.format(number=number)
+
+
+async def seed(users: int) -> None:
+    hashed_password = await hasher.hash(PASSWORD)
+    async with async_session() as session:
+        await session.execute(delete(User).where(User.email.like(EMAIL_PATTERN.format(number='%'))))
+        await session.execute(
+            pg_insert(City)
+            .values([{'name': f'Load city {number}'} for number in range(CITIES)])
+            .on_conflict_do_nothing(index_elements=['name'])
+        )
+        city_ids = (await session.scalars(select(City.id).where(City.name.like('Load city %')))).all()
+        for start in range(0, users, BATCH_SIZE):
+            await session.execute(insert(User), [
+                {
+                    'first_name': f'First{number}',
+                    'last_name': f'Last{number}',
+                    'email': email(number),
+                    '_hashed_password': hashed_password,
+                    'is_admin': number < ADMINS,
+                    'city': city_ids[number % len(city_ids)],
+                    'additional_info': 'Seeded for load tests',
+                }
+                for number in range(start, min(start + BATCH_SIZE, users))
+            ])
+        await session.commit()
+    await get_cache().invalidate(USERS_NAMESPACE)
+    await redis_client.delete(USERS_COUNT_KEY)
+    await engine.dispose()
+    print(f'seeded {users} users, password: {PASSWORD}')
+
+
+if __name__ == '__main__':
+    asyncio.run(seed(int(sys.argv[1]) if len(sys.argv) > 1 else 10_000))
@@ -0,0 +1,54 @@
+'''Overhead of JWT handling and authentication middleware dispatch.
+
+Usage: pytest benchmarks [--benchmark-autosave] [--benchmark-compare]
+'''
+import pytest
+
+from benchmarks.fakes import run_sync
+from users_app.middleware.auth import AuthdMidddleware
+from users_app.security.cifer import Cifer
+from users_app.validation.schemas import Payload
+
+PAYLOAD = Payload(user_id=1, is_admin=False)
+
+
+async def endpoint(scope, receive, send):
+    await send({'type': 'http.response.start', 'status': 200, 'headers': []})
+    await send({'type': 'http.response.body', 'body': b''})
+
+
+async def receive():
+    return {'type': 'http.request', 'body': b''}
+
+
+async def send(message):
+    pass
+
+
+def make_scope(path: str, token: str) -> dict:
+    return {
+        'type': 'http',
+        'method': 'GET',
+        'path': path,
+        'headers': [(b'cookie', f'jwt_token={token}'.encode())],
+    }
+
+
+def test_cifer_encode(measure):
+    cifer = Cifer('benchmark-key', 'HS256')
+    token = measure(cifer.encode, PAYLOAD)
+    assert cifer.decode(token) == PAYLOAD
+
+
+@pytest.mark.parametrize('cache_size', (0, 1000), ids=('uncached', 'cached'))
+def test_cifer_decode(measure, cache_size):
+    cifer = Cifer('benchmark-key', 'HS256', cache_size=cache_size)
+    token = cifer.encode(PAYLOAD)
+    assert measure(cifer.decode, token) == PAYLOAD
+
+
+@pytest.mark.parametrize('path', ('/users/current', '/private/users', '/login'), ids=('user', 'forbidden', 'public'))
+def test_middleware_dispatch(measure, path):
+    middleware = AuthdMidddleware(endpoint)
+    token = middleware.auth_service.cifer.encode(PAYLOAD)
+    measure(lambda: run_sync(middleware(make_scope(path, token), receive, send)))
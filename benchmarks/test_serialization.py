@@ -0,0 +1,78 @@
+'''Overhead of users list response serialization with validated and fast response paths
+and of cached users list pages encoding per cache codec.
+
+Validated path builds response model and lets FastAPI validate and encode it again for
+`response_model`, as routes do by default. Fast path builds it with `construct()` and renders
+it with prebuilt serializers, as routes do with `FAST_SERIALIZATION`.
+
+Cached pages hold `User` instances, as `UserService` caches them for `UsersListResponseModel`,
+stored size of a page is added to `extra_info`. Codecs whose libraries are not installed are skipped.
+
+Usage: pytest benchmarks [--benchmark-autosave] [--benchmark-compare]
+'''
+import pytest
+from fastapi.responses import JSONResponse
+from fastapi.routing import serialize_response
+from fastapi.utils import create_response_field
+
+from benchmarks.fakes import make_page, run_sync
+from users_app.cache.codecs import CacheSerializer
+from users_app.validation.schemas import (
+    PaginatedMetaDataModel,
+    UsersListMetaDataModel,
+    UsersListResponseModel,
+)
+from users_app.validation.serializers import FastJSONResponse, serialize_users_list
+
+PAGE_SIZE = 50
+CACHE_SETTINGS = (
+    ('json', ''),
+    ('orjson', ''),
+    ('msgpack', ''),
+    ('orjson', 'lz4'),
+    ('orjson', 'zstd'),
+    ('msgpack', 'lz4'),
+    ('msgpack', 'zstd'),
+)
+CACHE_IDS = [f'{codec}+{compression}' if compression else codec for codec, compression in CACHE_SETTINGS]
+RESPONSE_FIELD = create_response_field(name='response', type_=UsersListResponseModel)
+
+
+async def validated(page: list, meta: UsersListMetaDataModel) -> bytes:
+    response = UsersListResponseModel(data=page, meta=meta)
+    content = await serialize_response(field=RESPONSE_FIELD, response_content=response)
+    return JSONResponse(content).body
+
+
+async def fast(page: list, meta: UsersListMetaDataModel) -> bytes:
+    response = UsersListResponseModel.construct(data=page, meta=meta)
+    return FastJSONResponse(serialize_users_list(response)).body
+
+
+@pytest.mark.parametrize('render', (validated, fast), ids=('validated', 'fast'))
+def test_users_list_serialization(measure, render):
+    page = make_page(PAGE_SIZE)
+    meta = UsersListMetaDataModel(pagination=PaginatedMetaDataModel(total=PAGE_SIZE, page=1, size=PAGE_SIZE))
+    body = measure(lambda: run_sync(render(page, meta)))
+    assert body.startswith(b'{"data":[')
+
+
+def make_serializer(codec: str, compression: str) -> CacheSerializer:
+    try:
+        return CacheSerializer(codec, compression)
+    except ValueError as exc:
+        pytest.skip(str(exc))
+
+
+@pytest.mark.parametrize('codec, compression', CACHE_SETTINGS, ids=CACHE_IDS)
+def test_cache_encode(measure, benchmark, codec, compression):
+    serializer = make_serializer(codec, compression)
+    data = measure(serializer.dumps, make_page(PAGE_SIZE))
+    benchmark.extra_info['stored_bytes'] = len(data)
+
+
+@pytest.mark.parametrize('codec, compression', CACHE_SETTINGS, ids=CACHE_IDS)
+def test_cache_decode(measure, codec, compression):
+    serializer = make_serializer(codec, compression)
+    page = measure(serializer.loads, serializer.dumps(make_page(PAGE_SIZE)))
+    assert len(page) == PAGE_SIZE
@@ -0,0 +1,53 @@
+'''Overhead of `UserService` calls served from warm cache.
+
+Usage: pytest benchmarks [--benchmark-autosave] [--benchmark-compare]
+'''
+import asyncio
+
+import pytest
+
+from benchmarks.fakes import run_sync
+from users_app.validation.schemas import (
+    PrivateUpdateUserModel,
+    QueryParams,
+    UpdateUserModel,
+)
+
+QUERY = QueryParams(page=2, size=50)
+
+
+@pytest.mark.parametrize('fast_serialization', (False, True), ids=('validated', 'fast'))
+def test_get_list(measure, user_service_factory, fast_serialization):
+    service = user_service_factory(fast_serialization)
+    asyncio.run(service.get_list(QUERY))
+    response = measure(lambda: run_sync(service.get_list(QUERY)))
+    assert len(response.data) == QUERY.size
+
+
+@pytest.mark.parametrize('fast_serialization', (False, True), ids=('validated', 'fast'))
+def test_get_list_private(measure, user_service_factory, fast_serialization):
+    service = user_service_factory(fast_serialization)
+    asyncio.run(service.get_list_private(QUERY))
+    response = measure(lambda: run_sync(service.get_list_private(QUERY)))
+    assert response.meta.hint.city
+
+
+def test_get_detail(measure, user_service_factory):
+    service = user_service_factory()
+    asyncio.run(service.get_detail(user_id=1))
+    user = measure(lambda: run_sync(service.get_detail(user_id=1)))
+    assert user['id'] == 1
+
+
+def test_update(measure, user_service_factory):
+    service = user_service_factory()
+    data = UpdateUserModel(first_name='Updated', other_name='Updated')
+    user = measure(lambda: run_sync(service.update(user_id=1, data=data)))
+    assert user.first_name == 'Updated'
+
+
+def test_update_private(measure, user_service_factory):
+    service = user_service_factory()
+    data = PrivateUpdateUserModel(id=1, first_name='Updated', city=2)
+    user = measure(lambda: run_sync(service.update(user_id=1, data=data)))
+    assert user.city == 2
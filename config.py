@@ -8,7 +8,30 @@ load_dotenv()
 SECRET_KEY = os.environ.get('SECRET_KEY')
 JWT_KEY = os.environ.get('JWT_KEY')
 JWT_ALGORITHM = os.environ.get('JWT_ALGORITHM')
+JWT_EXP = os.environ.get('JWT_EXP', 3600)
+JWT_CACHE_SIZE = os.environ.get('JWT_CACHE_SIZE', 0)
 HASH_SCHEMA = os.environ.get('HASH_SCHEMA', 'bcrypt')
+HASH_EXECUTOR = os.environ.get('HASH_EXECUTOR', 'thread')
+HASH_WORKERS = os.environ.get('HASH_WORKERS')
+HASH_QUEUE_SIZE = os.environ.get('HASH_QUEUE_SIZE', 64)
+
+# Login throttling
+LOGIN_THROTTLE_ENABLED = os.environ.get('LOGIN_THROTTLE_ENABLED', 'true').lower() == 'true'
+LOGIN_WINDOW = os.environ.get('LOGIN_WINDOW', 60)
+LOGIN_LIMIT_PER_LOGIN = os.environ.get('LOGIN_LIMIT_PER_LOGIN', 10)
+LOGIN_LIMIT_PER_CLIENT = os.environ.get('LOGIN_LIMIT_PER_CLIENT', 100)
+
+# API
+MAX_PAGE_SIZE = os.environ.get('MAX_PAGE_SIZE', 100)
+FAST_SERIALIZATION = os.environ.get('FAST_SERIALIZATION', 'false').lower() == 'true'
+
+# Metrics
+METRICS_ENABLED = os.environ.get('METRICS_ENABLED', 'true').lower() == 'true'
+METRICS_SAMPLE_INTERVAL = os.environ.get('METRICS_SAMPLE_INTERVAL', 5)
+METRICS_TOKEN = os.environ.get('METRICS_TOKEN', '')
+PROFILING_ENABLED = os.environ.get('PROFILING_ENABLED', 'false').lower() == 'true'
+PROFILING_MAX_QUERIES = os.environ.get('PROFILING_MAX_QUERIES', 10)
+PROFILING_MAX_DURATION = os.environ.get('PROFILING_MAX_DURATION', 500)
 
 # Database
 DB_HOST = os.environ.get('DB_HOST')
@@ -17,9 +40,35 @@ DB_NAME = os.environ.get('DB_NAME')
 DB_USER = os.environ.get('DB_USER')
 DB_PASS = os.environ.get('DB_PASS')
 TEST_DB_NAME = os.environ.get('TEST_DB_NAME')
+DB_ECHO = os.environ.get('DB_ECHO', 'false').lower() == 'true'
+DB_POOL_SIZE = os.environ.get('DB_POOL_SIZE', 5)
+DB_MAX_OVERFLOW = os.environ.get('DB_MAX_OVERFLOW', 10)
+DB_POOL_TIMEOUT = os.environ.get('DB_POOL_TIMEOUT', 30)
+DB_POOL_RECYCLE = os.environ.get('DB_POOL_RECYCLE', 1800)
+DB_POOL_PRE_PING = os.environ.get('DB_POOL_PRE_PING', 'false').lower() == 'true'
+DB_STATEMENT_CACHE_SIZE = os.environ.get('DB_STATEMENT_CACHE_SIZE', 100)
+DB_REPLICA_HOSTS = os.environ.get('DB_REPLICA_HOSTS', '')
+DB_REPLICA_MAX_LAG = os.environ.get('DB_REPLICA_MAX_LAG', 5)
+DB_REPLICA_CHECK_INTERVAL = os.environ.get('DB_REPLICA_CHECK_INTERVAL', 1)
+TEST_DB_REPLICA_NAME = os.environ.get('TEST_DB_REPLICA_NAME')
 
 # Cache
 REDIS_HOST = os.environ.get('REDIS_HOST')
 REDIS_PORT = os.environ.get('REDIS_PORT')
 REDIS_DB = os.environ.get('REDIS_DB')
 REDIS_EXP = os.environ.get('REDIS_EXP')
+REDIS_COUNTER_EXP = os.environ.get('REDIS_COUNTER_EXP', 60)
+CACHE_LOCAL_ENABLED = os.environ.get('CACHE_LOCAL_ENABLED', 'false').lower() == 'true'
+CACHE_LOCAL_SIZE = os.environ.get('CACHE_LOCAL_SIZE', 1024)
+CACHE_LOCAL_EXP = os.environ.get('CACHE_LOCAL_EXP', 5)
+CACHE_CODEC = os.environ.get('CACHE_CODEC', 'json')
+CACHE_COMPRESSION = os.environ.get('CACHE_COMPRESSION', '')
+CACHE_COMPRESS_MIN_SIZE = os.environ.get('CACHE_COMPRESS_MIN_SIZE', 1024)
+CACHE_LOCK_ENABLED = os.environ.get('CACHE_LOCK_ENABLED', 'false').lower() == 'true'
+CACHE_LOCK_TTL = os.environ.get('CACHE_LOCK_TTL', 5)
+CACHE_LOCK_WAIT = os.environ.get('CACHE_LOCK_WAIT', 5)
+CACHE_USER_EXP = os.environ.get('CACHE_USER_EXP', REDIS_EXP or 300)
+CACHE_USER_STALE_EXP = os.environ.get('CACHE_USER_STALE_EXP', 60)
+CACHE_USERS_EXP = os.environ.get('CACHE_USERS_EXP', REDIS_EXP or 300)
+CACHE_USERS_STALE_EXP = os.environ.get('CACHE_USERS_STALE_EXP', 60)
+CACHE_CITIES_EXP = os.environ.get('CACHE_CITIES_EXP', 3600)
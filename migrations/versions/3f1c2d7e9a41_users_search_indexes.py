@@ -0,0 +1,45 @@
+"""Users search indexes
+
+Revision ID: 3f1c2d7e9a41
+Revises: 9cc828643ba5
+Create Date: 2026-10-18 17:40:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3f1c2d7e9a41'
+down_revision = '9cc828643ba5'
+branch_labels = None
+depends_on = None
+
+TRIGRAM_INDEXES = {
+    'ix_user_account_email_trgm': 'email',
+    'ix_user_account_first_name_trgm': 'first_name',
+    'ix_user_account_last_name_trgm': 'last_name',
+}
+
+
+def upgrade() -> None:
+    op.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    # Indexes are built without locking the table for writes, which needs autocommit.
+    with op.get_context().autocommit_block():
+        # Operator class of the index lets `LIKE 'prefix%'` use it whatever the database collation is.
+        op.create_index(
+            'ix_user_account_lower_email', 'user_account', [sa.text('lower(email) text_pattern_ops')],
+            postgresql_concurrently=True,
+        )
+        for name, column in TRIGRAM_INDEXES.items():
+            op.create_index(
+                name, 'user_account', [sa.text(f'lower({column}) gin_trgm_ops')],
+                postgresql_using='gin', postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        for name in TRIGRAM_INDEXES:
+            op.drop_index(name, table_name='user_account', postgresql_concurrently=True)
+        op.drop_index('ix_user_account_lower_email', table_name='user_account', postgresql_concurrently=True)
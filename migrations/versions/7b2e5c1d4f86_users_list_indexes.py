@@ -0,0 +1,40 @@
+"""Users list filters and sorts indexes
+
+Revision ID: 7b2e5c1d4f86
+Revises: 3f1c2d7e9a41
+Create Date: 2026-10-18 19:10:00.000000
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '7b2e5c1d4f86'
+down_revision = '3f1c2d7e9a41'
+branch_labels = None
+depends_on = None
+
+COMPOSITE_INDEXES = {
+    'ix_user_account_last_name_id': ['last_name', 'id'],
+    'ix_user_account_birthday_id': ['birthday', 'id'],
+    'ix_user_account_city_id': ['city', 'id'],
+}
+
+
+def upgrade() -> None:
+    # Indexes are built without locking the table for writes, which needs autocommit.
+    with op.get_context().autocommit_block():
+        for name, columns in COMPOSITE_INDEXES.items():
+            op.create_index(name, 'user_account', columns, postgresql_concurrently=True)
+        op.create_index(
+            'ix_user_account_admin_id', 'user_account', ['id'],
+            postgresql_where=sa.text('is_admin'), postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.drop_index('ix_user_account_admin_id', table_name='user_account', postgresql_concurrently=True)
+        for name in COMPOSITE_INDEXES:
+            op.drop_index(name, table_name='user_account', postgresql_concurrently=True)
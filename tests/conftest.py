@@ -2,16 +2,22 @@ import asyncio
 
 import pytest_asyncio
 from httpx import AsyncClient
+from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
 from sqlalchemy_utils import create_database, database_exists
 
 from config import DB_HOST, DB_PASS, DB_PORT, DB_USER, TEST_DB_NAME
 from users_app.cache.settings import redis_client
 from users_app.database.models import Base
-from users_app.database.settings import get_session
+from users_app.database.settings import get_session, get_session_factory
 from users_app.main import app
 
 pytest_plugins = [
+    'tests.fixtures.cache',
+    'tests.fixtures.cities',
+    'tests.fixtures.metrics',
+    'tests.fixtures.replicas',
     'tests.fixtures.users',
 ]
 
@@ -35,6 +41,7 @@ async def db_engine():
         create_database(engine.url)
     async with engine.begin() as conn:
         await conn.run_sync(Base.metadata.drop_all)
+        await conn.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
         await conn.run_sync(Base.metadata.create_all)
 
     yield engine
@@ -57,6 +64,9 @@ async def session(db_engine):
 @pytest_asyncio.fixture(scope='function')
 async def client(session):
     app.dependency_overrides[get_session] = lambda: session
+    app.dependency_overrides[get_session_factory] = lambda: sessionmaker(
+        session.bind, class_=AsyncSession, expire_on_commit=False,
+    )
 
     async with AsyncClient(app=app, base_url='http://test') as client:
         yield client
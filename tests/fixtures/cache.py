@@ -0,0 +1,150 @@
+import asyncio
+from collections import Counter
+
+import pytest
+import pytest_asyncio
+
+from users_app.cache.abstract_cache import AbstractCache
+from users_app.cache.codecs import CacheSerializer
+from users_app.cache.local import LocalCache
+from users_app.cache.two_tier import InvalidationListener, TierStats, TwoTierCache
+
+
+class MemoryCache(AbstractCache):
+    '''Remote cache kept in a dict, which counts reads of keys and reports expiration times they were set with.
+
+    With `serializer` values are kept encoded as `RedisCache` keeps them. None of its coroutines
+    suspends, so benchmarks run services with it without event loop.
+    '''
+
+    def __init__(self, cache_client: dict | None = None, serializer: CacheSerializer | None = None) -> None:
+        self.cache_client = cache_client if cache_client is not None else {}
+        self.serializer = serializer
+        self.reads: Counter[str] = Counter()
+        self.ttls: dict[str, float] = {}
+
+    async def get(self, key: str):
+        self.reads[key] += 1
+        value = self.cache_client.get(key)
+        if value is None or self.serializer is None:
+            return value
+        return self.serializer.loads(value)
+
+    async def get_with_ttl(self, key: str) -> tuple:
+        return await self.get(key), self.ttls.get(key)
+
+    async def set(self, key: str, value, expire_time=None):
+        self.cache_client[key] = self.serializer.dumps(value) if self.serializer is not None else value
+        if expire_time is not None:
+            self.ttls[key] = expire_time
+
+    async def set_if_unchanged(self, key: str, value, time_left: float, expire_time=None) -> bool:
+        if key not in self.cache_client:
+            return False
+        await self.set(key, value)
+        return True
+
+    async def get_many(self, keys: list[str]) -> list:
+        return [await self.get(key) for key in keys]
+
+    async def set_many(self, values: dict, expire_time=None):
+        for key, value in values.items():
+            await self.set(key, value, expire_time)
+
+    async def clear(self, *keys: str):
+        for key in keys:
+            self.cache_client.pop(key, None)
+
+    async def get_version(self, namespace: str) -> int:
+        return self.cache_client.get(f'version-{namespace}', 0)
+
+    async def invalidate(self, namespace: str):
+        self.cache_client[f'version-{namespace}'] = self.cache_client.get(f'version-{namespace}', 0) + 1
+
+    async def get_counter(self, key: str) -> int | None:
+        return self.cache_client.get(key)
+
+    async def set_counter(self, key: str, value: int, expire_time=None, nx: bool = False):
+        if not nx or key not in self.cache_client:
+            self.cache_client[key] = value
+
+    async def incr_counter(self, key: str, amount: int = 1):
+        if key in self.cache_client:
+            self.cache_client[key] += amount
+
+
+class PubSub:
+    '''Subscription of `Broker`, which delivers messages as `aioredis` does.'''
+
+    def __init__(self, broker: 'Broker') -> None:
+        self.broker = broker
+        self.messages: asyncio.Queue = asyncio.Queue()
+
+    async def subscribe(self, channel: str) -> None:
+        self.broker.subscribers.setdefault(channel, []).append(self)
+        self.messages.put_nowait({'type': 'subscribe', 'data': 1})
+
+    async def listen(self):
+        while True:
+            yield await self.messages.get()
+
+    async def reset(self) -> None:
+        for subscribers in self.broker.subscribers.values():
+            if self in subscribers:
+                subscribers.remove(self)
+
+
+class Broker:
+    '''Redis pub/sub of processes in memory.'''
+
+    def __init__(self) -> None:
+        self.subscribers: dict[str, list[PubSub]] = {}
+        self.published: list[tuple[str, str]] = []
+
+    async def publish(self, channel: str, message: str) -> int:
+        self.published.append((channel, message))
+        subscribers = self.subscribers.get(channel, [])
+        for pubsub in subscribers:
+            pubsub.messages.put_nowait({'type': 'message', 'data': message.encode()})
+        return len(subscribers)
+
+    def pubsub(self) -> PubSub:
+        return PubSub(self)
+
+
+# Fixture caches
+@pytest.fixture
+def memory_cache():
+    return MemoryCache()
+
+
+@pytest.fixture
+def broker():
+    return Broker()
+
+
+@pytest.fixture
+def two_tier_factory(memory_cache, broker):
+    '''Returns factory of two-tier caches of separate processes over the same remote cache.'''
+    def factory(max_size: int = 16, expire_time: float = 60) -> TwoTierCache:
+        local_cache = LocalCache(max_size=max_size, expire_time=expire_time)
+        return TwoTierCache(memory_cache, local_cache, broker, TierStats())
+    return factory
+
+
+@pytest_asyncio.fixture
+async def invalidation_listeners(broker):
+    '''Starts invalidation listeners of given local caches, stops them after the test.'''
+    listeners = []
+
+    async def start(*local_caches: LocalCache) -> None:
+        for local_cache in local_caches:
+            listener = InvalidationListener(broker, local_cache, retry_delay=0)
+            listener.start()
+            listeners.append(listener)
+        # Let listeners subscribe.
+        await asyncio.sleep(0.01)
+
+    yield start
+    for listener in listeners:
+        await listener.stop()
@@ -0,0 +1,27 @@
+import pytest_asyncio
+
+from users_app.database.crud.users import UserCRUD
+from users_app.database.models import City
+from users_app.security.hasher import hasher
+from users_app.validation.schemas import PrivateCreateUserModel
+
+
+# Fixture city
+@pytest_asyncio.fixture
+async def fixture_city(session):
+    city = City(name='Los Angeles')
+    session.add(city)
+    await session.commit()
+    await session.refresh(city)
+    return city
+
+
+@pytest_asyncio.fixture
+async def fixture_city_users(session, fixture_city, user_data):
+    user_crud = UserCRUD(session)
+    hashed_password = await hasher.hash(user_data['password'])
+    users = []
+    for number in range(2):
+        data = dict(user_data, email=f'citizen_{number}@example.com', city=fixture_city.id)
+        users.append(await user_crud.create(PrivateCreateUserModel(**data), hashed_password))
+    return users
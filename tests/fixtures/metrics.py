@@ -0,0 +1,46 @@
+import pytest
+
+from users_app.monitoring.metrics import RequestMetrics
+
+
+class Histogram:
+    '''Histogram with `prometheus_client` interface, which records labels of observations.'''
+
+    def __init__(self) -> None:
+        self.observed: list[tuple] = []
+        self.children: list[HistogramChild] = []
+
+    def labels(self, *labels: str) -> 'HistogramChild':
+        child = HistogramChild(self, labels)
+        self.children.append(child)
+        return child
+
+
+class HistogramChild:
+    '''Labeled child of `Histogram`.'''
+
+    def __init__(self, histogram: Histogram, labels: tuple) -> None:
+        self.histogram = histogram
+        self.labels = labels
+
+    def observe(self, seconds: float) -> None:
+        self.histogram.observed.append(self.labels)
+
+
+class Gauge:
+    '''Gauge with `prometheus_client` interface.'''
+
+    def __init__(self) -> None:
+        self.value = 0
+
+    def inc(self) -> None:
+        self.value += 1
+
+    def dec(self) -> None:
+        self.value -= 1
+
+
+# Fixture metrics
+@pytest.fixture
+def request_metrics():
+    return RequestMetrics(Histogram(), Gauge())
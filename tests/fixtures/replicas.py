@@ -0,0 +1,50 @@
+import pytest
+import pytest_asyncio
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.orm import sessionmaker
+
+from config import DB_HOST, DB_PASS, DB_PORT, DB_USER, TEST_DB_REPLICA_NAME
+from users_app.database.models import Base
+from users_app.database.routing import ReplicaSet, RoutingSession
+
+
+# Fixture replica
+@pytest_asyncio.fixture(scope='session')
+async def replica_engine(db_engine):
+    '''Second local database, which plays replica of test database.'''
+    if not TEST_DB_REPLICA_NAME:
+        pytest.skip('TEST_DB_REPLICA_NAME is not set')
+    async with db_engine.connect() as connection:
+        connection = await connection.execution_options(isolation_level='AUTOCOMMIT')
+        exists = await connection.scalar(
+            text('SELECT 1 FROM pg_database WHERE datname = :name'), {'name': TEST_DB_REPLICA_NAME},
+        )
+        if not exists:
+            await connection.execute(text(f'CREATE DATABASE "{TEST_DB_REPLICA_NAME}"'))
+    engine = create_async_engine(
+        f'postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{TEST_DB_REPLICA_NAME}',
+    )
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.drop_all)
+        await conn.execute(text('CREATE EXTENSION IF NOT EXISTS pg_trgm'))
+        await conn.run_sync(Base.metadata.create_all)
+
+    yield engine
+
+    await engine.dispose()
+
+
+@pytest_asyncio.fixture
+async def routing_session(db_engine, replica_engine):
+    replicas = ReplicaSet([replica_engine], max_lag=5)
+    await replicas.check()
+    make_session = sessionmaker(
+        db_engine,
+        class_=AsyncSession,
+        sync_session_class=RoutingSession,
+        info={'replicas': replicas},
+    )
+    async with make_session() as session:
+        yield session
+        await session.rollback()
@@ -1,7 +1,15 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
 import pytest
 import pytest_asyncio
 
+from users_app.cache.settings import redis_client
 from users_app.database.crud.users import UserCRUD
+from users_app.main import app
+from users_app.security.hasher import PasswordHasher, get_hasher, hasher
+from users_app.security.throttling import LoginThrottle, get_login_throttle
 from users_app.validation.schemas import LoginModel, PrivateCreateUserModel, QueryParams
 
 
@@ -31,7 +39,7 @@ def user_login_form(user_data):
 @pytest_asyncio.fixture
 async def fixture_user(session, user_data):
     user_crud = UserCRUD(session)
-    return await user_crud.create(PrivateCreateUserModel(**user_data))
+    return await user_crud.create(PrivateCreateUserModel(**user_data), await hasher.hash(user_data['password']))
 
 
 # Fixture admin
@@ -54,4 +62,34 @@ def admin_login_form(admin_data):
 @pytest_asyncio.fixture
 async def fixture_admin(session, admin_data):
     user_crud = UserCRUD(session)
-    return await user_crud.create(PrivateCreateUserModel(**admin_data))
+    return await user_crud.create(PrivateCreateUserModel(**admin_data), await hasher.hash(admin_data['password']))
+
+
+# Fixture throttle
+@pytest.fixture
+def strict_login_throttle():
+    app.dependency_overrides[get_login_throttle] = lambda: LoginThrottle(
+        cache_client=redis_client,
+        window=60,
+        login_limit=2,
+        client_limit=100,
+    )
+    yield
+    app.dependency_overrides.pop(get_login_throttle)
+
+
+# Fixture hasher
+@pytest_asyncio.fixture
+async def busy_hasher():
+    '''Hasher without queue whose only worker is busy until the test ends.'''
+    release = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=1)
+    hasher = PasswordHasher(executor, schema='bcrypt', max_workers=1, max_queue=0)
+    job = asyncio.create_task(hasher._run(release.wait))
+    await asyncio.sleep(0.01)
+    app.dependency_overrides[get_hasher] = lambda: hasher
+    yield hasher
+    app.dependency_overrides.pop(get_hasher)
+    release.set()
+    await job
+    executor.shutdown()
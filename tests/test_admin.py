@@ -1,17 +1,32 @@
+import json
 from http import HTTPStatus
 
 import pytest
 
+from config import MAX_PAGE_SIZE
 from users_app.api.v1.routers.constants import (
     LOGIN,
     PRIVATE_USER_CREATE_FULL,
     PRIVATE_USER_DELETE_FULL,
     PRIVATE_USER_DETAIL_FULL,
     PRIVATE_USER_UPDATE_FULL,
+    PRIVATE_USERS_BATCH_FULL,
+    PRIVATE_USERS_BULK_CREATE_FULL,
+    PRIVATE_USERS_BULK_DELETE_FULL,
+    PRIVATE_USERS_BULK_UPDATE_FULL,
+    PRIVATE_USERS_EXPORT_FULL,
     PRIVATE_USERS_LIST_FULL,
 )
+from users_app.exceptions.constants import (
+    MSG_CITY_NOT_FOUND,
+    MSG_EMAIL_EXISTS,
+    MSG_USER_NOT_FOUND,
+)
 from users_app.validation.schemas import (
+    BulkImportResponseModel,
+    BulkUsersResponseModel,
     PrivateDetailUserResponseModel,
+    PrivateUsersBatchResponseModel,
     PrivateUsersListResponseModel,
 )
 
@@ -32,6 +47,21 @@ async def test_get_list_private(client, fixture_admin, admin_login_form, query_p
     assert response.json()['meta']['pagination']['size'] == query_params.size
 
 
+@pytest.mark.asyncio
+async def test_get_list_private_city_hint(
+    client, fixture_admin, admin_login_form, fixture_city, fixture_city_users, query_params
+):
+    '''Checks that `users_list_private` endpoint returns distinct city hints.'''
+    await client.post(LOGIN, json=admin_login_form)
+    response = await client.get(PRIVATE_USERS_LIST_FULL, params=query_params.dict())
+    cached_response = await client.get(PRIVATE_USERS_LIST_FULL, params=query_params.dict())
+    assert response.status_code == HTTPStatus.OK
+    assert response.json()['meta']['hint']['city'] == [
+        {'id': fixture_city.id, 'name': fixture_city.name},
+    ]
+    assert cached_response.json()['meta']['hint'] == response.json()['meta']['hint']
+
+
 @pytest.mark.asyncio
 async def test_create_private(client, fixture_admin, admin_login_form, user_data):
     '''Checksnormal response of `user_create_private` endpoint.'''
@@ -51,6 +81,85 @@ async def test_create_private(client, fixture_admin, admin_login_form, user_data
     assert response.json()['is_admin'] == user_data['is_admin']
 
 
+@pytest.mark.asyncio
+async def test_create_private_updates_total(client, fixture_admin, admin_login_form, user_data, query_params):
+    '''Checks that maintained total of users is adjusted by `user_create_private` endpoint.'''
+    await client.post(LOGIN, json=admin_login_form)
+    response_before = await client.get(PRIVATE_USERS_LIST_FULL, params=query_params.dict())
+    await client.post(PRIVATE_USER_CREATE_FULL, json=user_data)
+    response_after = await client.get(PRIVATE_USERS_LIST_FULL, params=query_params.dict())
+    assert response_before.json()['meta']['pagination']['total'] == 1
+    assert response_after.json()['meta']['pagination']['total'] == 2
+    assert len(response_after.json()['data']) == 2
+
+
+@pytest.mark.asyncio
+async def test_bulk_create_private(client, fixture_admin, admin_login_form, fixture_user, user_data):
+    '''Checks normal response of `users_bulk_create_private` endpoint.'''
+    rows = [
+        dict(user_data, email='new@example.com'),
+        user_data,
+        dict(user_data, email='nowhere@example.com', city=999),
+        {'first_name': 'Only'},
+    ]
+    body = '\n'.join(json.dumps(row) for row in rows)
+    await client.post(LOGIN, json=admin_login_form)
+    response = await client.post(
+        PRIVATE_USERS_BULK_CREATE_FULL,
+        content=body,
+        headers={'content-type': 'application/x-ndjson'},
+    )
+    check_existance = await client.get(PRIVATE_USERS_LIST_FULL, params={'size': 10})
+    assert response.status_code == HTTPStatus.OK
+    assert BulkImportResponseModel.validate(response.json())
+    assert response.json()['created'] == 1
+    assert [error['line'] for error in response.json()['errors']] == [2, 3, 4]
+    assert response.json()['errors'][0]['message'] == MSG_EMAIL_EXISTS.format(email=user_data['email'])
+    assert response.json()['errors'][1]['message'] == MSG_CITY_NOT_FOUND
+    assert check_existance.json()['meta']['pagination']['total'] == 3
+
+
+@pytest.mark.asyncio
+async def test_get_list_private_size_limit(client, fixture_admin, admin_login_form):
+    '''Checks that `users_list_private` endpoint rejects too large pages.'''
+    await client.post(LOGIN, json=admin_login_form)
+    response = await client.get(PRIVATE_USERS_LIST_FULL, params={'size': int(MAX_PAGE_SIZE) + 1})
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+
+
+@pytest.mark.asyncio
+async def test_export_private(client, fixture_admin, admin_login_form, fixture_user):
+    '''Checks normal response of `users_export_private` endpoint in both formats.'''
+    await client.post(LOGIN, json=admin_login_form)
+    ndjson_response = await client.get(PRIVATE_USERS_EXPORT_FULL)
+    csv_response = await client.get(PRIVATE_USERS_EXPORT_FULL, params={'format': 'csv'})
+    assert ndjson_response.status_code == HTTPStatus.OK
+    assert ndjson_response.headers['content-type'].startswith('application/x-ndjson')
+    users = [json.loads(line) for line in ndjson_response.text.splitlines()]
+    assert [user['email'] for user in users] == [fixture_admin.email, fixture_user.email]
+    assert '_hashed_password' not in users[0]
+    assert csv_response.status_code == HTTPStatus.OK
+    assert csv_response.headers['content-type'].startswith('text/csv')
+    lines = csv_response.text.splitlines()
+    assert lines[0].split(',')[:3] == ['id', 'first_name', 'last_name']
+    assert len(lines) == 3
+
+
+@pytest.mark.asyncio
+async def test_get_batch_private(client, fixture_admin, admin_login_form, fixture_user):
+    '''Checks normal response of `users_batch_private` endpoint with cached and missing users.'''
+    await client.post(LOGIN, json=admin_login_form)
+    await client.get(PRIVATE_USER_DETAIL_FULL.format(pk=fixture_user.id))
+    params = {'ids': [fixture_user.id, 999, fixture_admin.id]}
+    response = await client.get(PRIVATE_USERS_BATCH_FULL, params=params)
+    cached_response = await client.get(PRIVATE_USERS_BATCH_FULL, params=params)
+    assert response.status_code == HTTPStatus.OK
+    assert PrivateUsersBatchResponseModel.validate(response.json())
+    assert [user['id'] for user in response.json()['data']] == [fixture_user.id, fixture_admin.id]
+    assert response.json()['not_found'] == [999]
+    assert cached_response.json() == response.json()
+
+
 @pytest.mark.asyncio
 async def test_get_detail_private(client, fixture_admin, admin_login_form, fixture_user):
     '''Checksnormal response of `user_deatail_private` endpoint.'''
@@ -104,3 +213,41 @@ async def test_delete_private(client, fixture_admin, admin_login_form, fixture_u
     check_existance = await client.get(PRIVATE_USER_DETAIL_FULL.format(pk=fixture_user.id))
     assert response.status_code == HTTPStatus.NO_CONTENT
     assert check_existance.status_code == HTTPStatus.NOT_FOUND
+
+
+@pytest.mark.asyncio
+async def test_bulk_update_private(client, fixture_admin, admin_login_form, fixture_user):
+    '''Checks normal response of `users_bulk_update_private` endpoint.'''
+    await client.post(LOGIN, json=admin_login_form)
+    response = await client.patch(PRIVATE_USERS_BULK_UPDATE_FULL, json=[
+        {'id': fixture_user.id, 'first_name': 'Updated', 'city': None},
+        {'id': fixture_admin.id, 'email': fixture_user.email},
+        {'id': 999, 'first_name': 'Nobody'},
+    ])
+    check_update = await client.get(PRIVATE_USER_DETAIL_FULL.format(pk=fixture_user.id))
+    assert response.status_code == HTTPStatus.OK
+    assert BulkUsersResponseModel.validate(response.json())
+    assert response.json()['results'] == [
+        {'id': fixture_user.id, 'status': HTTPStatus.OK, 'message': None},
+        {
+            'id': fixture_admin.id,
+            'status': HTTPStatus.BAD_REQUEST,
+            'message': MSG_EMAIL_EXISTS.format(email=fixture_user.email),
+        },
+        {'id': 999, 'status': HTTPStatus.NOT_FOUND, 'message': MSG_USER_NOT_FOUND},
+    ]
+    assert check_update.json()['first_name'] == 'Updated'
+
+
+@pytest.mark.asyncio
+async def test_bulk_delete_private(client, fixture_admin, admin_login_form, fixture_user):
+    '''Checks normal response of `users_bulk_delete_private` endpoint.'''
+    await client.post(LOGIN, json=admin_login_form)
+    await client.get(PRIVATE_USER_DETAIL_FULL.format(pk=fixture_user.id))
+    response = await client.post(PRIVATE_USERS_BULK_DELETE_FULL, json={'ids': [fixture_user.id, 999]})
+    check_deletion = await client.get(PRIVATE_USER_DETAIL_FULL.format(pk=fixture_user.id))
+    check_total = await client.get(PRIVATE_USERS_LIST_FULL, params={'size': 10})
+    assert response.status_code == HTTPStatus.OK
+    assert [result['status'] for result in response.json()['results']] == [HTTPStatus.OK, HTTPStatus.NOT_FOUND]
+    assert check_deletion.status_code == HTTPStatus.NOT_FOUND
+    assert check_total.json()['meta']['pagination']['total'] == 1
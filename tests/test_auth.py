@@ -20,6 +20,8 @@ from users_app.exceptions.constants import (
     MSG_INVALID_CREDS,
     MSG_NOT_AUTHENTICATED,
     MSG_NOT_AUTHORIZED,
+    MSG_SERVICE_BUSY,
+    MSG_TOO_MANY_ATTEMPTS,
 )
 
 
@@ -112,3 +114,47 @@ async def test_admin_required_routes_with_user(client, fixture_user, user_login_
     assert response_private_user_detail.json()['message'] == MSG_NOT_AUTHORIZED
     assert response_private_user_update.json()['message'] == MSG_NOT_AUTHORIZED
     assert response_private_user_delete.json()['message'] == MSG_NOT_AUTHORIZED
+
+
+@pytest.mark.asyncio
+async def test_login_required_routes_with_invalid_token(client):
+    '''Checks responses of endpoints with forged JWT.'''
+    client.cookies.set('jwt_token', 'forged.jwt.token')
+    response_users_list = await client.get(USERS_LIST_FULL)
+    response_private_users_list = await client.get(PRIVATE_USERS_LIST_FULL)
+    assert response_users_list.status_code == HTTPStatus.UNAUTHORIZED
+    assert response_private_users_list.status_code == HTTPStatus.UNAUTHORIZED
+    assert response_users_list.json()['message'] == MSG_NOT_AUTHENTICATED
+
+
+@pytest.mark.asyncio
+async def test_post_login_throttled(client, fixture_user, user_login_form, strict_login_throttle):
+    '''Checks `Too many requests` response of `login` endpoint over attempts limit.'''
+    wrong_login_form = dict(user_login_form, password='wrong')
+    responses = [await client.post(LOGIN, json=wrong_login_form) for _ in range(2)]
+    response = await client.post(LOGIN, json=user_login_form)
+    assert [response.status_code for response in responses] == [HTTPStatus.BAD_REQUEST] * 2
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+    assert response.json()['message'] == MSG_TOO_MANY_ATTEMPTS
+    assert int(response.headers['Retry-After']) > 0
+
+
+@pytest.mark.asyncio
+async def test_post_login_successes_not_throttled(client, fixture_user, user_login_form, strict_login_throttle):
+    '''Checks that successful attempts of `login` endpoint are not counted towards the limit.'''
+    successes = [await client.post(LOGIN, json=user_login_form) for _ in range(3)]
+    wrong_login_form = dict(user_login_form, password='wrong')
+    failures = [await client.post(LOGIN, json=wrong_login_form) for _ in range(2)]
+    response = await client.post(LOGIN, json=user_login_form)
+    assert [response.status_code for response in successes] == [HTTPStatus.OK] * 3
+    assert [response.status_code for response in failures] == [HTTPStatus.BAD_REQUEST] * 2
+    assert response.status_code == HTTPStatus.TOO_MANY_REQUESTS
+
+
+@pytest.mark.asyncio
+async def test_post_login_hasher_busy(client, fixture_user, user_login_form, busy_hasher):
+    '''Checks `Service unavailable` response of `login` endpoint when password checks queue is full.'''
+    response = await client.post(LOGIN, json=user_login_form)
+    assert response.status_code == HTTPStatus.SERVICE_UNAVAILABLE
+    assert response.json()['message'] == MSG_SERVICE_BUSY
+    assert busy_hasher.stats()['rejected_total'] == 1
@@ -0,0 +1,179 @@
+import asyncio
+from datetime import date
+
+import pytest
+
+from users_app.cache.codecs import FORMAT_JSON, CacheSerializer, CodecError
+from users_app.cache.loader import CacheLoader, CacheTTL, Refresher, SingleFlight
+from users_app.cache.local import LocalCache
+from users_app.cache.module import RedisCache
+from users_app.cache.settings import redis_client
+from users_app.cache.two_tier import INVALIDATION_CHANNEL
+
+
+@pytest.mark.asyncio
+async def test_cache_codecs_interchangeable(session, fixture_user):
+    '''Checks that values written with any codec are read by processes with other settings.'''
+    for package in ('orjson', 'msgpack', 'lz4', 'zstandard'):
+        pytest.importorskip(package)
+    legacy_cache = RedisCache(redis_client)
+    await legacy_cache.set('user-legacy', fixture_user)
+    expected = await legacy_cache.get('user-legacy')
+    for codec, compression in (('orjson', 'zstd'), ('msgpack', ''), ('msgpack', 'lz4')):
+        writer = RedisCache(redis_client, CacheSerializer(codec, compression, compress_min_size=0))
+        await writer.set(f'user-{codec}', fixture_user)
+        assert await legacy_cache.get(f'user-{codec}') == expected
+        assert await writer.get('user-legacy') == expected
+
+
+def test_cache_serializer_json():
+    '''Checks that JSON values are written untagged, both forms are read and corrupt ones are misses.'''
+    serializer = CacheSerializer()
+    value = {'id': 1, 'birthday': date(1990, 1, 1), 'tags': ('a', 'b')}
+    expected = {'id': 1, 'birthday': '1990-01-01', 'tags': ['a', 'b']}
+    data = serializer.dumps(value)
+    tagged_data = bytes((FORMAT_JSON, 0)) + data
+    assert data == b'{"id":1,"birthday":"1990-01-01","tags":["a","b"]}'
+    assert serializer.loads(data) == expected
+    assert serializer.loads(tagged_data) == expected
+    for corrupt_data in (b'{"id":', tagged_data[:-1], bytes((FORMAT_JSON, 9)) + data):
+        with pytest.raises(CodecError):
+            serializer.loads(corrupt_data)
+    assert RedisCache(redis_client, serializer)._loads('user-corrupt', b'{"id":') is None
+
+
+@pytest.mark.asyncio
+async def test_cache_loader_coalesces_misses():
+    '''Checks that concurrent misses of a key load it once in worker and across workers with lock.'''
+    loads = 0
+
+    async def load():
+        nonlocal loads
+        loads += 1
+        await asyncio.sleep(0.1)
+        return {'id': loads}
+
+    cache = RedisCache(redis_client)
+    await cache.clear('user-coalesced', 'lock-user-coalesced')
+    workers = [
+        CacheLoader(cache, SingleFlight(), lock_client=redis_client, lock_ttl=1, lock_wait=1)
+        for _ in range(2)
+    ]
+    results = await asyncio.gather(*(
+        worker.get_or_load('user-coalesced', load) for worker in workers for _ in range(5)
+    ))
+    assert loads == 1
+    assert all(result == {'id': 1} for result in results)
+    assert await redis_client.exists('lock-user-coalesced') == 0
+
+
+@pytest.mark.asyncio
+async def test_cache_loader_serves_stale_value_while_refreshing():
+    '''Checks that value older than soft TTL is returned at once and refreshed once in background.'''
+    refreshes = 0
+
+    async def refresh():
+        nonlocal refreshes
+        refreshes += 1
+        return {'version': 2}
+
+    cache = RedisCache(redis_client)
+    loader = CacheLoader(cache, SingleFlight(), Refresher())
+    await cache.set('user-stale', {'version': 1}, expire_time=2)
+    ttl = CacheTTL(soft=1, hard=10)
+    results = await asyncio.gather(*(loader.get_or_load('user-stale', refresh, ttl, refresh) for _ in range(3)))
+    assert results == [{'version': 1}] * 3
+    await asyncio.sleep(0.1)
+    assert refreshes == 1
+    assert await cache.get('user-stale') == {'version': 2}
+
+
+@pytest.mark.asyncio
+async def test_cache_loader_drops_refresh_of_changed_value():
+    '''Checks that refresh does not bring back value cleared or rewritten while it was loaded.'''
+    release = asyncio.Event()
+
+    async def refresh():
+        await release.wait()
+        return {'version': 1}
+
+    cache = RedisCache(redis_client)
+    loader = CacheLoader(cache, SingleFlight(), Refresher())
+    ttl = CacheTTL(soft=1, hard=10)
+    for rewritten in (None, {'version': 2}):
+        release.clear()
+        await cache.set('user-raced', {'version': 1}, expire_time=2)
+        assert await loader.get_or_load('user-raced', refresh, ttl, refresh) == {'version': 1}
+        await cache.clear('user-raced')
+        if rewritten is not None:
+            await cache.set('user-raced', rewritten, expire_time=ttl.hard)
+        release.set()
+        await asyncio.sleep(0.1)
+        assert await cache.get('user-raced') == rewritten
+
+
+def test_local_cache_evicts_least_recently_used_and_expired():
+    '''Checks that local cache keeps recently used entries within its size and drops expired ones.'''
+    local_cache = LocalCache(max_size=2, expire_time=60)
+    local_cache.set('first', 1)
+    local_cache.set('second', 2)
+    local_cache.get('first')
+    local_cache.set('third', 3)
+    assert local_cache.get('second') == (False, None)
+    assert local_cache.get('first') == (True, 1)
+    assert local_cache.get('third') == (True, 3)
+    local_cache.set('expired', 4, expire_time=0)
+    assert local_cache.get('expired') == (False, None)
+    assert len(local_cache) == 1
+
+
+@pytest.mark.asyncio
+async def test_two_tier_cache_serves_local_copies(two_tier_factory, memory_cache):
+    '''Checks that values read once are served from local tier and counted per tier.'''
+    cache = two_tier_factory()
+    await cache.set('user-1', {'id': 1})
+    assert await cache.get('user-1') == {'id': 1}
+    assert await cache.get('user-1') == {'id': 1}
+    assert await cache.get('user-2') is None
+    assert memory_cache.reads == {'user-1': 1, 'user-2': 1}
+    assert cache.stats.as_dict() == {
+        'local_hits': 1,
+        'local_misses': 2,
+        'local_hit_ratio': 1 / 3,
+        'remote_hits': 1,
+        'remote_misses': 1,
+        'remote_hit_ratio': 0.5,
+    }
+
+
+@pytest.mark.asyncio
+async def test_two_tier_cache_keeps_remote_ttl(two_tier_factory, memory_cache):
+    '''Checks that local copies report time left in remote tier and do not outlive remote values.'''
+    cache = two_tier_factory(expire_time=60)
+    await cache.set('user-1', {'id': 1}, expire_time=30)
+    await cache.set('user-2', {'id': 2}, expire_time=0.05)
+    assert await cache.get_with_ttl('user-1') == ({'id': 1}, 30)
+    value, time_left = await cache.get_with_ttl('user-1')
+    assert value == {'id': 1}
+    assert 29 < time_left <= 30
+    await cache.get_with_ttl('user-2')
+    await asyncio.sleep(0.1)
+    assert cache.local_cache.get('user-2') == (False, None)
+    assert memory_cache.reads == {'user-1': 1, 'user-2': 1}
+
+
+@pytest.mark.asyncio
+async def test_two_tier_cache_invalidates_other_processes(two_tier_factory, broker, invalidation_listeners):
+    '''Checks that cleared keys and namespace versions are dropped from local tiers of all processes.'''
+    writer, reader = two_tier_factory(), two_tier_factory()
+    await invalidation_listeners(writer.local_cache, reader.local_cache)
+    await writer.set('user-1', {'id': 1})
+    await reader.get('user-1')
+    await reader.get_version('users')
+    await writer.clear('user-1')
+    await writer.invalidate('users')
+    await asyncio.sleep(0.01)
+    assert broker.published == [(INVALIDATION_CHANNEL, 'user-1'), (INVALIDATION_CHANNEL, 'version-users')]
+    assert reader.local_cache.get('user-1') == (False, None)
+    assert await reader.get('user-1') is None
+    assert await reader.get_version('users') == 1
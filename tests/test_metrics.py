@@ -0,0 +1,85 @@
+from http import HTTPStatus
+
+import pytest
+from fastapi import FastAPI
+from httpx import AsyncClient
+from sqlalchemy import text
+
+from users_app.api.v1.routers.constants import (
+    LOGIN,
+    METRICS,
+    PRIVATE_USER_DETAIL_FULL,
+    USER_DETAIL_FULL,
+)
+from users_app.main import app
+from users_app.middleware.metrics import MetricsMiddleware
+from users_app.middleware.profiling import ProfilingMiddleware
+from users_app.monitoring import metrics, profiling
+from users_app.monitoring.metrics import UNMATCHED_ROUTE
+from users_app.security.cifer import cifer
+from users_app.validation.schemas import Payload
+
+
+@pytest.mark.asyncio
+async def test_metrics(client, fixture_user, user_login_form, monkeypatch):
+    '''Checks that requests are counted per route, cache and database are measured and only scrapers get metrics.'''
+    pytest.importorskip('prometheus_client')
+    monkeypatch.setattr(metrics, 'TOKEN', 'scraper-token')
+    await client.post(LOGIN, json=user_login_form)
+    await client.get(USER_DETAIL_FULL)
+    await client.get(PRIVATE_USER_DETAIL_FULL.format(pk=fixture_user.id))
+    response = await client.get(METRICS)
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    response = await client.get(METRICS, headers={'Authorization': 'Bearer other-token'})
+    assert response.status_code == HTTPStatus.UNAUTHORIZED
+    response = await client.get(METRICS, headers={'Authorization': 'Bearer scraper-token'})
+    assert response.status_code == HTTPStatus.OK
+    assert f'route="{USER_DETAIL_FULL}",status="200"' in response.text
+    assert f'route="{PRIVATE_USER_DETAIL_FULL}",status="403"' in response.text
+    assert 'cache_hits_total{operation="get_with_ttl"}' in response.text
+    assert 'password_verify_duration_seconds_count' in response.text
+
+
+@pytest.mark.asyncio
+async def test_metrics_middleware_route_labels(request_metrics):
+    '''Checks that requests are labeled by route template, also those rejected before routing or unmatched.'''
+    token = cifer.encode(Payload(user_id=1, is_admin=False))
+    metrics_app = MetricsMiddleware(app, metrics=request_metrics, routes=app.routes)
+    async with AsyncClient(app=metrics_app, base_url='http://test') as client:
+        await client.get(PRIVATE_USER_DETAIL_FULL.format(pk=1), cookies={'jwt_token': token})
+        await client.get(PRIVATE_USER_DETAIL_FULL.format(pk=2))
+        await client.get('/unknown')
+        await client.request('BREW', '/unknown')
+        await client.request('PURGE', '/unknown')
+    assert request_metrics.latency.observed == [
+        ('GET', PRIVATE_USER_DETAIL_FULL, '403'),
+        ('GET', PRIVATE_USER_DETAIL_FULL, '401'),
+        ('GET', UNMATCHED_ROUTE, '404'),
+        ('OTHER', UNMATCHED_ROUTE, '404'),
+        ('OTHER', UNMATCHED_ROUTE, '404'),
+    ]
+    assert len(request_metrics.latency.children) == 4
+    assert request_metrics.in_progress.value == 0
+
+
+@pytest.mark.asyncio
+async def test_profiling_server_timing(db_engine):
+    '''Checks that statements of a request are counted in its `Server-Timing` header.'''
+    app = FastAPI()
+    app.add_middleware(ProfilingMiddleware)
+
+    @app.get('/profiled')
+    async def profiled():
+        async with db_engine.connect() as connection:
+            for _ in range(3):
+                await connection.execute(text('SELECT 1'))
+        return {}
+
+    profiling.attach(db_engine)
+    try:
+        async with AsyncClient(app=app, base_url='http://test') as client:
+            response = await client.get('/profiled')
+    finally:
+        profiling.detach(db_engine)
+    assert 'db;dur=' in response.headers['Server-Timing']
+    assert 'desc="3 queries"' in response.headers['Server-Timing']
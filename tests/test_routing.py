@@ -0,0 +1,72 @@
+import pytest
+from sqlalchemy import delete, insert, select
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from users_app.database.models import City
+from users_app.database.routing import (
+    CLIENT_PRIMARY_UNTIL,
+    PRIMARY,
+    ReplicaSet,
+    RoutingSession,
+    bind_client,
+    fresh_reads,
+    primary_reads,
+)
+
+
+@pytest.mark.asyncio
+async def test_reads_from_replica_until_write(replica_engine, routing_session):
+    '''Checks that session reads from replica and reads its own writes from primary.'''
+    async with replica_engine.begin() as connection:
+        await connection.execute(insert(City).values(name='Replica City'))
+    client_session = {}
+    bind_client(routing_session.sync_session, client_session)
+    query = select(City.name).where(City.name == 'Replica City')
+    try:
+        replica_read = await routing_session.scalar(query)
+        await routing_session.execute(insert(City).values(name='Primary City'))
+        primary_read = await routing_session.scalar(select(City.name).where(City.name == 'Primary City'))
+        primary_miss = await routing_session.scalar(query)
+    finally:
+        async with replica_engine.begin() as connection:
+            await connection.execute(delete(City).where(City.name == 'Replica City'))
+    assert replica_read == 'Replica City'
+    assert primary_read == 'Primary City'
+    assert primary_miss is None
+    assert CLIENT_PRIMARY_UNTIL in client_session
+
+
+def test_primary_reads_bypass_replicas():
+    '''Checks that reads of rows which are written next go to primary and do not pin session to it.'''
+    primary = create_async_engine('postgresql+asyncpg://primary/users_db')
+    replica = create_async_engine('postgresql+asyncpg://replica/users_db')
+    replicas = ReplicaSet([replica], max_lag=5)
+    replicas.lags = [0.0]
+    session = RoutingSession(bind=primary.sync_engine, info={'replicas': replicas})
+    query = select(City)
+    assert session.get_bind(clause=query) is replica.sync_engine
+    with primary_reads():
+        assert session.get_bind(clause=query) is primary.sync_engine
+    assert session.get_bind(clause=query) is replica.sync_engine
+    assert PRIMARY not in session.info
+    replicas.lags = [None]
+    assert session.get_bind(clause=query) is primary.sync_engine
+
+
+def test_fresh_reads_skip_replicas_behind_write():
+    '''Checks that reads which fill shared cache go to replicas which have replayed the latest write only.'''
+    primary = create_async_engine('postgresql+asyncpg://primary/users_db')
+    behind = create_async_engine('postgresql+asyncpg://behind/users_db')
+    caught_up = create_async_engine('postgresql+asyncpg://caught-up/users_db')
+    replicas = ReplicaSet([behind, caught_up], max_lag=5)
+    replicas.lags = [3.0, 0.0]
+    replicas.replayed_at = [97.0, 100.0]
+    session = RoutingSession(bind=primary.sync_engine, info={'replicas': replicas})
+    query = select(City)
+    with fresh_reads(99.0):
+        assert {session.get_bind(clause=query) for _ in range(4)} == {caught_up.sync_engine}
+    with fresh_reads(None):
+        assert {session.get_bind(clause=query) for _ in range(4)} == {behind.sync_engine, caught_up.sync_engine}
+    with fresh_reads(101.0):
+        assert session.get_bind(clause=query) is primary.sync_engine
+    assert PRIMARY not in session.info
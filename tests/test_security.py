@@ -0,0 +1,99 @@
+import asyncio
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import jwt
+import pytest
+
+from users_app.security.cifer import Cifer
+from users_app.security.hasher import HasherBusyError, PasswordHasher
+from users_app.validation.schemas import Payload
+
+
+@pytest.mark.asyncio
+async def test_hasher_rejects_jobs_over_queue():
+    '''Checks that jobs are rejected while workers are busy and queue is full, and are counted in stats.'''
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        hasher = PasswordHasher(executor, schema='bcrypt', max_workers=1, max_queue=0)
+        job = asyncio.create_task(hasher._run(release.wait))
+        await asyncio.sleep(0.01)
+        busy_stats = hasher.stats()
+        with pytest.raises(HasherBusyError):
+            await hasher.hash('password')
+        release.set()
+        await job
+        hashed_password = await hasher.hash('password')
+        assert await hasher.verify('password', hashed_password)
+    assert busy_stats['in_progress'] == 1
+    assert busy_stats['queue_depth'] == 0
+    assert hasher.stats()['in_progress'] == 0
+    assert hasher.stats()['tasks_total'] == 3
+    assert hasher.stats()['rejected_total'] == 1
+
+
+@pytest.mark.asyncio
+async def test_hasher_queues_jobs_within_bound():
+    '''Checks that jobs wait for a busy worker while there is a place in queue.'''
+    release = threading.Event()
+    with ThreadPoolExecutor(max_workers=1) as executor:
+        hasher = PasswordHasher(executor, schema='bcrypt', max_workers=1, max_queue=1)
+        job = asyncio.create_task(hasher._run(release.wait))
+        queued = asyncio.create_task(hasher._run(sum, (1, 2)))
+        await asyncio.sleep(0.01)
+        queue_depth = hasher.queue_depth
+        with pytest.raises(HasherBusyError):
+            await hasher._run(sum, (3, 4))
+        release.set()
+        await job
+        assert await queued == 3
+    assert queue_depth == 1
+    assert hasher.stats()['wait_time_max'] > 0
+
+
+def test_cifer_cache_serves_verified_tokens():
+    '''Checks that a token presented again is served from cache of verified tokens.'''
+    cifer = Cifer('secret', 'HS256', cache_size=2)
+    token = cifer.encode(Payload(user_id=1, is_admin=False))
+    payload = cifer.decode(token)
+    assert cifer.decode(token) is payload
+    assert payload == Payload(user_id=1, is_admin=False)
+    assert cifer.stats() == {'cache_size': 1, 'cache_hits': 1, 'cache_misses': 1}
+
+
+def test_cifer_cache_evicts_least_recently_used():
+    '''Checks that cache of verified tokens keeps at most `cache_size` tokens.'''
+    cifer = Cifer('secret', 'HS256', cache_size=2)
+    tokens = [cifer.encode(Payload(user_id=user_id, is_admin=False)) for user_id in range(3)]
+    for token in tokens:
+        cifer.decode(token)
+    cifer.decode(tokens[0])
+    assert cifer.stats() == {'cache_size': 2, 'cache_hits': 0, 'cache_misses': 4}
+
+
+def test_cifer_cache_rejects_expired_tokens():
+    '''Checks that cached token is rejected once it expires.'''
+    cifer = Cifer('secret', 'HS256', expire_time=1, cache_size=2)
+    token = cifer.encode(Payload(user_id=1, is_admin=False))
+    cifer.decode(token)
+    time.sleep(2)
+    with pytest.raises(jwt.ExpiredSignatureError):
+        cifer.decode(token)
+
+
+def test_cifer_cache_does_not_serve_forged_tokens():
+    '''Checks that tokens with the same claims but invalid signature are verified despite cached original.'''
+    cifer = Cifer('secret', 'HS256', cache_size=2)
+    payload = Payload(user_id=1, is_admin=True)
+    token = cifer.encode(payload)
+    cifer.decode(token)
+    forged_token = Cifer('other-secret', 'HS256').encode(payload)
+    header, claims, _ = token.split('.')
+    other_signature = cifer.encode(Payload(user_id=2, is_admin=False)).split('.')[2]
+    tampered_token = '.'.join((header, claims, other_signature))
+    for invalid_token in (forged_token, tampered_token):
+        with pytest.raises(jwt.InvalidSignatureError):
+            cifer.decode(invalid_token)
+    assert cifer.stats()['cache_hits'] == 0
+    assert cifer.decode(token) == payload
@@ -1,3 +1,4 @@
+from datetime import date
 from http import HTTPStatus
 
 import pytest
@@ -8,8 +9,12 @@ from users_app.api.v1.routers.constants import (
     USER_UPDATE_FULL,
     USERS_LIST_FULL,
 )
+from users_app.database.crud.users import UserCRUD
+from users_app.exceptions.constants import MSG_INVALID_CURSOR, MSG_SEARCH_SORT
+from users_app.security.hasher import hasher
 from users_app.validation.schemas import (
     CurrentUserResponseModel,
+    PrivateCreateUserModel,
     UpdateUserResponseModel,
     UsersListResponseModel,
 )
@@ -67,3 +72,155 @@ async def test_update_current(client, fixture_user, user_login_form):
     assert response.json()['last_name'] == fixture_user.last_name
     assert response.json()['phone'] == ''
     assert response.json()['birthday'] is None
+
+
+@pytest.mark.asyncio
+async def test_get_list_with_cursor(client, fixture_user, fixture_admin, user_login_form):
+    '''Checks keyset pagination of `users_list` endpoint.'''
+    await client.post(LOGIN, json=user_login_form)
+    first_page = await client.get(USERS_LIST_FULL, params={'size': 1})
+    next_cursor = first_page.json()['meta']['pagination']['next_cursor']
+    second_page = await client.get(USERS_LIST_FULL, params={'size': 1, 'after': next_cursor})
+    next_cursor = second_page.json()['meta']['pagination']['next_cursor']
+    last_page = await client.get(USERS_LIST_FULL, params={'size': 1, 'after': next_cursor})
+    assert first_page.status_code == HTTPStatus.OK
+    assert second_page.status_code == HTTPStatus.OK
+    assert first_page.json()['data'][0]['id'] == fixture_user.id
+    assert second_page.json()['data'][0]['id'] == fixture_admin.id
+    assert last_page.json()['data'] == []
+    assert last_page.json()['meta']['pagination']['next_cursor'] is None
+
+
+@pytest.mark.asyncio
+async def test_get_list_with_invalid_cursor(client, fixture_user, user_login_form):
+    '''Checks `Bad request` response of `users_list` endpoint with malformed cursor.'''
+    await client.post(LOGIN, json=user_login_form)
+    response = await client.get(USERS_LIST_FULL, params={'size': 1, 'after': 'not-a-cursor'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()['message'] == MSG_INVALID_CURSOR
+
+
+@pytest.mark.asyncio
+async def test_get_list_search(client, fixture_user, fixture_admin, user_login_form):
+    '''Checks search of `users_list` endpoint by name prefix and by similar email.'''
+    await client.post(LOGIN, json=user_login_form)
+    by_prefix = await client.get(USERS_LIST_FULL, params={'size': 10, 'q': 'Han'})
+    by_typo = await client.get(USERS_LIST_FULL, params={'size': 10, 'q': 'pit@example.com'})
+    assert by_prefix.status_code == HTTPStatus.OK
+    assert [user['id'] for user in by_prefix.json()['data']] == [fixture_admin.id]
+    assert by_prefix.json()['meta']['pagination']['total'] == 1
+    assert by_typo.json()['data'][0]['id'] == fixture_user.id
+
+
+@pytest.mark.asyncio
+async def test_get_list_blank_search(client, fixture_user, fixture_admin, user_login_form):
+    '''Checks that blank `q` of `users_list` endpoint is ignored and its length is checked after stripping.'''
+    await client.post(LOGIN, json=user_login_form)
+    listed = await client.get(USERS_LIST_FULL, params={'size': 10})
+    for blank in ('', '   '):
+        response = await client.get(USERS_LIST_FULL, params={'size': 10, 'q': blank})
+        assert response.status_code == HTTPStatus.OK
+        assert response.json() == listed.json()
+    response = await client.get(USERS_LIST_FULL, params={'size': 10, 'q': ' H '})
+    assert response.status_code == HTTPStatus.UNPROCESSABLE_ENTITY
+    assert response.json()['detail'][0]['loc'] == ['query', 'q']
+    response = await client.get(USERS_LIST_FULL, params={'size': 10, 'q': ' Han '})
+    assert [user['id'] for user in response.json()['data']] == [fixture_admin.id]
+
+
+@pytest.mark.asyncio
+async def test_get_list_search_with_cursor(client, fixture_user, fixture_admin, user_login_form):
+    '''Checks keyset pagination of ranked search results of `users_list` endpoint.'''
+    await client.post(LOGIN, json=user_login_form)
+    params = {'size': 1, 'q': 'example.com'}
+    first_page = await client.get(USERS_LIST_FULL, params=params)
+    next_cursor = first_page.json()['meta']['pagination']['next_cursor']
+    second_page = await client.get(USERS_LIST_FULL, params={**params, 'after': next_cursor})
+    next_cursor = second_page.json()['meta']['pagination']['next_cursor']
+    last_page = await client.get(USERS_LIST_FULL, params={**params, 'after': next_cursor})
+    found_ids = {first_page.json()['data'][0]['id'], second_page.json()['data'][0]['id']}
+    assert found_ids == {fixture_user.id, fixture_admin.id}
+    assert last_page.json()['data'] == []
+
+
+@pytest.mark.asyncio
+async def test_get_list_filtered(client, fixture_user, fixture_admin, user_login_form):
+    '''Checks filters of `users_list` endpoint and quantity of matching users.'''
+    await client.post(LOGIN, json=user_login_form)
+    admins = await client.get(USERS_LIST_FULL, params={'size': 10, 'is_admin': True})
+    no_birthday = await client.get(USERS_LIST_FULL, params={'size': 10, 'birthday_from': '1990-01-01'})
+    assert admins.status_code == HTTPStatus.OK
+    assert [user['id'] for user in admins.json()['data']] == [fixture_admin.id]
+    assert admins.json()['meta']['pagination']['total'] == 1
+    assert no_birthday.json()['data'] == []
+    assert no_birthday.json()['meta']['pagination']['total'] == 0
+
+
+@pytest.mark.asyncio
+async def test_get_list_sorted_with_cursor(client, fixture_user, fixture_admin, user_login_form):
+    '''Checks keyset pagination of `users_list` endpoint sorted by last name in both directions.'''
+    await client.post(LOGIN, json=user_login_form)
+    pages = {}
+    for sort in ('last_name', '-last_name'):
+        first_page = await client.get(USERS_LIST_FULL, params={'size': 1, 'sort': sort})
+        next_cursor = first_page.json()['meta']['pagination']['next_cursor']
+        second_page = await client.get(USERS_LIST_FULL, params={'size': 1, 'sort': sort, 'after': next_cursor})
+        pages[sort] = [first_page.json()['data'][0]['id'], second_page.json()['data'][0]['id']]
+    assert pages['last_name'] == [fixture_admin.id, fixture_user.id]
+    assert pages['-last_name'] == [fixture_user.id, fixture_admin.id]
+
+
+@pytest.mark.asyncio
+async def test_get_list_sorted_by_birthday_with_cursor(
+    client, session, fixture_user, fixture_admin, user_login_form, user_data,
+):
+    '''Checks keyset pagination of `users_list` endpoint by birthday across users without it.'''
+    dated_user = await UserCRUD(session).create(
+        PrivateCreateUserModel(**{**user_data, 'email': 'dated@example.com', 'birthday': date(1956, 7, 9)}),
+        await hasher.hash(user_data['password']),
+    )
+    await client.post(LOGIN, json=user_login_form)
+    pages = {}
+    for sort in ('birthday', '-birthday'):
+        pages[sort] = []
+        params = {'size': 1, 'sort': sort}
+        for _ in range(3):
+            response = await client.get(USERS_LIST_FULL, params=params)
+            pages[sort] += [user['id'] for user in response.json()['data']]
+            params['after'] = response.json()['meta']['pagination']['next_cursor']
+    assert pages['birthday'] == [dated_user.id, fixture_user.id, fixture_admin.id]
+    assert pages['-birthday'] == [fixture_admin.id, fixture_user.id, dated_user.id]
+
+
+@pytest.mark.asyncio
+async def test_get_list_search_with_sort(client, fixture_user, user_login_form):
+    '''Checks `Bad request` response of `users_list` endpoint when search results are sorted.'''
+    await client.post(LOGIN, json=user_login_form)
+    response = await client.get(USERS_LIST_FULL, params={'size': 1, 'q': 'Pitt', 'sort': 'last_name'})
+    assert response.status_code == HTTPStatus.BAD_REQUEST
+    assert response.json()['message'] == MSG_SEARCH_SORT
+
+
+@pytest.mark.asyncio
+async def test_get_list_without_total(client, fixture_user, user_login_form):
+    '''Checks response of `users_list` endpoint when total is not requested.'''
+    await client.post(LOGIN, json=user_login_form)
+    response = await client.get(USERS_LIST_FULL, params={'size': 1, 'with_total': False})
+    assert response.status_code == HTTPStatus.OK
+    assert len(response.json()['data']) == 1
+    assert response.json()['meta']['pagination']['total'] is None
+
+
+@pytest.mark.asyncio
+async def test_fast_serialization(client, fixture_user, user_login_form, query_params, monkeypatch):
+    '''Checks that fast serialization mode returns the same responses as validated one.'''
+    await client.post(LOGIN, json=user_login_form)
+    validated_list = await client.get(USERS_LIST_FULL, params=query_params.dict())
+    validated_detail = await client.get(USER_DETAIL_FULL)
+    monkeypatch.setattr('users_app.services.users.FAST_SERIALIZATION', True)
+    fast_list = await client.get(USERS_LIST_FULL, params=query_params.dict())
+    fast_detail = await client.get(USER_DETAIL_FULL)
+    assert fast_list.status_code == HTTPStatus.OK
+    assert fast_list.json() == validated_list.json()
+    assert fast_detail.status_code == HTTPStatus.OK
+    assert fast_detail.json() == validated_detail.json()
@@ -1,25 +1,48 @@
 from http import HTTPStatus
 
-from fastapi import APIRouter, Depends
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, Query, Request
+from fastapi.responses import JSONResponse, StreamingResponse
 
+from config import MAX_PAGE_SIZE
 from users_app.api.v1.routers.constants import (
     PRIVATE_PREFIX,
     PRIVATE_USER_CREATE,
     PRIVATE_USER_DELETE,
     PRIVATE_USER_DETAIL,
     PRIVATE_USER_UPDATE,
+    PRIVATE_USERS_BATCH,
+    PRIVATE_USERS_BULK_CREATE,
+    PRIVATE_USERS_BULK_DELETE,
+    PRIVATE_USERS_BULK_UPDATE,
+    PRIVATE_USERS_EXPORT,
     PRIVATE_USERS_LIST,
 )
-from users_app.exceptions.constants import E400_401_403, E400_401_403_404, E401_403
+from users_app.exceptions.constants import (
+    E400_401_403,
+    E400_401_403_404,
+    E400_401_403_415,
+    E401_403,
+)
+from users_app.services.exports import EXPORT_MEDIA_TYPES
 from users_app.services.users import UserService, get_user_service
 from users_app.validation.schemas import (
+    BulkImportResponseModel,
+    BulkUsersResponseModel,
+    ExportQueryParams,
+    PrivateBulkDeleteUsersModel,
     PrivateCreateUserModel,
     PrivateDetailUserResponseModel,
     PrivateUpdateUserModel,
+    PrivateUsersBatchResponseModel,
     PrivateUsersListResponseModel,
     QueryParams,
 )
+from users_app.validation.serializers import (
+    render,
+    serialize_private_user,
+    serialize_users_batch,
+    serialize_users_list,
+)
 
 router = APIRouter(
     prefix=PRIVATE_PREFIX,
@@ -40,7 +63,7 @@ async def private_user_list(
 ) -> PrivateUsersListResponseModel:
     '''Shows user's info list with pagination.'''
     users_list = await user_service.get_list_private(query)
-    return users_list
+    return render(users_list, serialize_users_list, fast=user_service.fast_serialization)
 
 
 @router.post(
@@ -56,7 +79,99 @@ async def private_user_create(
 ) -> PrivateDetailUserResponseModel:
     '''Creates a user.'''
     new_user = await user_service.create(data=data)
-    return new_user
+    return render(new_user, serialize_private_user, HTTPStatus.CREATED, fast=user_service.fast_serialization)
+
+
+@router.post(
+    path=PRIVATE_USERS_BULK_CREATE,
+    status_code=HTTPStatus.OK,
+    response_model=BulkImportResponseModel,
+    summary='Массовое создание пользователей из NDJSON или CSV',
+    responses=E400_401_403_415,
+    openapi_extra={
+        'requestBody': {
+            'required': True,
+            'content': {
+                'application/x-ndjson': {'schema': {'type': 'string'}},
+                'text/csv': {'schema': {'type': 'string'}},
+            },
+        },
+    },
+)
+async def private_users_bulk_create(
+    request: Request,
+    user_service: UserService = Depends(get_user_service),
+) -> BulkImportResponseModel:
+    '''Creates users from streamed body, one user per line.'''
+    return await user_service.bulk_create(
+        chunks=request.stream(),
+        content_type=request.headers.get('content-type', ''),
+    )
+
+
+@router.get(
+    path=PRIVATE_USERS_EXPORT,
+    status_code=HTTPStatus.OK,
+    response_class=StreamingResponse,
+    summary='Выгрузка всех пользователей в NDJSON или CSV',
+    responses=E401_403,
+)
+async def private_users_export(
+    query: ExportQueryParams = Depends(),
+    user_service: UserService = Depends(get_user_service),
+) -> StreamingResponse:
+    '''Streams all users, one user per line.'''
+    return StreamingResponse(
+        content=user_service.export(query.format),
+        media_type=EXPORT_MEDIA_TYPES[query.format],
+        headers={'Content-Disposition': f'attachment; filename="users.{query.format}"'},
+    )
+
+
+@router.patch(
+    path=PRIVATE_USERS_BULK_UPDATE,
+    status_code=HTTPStatus.OK,
+    response_model=BulkUsersResponseModel,
+    summary='Массовое изменение информации о пользователях',
+    responses=E400_401_403,
+)
+async def private_users_bulk_update(
+    data: list[PrivateUpdateUserModel],
+    user_service: UserService = Depends(get_user_service),
+) -> BulkUsersResponseModel:
+    '''Updates many users at once, reports result for each of them.'''
+    return await user_service.bulk_update(items=data)
+
+
+@router.post(
+    path=PRIVATE_USERS_BULK_DELETE,
+    status_code=HTTPStatus.OK,
+    response_model=BulkUsersResponseModel,
+    summary='Массовое удаление пользователей',
+    responses=E401_403,
+)
+async def private_users_bulk_delete(
+    data: PrivateBulkDeleteUsersModel,
+    user_service: UserService = Depends(get_user_service),
+) -> BulkUsersResponseModel:
+    '''Deletes many users at once, reports result for each of them.'''
+    return await user_service.bulk_delete(user_ids=data.ids)
+
+
+@router.get(
+    path=PRIVATE_USERS_BATCH,
+    status_code=HTTPStatus.OK,
+    response_model=PrivateUsersBatchResponseModel,
+    summary='Детальное получение информации о нескольких пользователях',
+    responses=E401_403,
+)
+async def private_users_batch(
+    ids: list[int] = Query(min_items=1, max_items=int(MAX_PAGE_SIZE)),
+    user_service: UserService = Depends(get_user_service),
+) -> PrivateUsersBatchResponseModel:
+    '''Shows detail info about users with given ids.'''
+    users = await user_service.get_many(user_ids=ids)
+    return render(users, serialize_users_batch, fast=user_service.fast_serialization)
 
 
 @router.get(
@@ -72,7 +187,7 @@ async def private_user_detail(
 ) -> PrivateDetailUserResponseModel:
     '''Shows detail info about specific user.'''
     user = await user_service.get_detail(user_id=pk)
-    return user
+    return render(user, serialize_private_user, fast=user_service.fast_serialization)
 
 
 @router.patch(
@@ -89,7 +204,7 @@ async def private_user_update(
 ) -> PrivateDetailUserResponseModel:
     '''Update info about specific user.'''
     updated_user = await user_service.update(user_id=pk, data=data)
-    return updated_user
+    return render(updated_user, serialize_private_user, fast=user_service.fast_serialization)
 
 
 @router.delete(
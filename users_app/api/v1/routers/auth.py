@@ -1,10 +1,10 @@
 from http import HTTPStatus
 
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, Request
 from fastapi.responses import JSONResponse
 
 from users_app.api.v1.routers.constants import LOGIN, LOGOUT, MSG_LOGGED_OUT
-from users_app.exceptions.constants import E400
+from users_app.exceptions.constants import E400_429
 from users_app.services.auth import AuthService, get_auth_service
 from users_app.validation.schemas import CurrentUserResponseModel, LoginModel, Payload
 
@@ -19,19 +19,21 @@ router = APIRouter(
     status_code=HTTPStatus.OK,
     response_model=CurrentUserResponseModel,
     summary='Вход в систему',
-    responses=E400,
+    responses=E400_429,
 )
 async def login(
+    request: Request,
     credentials: LoginModel,
     response: JSONResponse,
     auth_service: AuthService = Depends(get_auth_service),
 ) -> CurrentUserResponseModel:
     '''Log in to the system.'''
 
-    user = await auth_service.authenticate_user(credentials)
+    client = request.client.host if request.client else None
+    user = await auth_service.authenticate_user(credentials, client=client)
     payload = Payload(user_id=user.id, is_admin=user.is_admin)
     session_token = await auth_service.encode_token(payload=payload)
-    response.set_cookie(key='jwt_token', value=session_token, expires=3600, httponly=True)
+    response.set_cookie(key='jwt_token', value=session_token, expires=auth_service.cifer.expire_time, httponly=True)
     return user
 
 
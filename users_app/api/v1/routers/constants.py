@@ -12,14 +12,27 @@ USERS_LIST_FULL = USER_PREFIX + USER_LIST
 USER_DETAIL_FULL = USER_PREFIX + USER_DETAIL
 USER_UPDATE_FULL = USER_PREFIX + USER_UPDATE
 
+# Metrics
+METRICS = '/metrics'
+
 # Admin
 PRIVATE_PREFIX = '/private'
 
 PRIVATE_USERS_LIST = PRIVATE_USER_CREATE = '/users'
+PRIVATE_USERS_BULK_CREATE = '/users/bulk'
+PRIVATE_USERS_EXPORT = '/users/export'
+PRIVATE_USERS_BATCH = '/users/batch'
+PRIVATE_USERS_BULK_UPDATE = '/users/bulk-update'
+PRIVATE_USERS_BULK_DELETE = '/users/bulk-delete'
 PRIVATE_USER_DETAIL = PRIVATE_USER_UPDATE = PRIVATE_USER_DELETE = '/users/{pk}'
 
 PRIVATE_USERS_LIST_FULL = PRIVATE_PREFIX + PRIVATE_USERS_LIST
 PRIVATE_USER_CREATE_FULL = PRIVATE_PREFIX + PRIVATE_USER_CREATE
+PRIVATE_USERS_BULK_CREATE_FULL = PRIVATE_PREFIX + PRIVATE_USERS_BULK_CREATE
+PRIVATE_USERS_EXPORT_FULL = PRIVATE_PREFIX + PRIVATE_USERS_EXPORT
+PRIVATE_USERS_BATCH_FULL = PRIVATE_PREFIX + PRIVATE_USERS_BATCH
+PRIVATE_USERS_BULK_UPDATE_FULL = PRIVATE_PREFIX + PRIVATE_USERS_BULK_UPDATE
+PRIVATE_USERS_BULK_DELETE_FULL = PRIVATE_PREFIX + PRIVATE_USERS_BULK_DELETE
 PRIVATE_USER_DETAIL_FULL = PRIVATE_PREFIX + PRIVATE_USER_DETAIL
 PRIVATE_USER_UPDATE_FULL = PRIVATE_PREFIX + PRIVATE_USER_UPDATE
 PRIVATE_USER_DELETE_FULL = PRIVATE_PREFIX + PRIVATE_USER_DELETE
@@ -0,0 +1,37 @@
+import secrets
+from http import HTTPStatus
+
+from fastapi import APIRouter, Depends, HTTPException, Response
+from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
+
+from users_app.api.v1.routers.constants import METRICS
+from users_app.exceptions.constants import MSG_NOT_AUTHENTICATED
+from users_app.monitoring import metrics as monitoring
+
+router = APIRouter(
+    tags=['metrics'],
+)
+bearer = HTTPBearer(auto_error=False)
+
+
+def check_token(credentials: HTTPAuthorizationCredentials | None = Depends(bearer)) -> None:
+    '''Checks that scraper presents the configured static bearer token.'''
+    token = credentials.credentials if credentials is not None else ''
+    if not monitoring.TOKEN or not secrets.compare_digest(token.encode(), monitoring.TOKEN.encode()):
+        raise HTTPException(
+            status_code=HTTPStatus.UNAUTHORIZED,
+            detail=MSG_NOT_AUTHENTICATED,
+            headers={'WWW-Authenticate': 'Bearer'},
+        )
+
+
+@router.get(
+    path=METRICS,
+    status_code=HTTPStatus.OK,
+    summary='Метрики Prometheus',
+    include_in_schema=False,
+    dependencies=[Depends(check_token)],
+)
+async def metrics() -> Response:
+    '''Get metrics of all worker processes in Prometheus text format, only for scrapers with the token.'''
+    return Response(content=monitoring.generate_latest(), headers={'Content-Type': monitoring.CONTENT_TYPE})
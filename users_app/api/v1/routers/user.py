@@ -1,6 +1,6 @@
 from http import HTTPStatus
 
-from fastapi import APIRouter, Depends, Request
+from fastapi import APIRouter, Depends
 
 from users_app.api.v1.routers.constants import (
     USER_DETAIL,
@@ -9,15 +9,22 @@ from users_app.api.v1.routers.constants import (
     USER_UPDATE,
 )
 from users_app.exceptions.constants import E400_401, E400_401_404
-from users_app.services.auth import AuthService, get_auth_service
+from users_app.services.auth import get_payload
 from users_app.services.users import UserService, get_user_service
 from users_app.validation.schemas import (
     CurrentUserResponseModel,
+    Payload,
     QueryParams,
     UpdateUserModel,
     UpdateUserResponseModel,
     UsersListResponseModel,
 )
+from users_app.validation.serializers import (
+    render,
+    serialize_current_user,
+    serialize_updated_user,
+    serialize_users_list,
+)
 
 router = APIRouter(
     prefix=USER_PREFIX,
@@ -38,7 +45,7 @@ async def users_list(
 ) -> UsersListResponseModel:
     '''Shows user's info list with pagination.'''
     users_list = await user_service.get_list(query)
-    return users_list
+    return render(users_list, serialize_users_list, fast=user_service.fast_serialization)
 
 
 @router.get(
@@ -49,14 +56,12 @@ async def users_list(
     responses=E400_401,
 )
 async def user_detail(
-    request: Request,
+    payload: Payload = Depends(get_payload),
     user_service: UserService = Depends(get_user_service),
-    auth_service: AuthService = Depends(get_auth_service),
 ) -> CurrentUserResponseModel:
     '''Shows info about current logged in user.'''
-    jwt = await auth_service.check_jwt(request)
-    user_id = jwt['user_id']
-    return await user_service.get_detail(user_id=user_id)
+    user = await user_service.get_detail(user_id=payload.user_id)
+    return render(user, serialize_current_user, fast=user_service.fast_serialization)
 
 
 @router.patch(
@@ -67,12 +72,10 @@ async def user_detail(
     responses=E400_401_404,
 )
 async def user_update(
-    request: Request,
     data: UpdateUserModel,
+    payload: Payload = Depends(get_payload),
     user_service: UserService = Depends(get_user_service),
-    auth_service: AuthService = Depends(get_auth_service),
 ) -> UpdateUserResponseModel:
     '''Update info about current logged in user.'''
-    jwt = await auth_service.check_jwt(request)
-    user_id = jwt['user_id']
-    return await user_service.update(user_id=user_id, data=data)
+    updated_user = await user_service.update(user_id=payload.user_id, data=data)
+    return render(updated_user, serialize_updated_user, fast=user_service.fast_serialization)
@@ -10,10 +10,46 @@ class AbstractCache(ABC):
     async def get(self, *args, **kwargs):
         raise NotImplementedError
 
+    @abstractmethod
+    async def get_with_ttl(self, *args, **kwargs):
+        raise NotImplementedError
+
     @abstractmethod
     async def set(self, *args, **kwargs):
         raise NotImplementedError
 
+    @abstractmethod
+    async def set_if_unchanged(self, *args, **kwargs):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_many(self, *args, **kwargs):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_many(self, *args, **kwargs):
+        raise NotImplementedError
+
     @abstractmethod
     async def clear(self, *args, **kwargs):
         raise NotImplementedError
+
+    @abstractmethod
+    async def get_version(self, *args, **kwargs):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def invalidate(self, *args, **kwargs):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_counter(self, *args, **kwargs):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def set_counter(self, *args, **kwargs):
+        raise NotImplementedError
+
+    @abstractmethod
+    async def incr_counter(self, *args, **kwargs):
+        raise NotImplementedError
@@ -0,0 +1,182 @@
+import json
+from datetime import date, datetime, time
+from decimal import Decimal
+from enum import Enum
+from uuid import UUID
+
+from pydantic import BaseModel
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover
+    orjson = None
+try:
+    import msgpack
+except ImportError:  # pragma: no cover
+    msgpack = None
+try:
+    import lz4.frame
+except ImportError:  # pragma: no cover
+    lz4 = None
+try:
+    import zstandard
+except ImportError:  # pragma: no cover
+    zstandard = None
+
+# First byte of tagged values, never a first byte of JSON text.
+FORMAT_JSON = 1
+FORMAT_MSGPACK = 2
+COMPRESSION_NONE = 0
+COMPRESSION_LZ4 = 1
+COMPRESSION_ZSTD = 2
+
+
+class CodecError(Exception):
+    '''Raised when cached value can not be decoded by this process.'''
+
+
+def to_builtins(obj):
+    '''Converts value unknown to serializers, as `jsonable_encoder` does for cached values.'''
+    if isinstance(obj, BaseModel):
+        return obj.dict()
+    if isinstance(obj, (date, datetime, time)):
+        return obj.isoformat()
+    if isinstance(obj, Enum):
+        return obj.value
+    if isinstance(obj, UUID):
+        return str(obj)
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset, tuple)):
+        return list(obj)
+    if hasattr(obj, '__dict__'):
+        # ORM instances, without SQLAlchemy internal state.
+        return {key: value for key, value in vars(obj).items() if not key.startswith('_sa')}
+    raise TypeError(f'Object of type {type(obj).__name__} is not serializable')
+
+
+class JSONCodec:
+    '''Stdlib JSON serializer, writes values readable by any version of the application.'''
+
+    format = FORMAT_JSON
+
+    def dumps(self, value) -> bytes:
+        '''Returns serialized value.'''
+        return json.dumps(value, default=to_builtins, separators=(',', ':')).encode()
+
+    def loads(self, data: bytes):
+        '''Returns deserialized value.'''
+        return json.loads(data)
+
+
+class ORJSONCodec(JSONCodec):
+    '''`orjson` serializer, values are interchangeable with `JSONCodec` ones.'''
+
+    def dumps(self, value) -> bytes:
+        '''Returns serialized value.'''
+        return orjson.dumps(value, default=to_builtins, option=orjson.OPT_NON_STR_KEYS)
+
+    def loads(self, data: bytes):
+        '''Returns deserialized value.'''
+        return orjson.loads(data)
+
+
+class MsgpackCodec:
+    '''`msgpack` serializer.'''
+
+    format = FORMAT_MSGPACK
+
+    def dumps(self, value) -> bytes:
+        '''Returns serialized value.'''
+        return msgpack.packb(value, default=to_builtins)
+
+    def loads(self, data: bytes):
+        '''Returns deserialized value.'''
+        return msgpack.unpackb(data)
+
+
+CODECS = {
+    'json': (JSONCodec, lambda: True),
+    'orjson': (ORJSONCodec, lambda: orjson is not None),
+    'msgpack': (MsgpackCodec, lambda: msgpack is not None),
+}
+COMPRESSIONS = {
+    '': COMPRESSION_NONE,
+    'lz4': COMPRESSION_LZ4,
+    'zstd': COMPRESSION_ZSTD,
+}
+
+
+class CacheSerializer:
+    '''Encodes cached values with chosen codec and compresses large ones.
+
+    Values are prefixed with format and compression tags, so every process decodes values
+    written with any settings, as long as the needed library is installed. Plain JSON values
+    are written untagged, they are readable by processes without this layer as well,
+    which allows to switch codec with rolling deploy: untagged JSON first, the new codec next.
+    '''
+
+    def __init__(self, codec: str = 'json', compression: str = '', compress_min_size: int = 1024) -> None:
+        '''Init `CacheSerializer` instance, fails early if chosen libraries are not installed.'''
+        if codec not in CODECS:
+            raise ValueError(f'Unknown cache codec {codec!r}, use one of {", ".join(CODECS)}.')
+        codec_class, is_available = CODECS[codec]
+        if not is_available():
+            raise ValueError(f'Cache codec {codec!r} requires `{codec}` package.')
+        if compression not in COMPRESSIONS:
+            raise ValueError(f'Unknown cache compression {compression!r}, use lz4 or zstd.')
+        if compression == 'lz4' and lz4 is None or compression == 'zstd' and zstandard is None:
+            raise ValueError(f'Cache compression {compression!r} requires `{compression}` package.')
+        self.codec = codec_class()
+        self.compression = COMPRESSIONS[compression]
+        self.compress_min_size = compress_min_size
+        self._json = JSONCodec() if orjson is None else ORJSONCodec()
+
+    def dumps(self, value) -> bytes:
+        '''Returns serialized value.'''
+        data = self.codec.dumps(value)
+        compression = COMPRESSION_NONE
+        if self.compression != COMPRESSION_NONE and len(data) >= self.compress_min_size:
+            compression = self.compression
+            data = _compress(data, compression)
+        if self.codec.format == FORMAT_JSON and compression == COMPRESSION_NONE:
+            return data
+        return bytes((self.codec.format, compression)) + data
+
+    def loads(self, data: bytes):
+        '''Returns deserialized value, raises `CodecError` if it can not be decoded.'''
+        try:
+            if data[0] not in (FORMAT_JSON, FORMAT_MSGPACK):
+                return self._json.loads(data)
+            value_format, compression, data = data[0], data[1], data[2:]
+            if compression != COMPRESSION_NONE:
+                data = _decompress(data, compression)
+            if value_format == FORMAT_JSON:
+                return self._json.loads(data)
+            if msgpack is None:
+                raise CodecError('msgpack package is not installed')
+            return msgpack.unpackb(data)
+        except CodecError:
+            raise
+        except Exception as exc:
+            raise CodecError(str(exc)) from exc
+
+
+def _compress(data: bytes, compression: int) -> bytes:
+    '''Compresses data with given algorithm.'''
+    if compression == COMPRESSION_LZ4:
+        return lz4.frame.compress(data)
+    return zstandard.ZstdCompressor().compress(data)
+
+
+def _decompress(data: bytes, compression: int) -> bytes:
+    '''Decompresses data with given algorithm.'''
+    if compression == COMPRESSION_LZ4:
+        if lz4 is None:
+            raise CodecError('lz4 package is not installed')
+        return lz4.frame.decompress(data)
+    if compression == COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise CodecError('zstandard package is not installed')
+        return zstandard.ZstdDecompressor().decompress(data)
+    raise CodecError(f'unknown compression {compression}')
@@ -0,0 +1,194 @@
+import asyncio
+import logging
+import time
+import uuid
+from typing import Awaitable, Callable, NamedTuple
+
+from aioredis.client import Redis
+
+from users_app.cache.abstract_cache import AbstractCache
+
+RELEASE_LOCK_SCRIPT = '''
+if redis.call('GET', KEYS[1]) == ARGV[1] then
+    return redis.call('DEL', KEYS[1])
+end
+return 0
+'''
+LOCK_POLL_INTERVAL = 0.05
+
+logger = logging.getLogger(__name__)
+
+
+class CacheTTL(NamedTuple):
+    '''Expiration of values of a key family.
+
+    Values older than `soft` seconds are served while they are refreshed in background,
+    values are dropped after `hard` seconds.
+    '''
+
+    soft: int
+    hard: int
+
+
+class SingleFlight:
+    '''Coalesces concurrent calls for the same key in process into a single one.'''
+
+    def __init__(self) -> None:
+        '''Init `SingleFlight` instance.'''
+        self._calls: dict[str, asyncio.Future] = {}
+
+    async def do(self, key: str, call: Callable[[], Awaitable]):
+        '''Returns result of `call`, awaits the one in flight for the same key if there is one.
+
+        Callers share the result or exception, if the calling request is cancelled,
+        one of those waiting makes the call again.
+        '''
+        while True:
+            future = self._calls.get(key)
+            if future is None:
+                break
+            await asyncio.wait([future])
+            if not future.cancelled():
+                return future.result()
+        future = asyncio.get_running_loop().create_future()
+        self._calls[key] = future
+        try:
+            result = await call()
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as exc:
+            future.set_exception(exc)
+            # Exception is raised to the caller, waiting ones may not exist.
+            future.exception()
+            raise
+        else:
+            future.set_result(result)
+            return result
+        finally:
+            del self._calls[key]
+
+
+class Refresher:
+    '''Runs background refreshes, at most one for a key at a time.'''
+
+    def __init__(self) -> None:
+        '''Init `Refresher` instance.'''
+        self._tasks: dict[str, asyncio.Task] = {}
+
+    def schedule(self, key: str, call: Callable[[], Awaitable]) -> None:
+        '''Starts `call` in background unless refresh of key is already running.'''
+        if key in self._tasks:
+            return
+        self._tasks[key] = asyncio.create_task(self._run(key, call))
+
+    async def stop(self) -> None:
+        '''Cancels running refreshes.'''
+        tasks = list(self._tasks.values())
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+
+    async def _run(self, key: str, call: Callable[[], Awaitable]) -> None:
+        '''Runs refresh, its failure leaves stale value to expire.'''
+        try:
+            await call()
+        except Exception as exc:
+            logger.warning('Cached value %s refresh failed: %s', key, exc)
+        finally:
+            del self._tasks[key]
+
+
+class CacheLoader:
+    '''Reads values through cache, concurrent misses of a key load it once.
+
+    Misses are coalesced in process, with `lock_client` also across processes by a short
+    Redis lock: the process holding it loads the value, the others wait for it to be cached
+    up to `lock_wait` seconds and load it themselves after that.
+    Stale values are served at once and refreshed by `refresher`, with lock only by one process.
+    Refreshed value is not cached if the key was cleared or written again while it was loaded.
+    '''
+
+    def __init__(self, cache: AbstractCache, flights: SingleFlight, refresher: Refresher | None = None,
+                 lock_client: Redis | None = None, lock_ttl: float = 5.0, lock_wait: float = 5.0) -> None:
+        '''Init `CacheLoader` instance.'''
+        self.cache = cache
+        self.flights = flights
+        self.refresher = refresher or Refresher()
+        self.lock_client = lock_client
+        self.lock_ttl = lock_ttl
+        self.lock_wait = lock_wait
+        if lock_client is not None:
+            self._release_lock = lock_client.register_script(RELEASE_LOCK_SCRIPT)
+
+    async def get_or_load(self, key: str, load: Callable[[], Awaitable], ttl: CacheTTL | None = None,
+                          refresh: Callable[[], Awaitable] | None = None):
+        '''Returns cached value of key, loads and caches it on miss.
+
+        With `ttl` and `refresh` value older than `ttl.soft` is returned and refreshed in background
+        by `refresh`, which must not use anything bound to the request, such as its session.
+        '''
+        value, time_left = await self.cache.get_with_ttl(key)
+        if value is not None:
+            if refresh is not None and _is_stale(time_left, ttl):
+                self.refresher.schedule(key, lambda: self._refresh(key, refresh, ttl, time_left))
+            return value
+        return await self.flights.do(key, lambda: self._load(key, load, ttl))
+
+    async def _load(self, key: str, load: Callable[[], Awaitable], ttl: CacheTTL | None):
+        '''Loads value under lock if it is enabled, waits for value loaded by other process otherwise.'''
+        if self.lock_client is None:
+            return await self._load_and_set(key, load, ttl)
+        lock_key = f'lock-{key}'
+        deadline = time.monotonic() + self.lock_wait
+        while True:
+            token = uuid.uuid4().hex
+            if await self.lock_client.set(lock_key, token, px=int(self.lock_ttl * 1000), nx=True):
+                try:
+                    return await self._load_and_set(key, load, ttl)
+                finally:
+                    await self._release_lock(keys=[lock_key], args=[token])
+            if time.monotonic() >= deadline:
+                return await self._load_and_set(key, load, ttl)
+            await asyncio.sleep(LOCK_POLL_INTERVAL)
+            value = await self.cache.get(key)
+            if value is not None:
+                return value
+
+    async def _refresh(self, key: str, refresh: Callable[[], Awaitable], ttl: CacheTTL, time_left: float) -> None:
+        '''Reloads stale value, skips it if other process holds the lock of key.'''
+        if self.lock_client is None:
+            await self._reload(key, refresh, ttl, time_left)
+            return
+        lock_key = f'lock-{key}'
+        token = uuid.uuid4().hex
+        if not await self.lock_client.set(lock_key, token, px=int(self.lock_ttl * 1000), nx=True):
+            return
+        try:
+            await self._reload(key, refresh, ttl, time_left)
+        finally:
+            await self._release_lock(keys=[lock_key], args=[token])
+
+    async def _reload(self, key: str, refresh: Callable[[], Awaitable], ttl: CacheTTL, time_left: float) -> None:
+        '''Loads value and replaces stale one, which had `time_left` seconds left, unless it has changed since then.
+
+        Refresh may read data before a concurrent update commits, then its result must not
+        bring back the value which the update has cleared.
+        '''
+        value = await refresh()
+        if not await self.cache.set_if_unchanged(key, value, time_left, expire_time=ttl.hard):
+            logger.debug('Cached value %s changed while it was refreshed, result is dropped.', key)
+
+    async def _load_and_set(self, key: str, load: Callable[[], Awaitable], ttl: CacheTTL | None):
+        '''Loads value and caches it.'''
+        value = await load()
+        if ttl is None:
+            await self.cache.set(key, value)
+        else:
+            await self.cache.set(key, value, expire_time=ttl.hard)
+        return value
+
+
+def _is_stale(time_left: float | None, ttl: CacheTTL | None) -> bool:
+    '''Checks whether value with `time_left` seconds until expiration is older than `ttl.soft`.'''
+    return ttl is not None and time_left is not None and time_left < ttl.hard - ttl.soft
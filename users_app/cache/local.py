@@ -0,0 +1,45 @@
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class LocalCache:
+    '''Size-bounded in-process LRU storage with expiration time of entries.'''
+
+    def __init__(self, max_size: int, expire_time: float) -> None:
+        '''Init `LocalCache` instance.'''
+        self.max_size = max_size
+        self.expire_time = expire_time
+        self._entries: OrderedDict[str, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: str) -> tuple[bool, Any]:
+        '''Returns pair of hit flag and value, drops the entry if it has expired.'''
+        entry = self._entries.get(key)
+        if entry is None:
+            return False, None
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._entries[key]
+            return False, None
+        self._entries.move_to_end(key)
+        return True, value
+
+    def set(self, key: str, value: Any, expire_time: float | None = None) -> None:
+        '''Stores value, evicts the least recently used entry if storage is full.'''
+        if expire_time is None:
+            expire_time = self.expire_time
+        self._entries[key] = (time.monotonic() + expire_time, value)
+        self._entries.move_to_end(key)
+        if len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def delete(self, key: str) -> None:
+        '''Drops entry if it exists.'''
+        self._entries.pop(key, None)
+
+    def clear(self) -> None:
+        '''Drops all entries.'''
+        self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
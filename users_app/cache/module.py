@@ -1,38 +1,200 @@
-import json
+import logging
+import math
+import time
 
 from aioredis.client import Redis
-from fastapi.encoders import jsonable_encoder
+from fastapi import Depends
 
 from users_app.cache.abstract_cache import AbstractCache
-from users_app.cache.settings import EXPIRE_TIME, redis_client
+from users_app.cache.codecs import CacheSerializer, CodecError
+from users_app.cache.loader import CacheLoader, Refresher, SingleFlight
+from users_app.cache.local import LocalCache
+from users_app.cache.settings import (
+    CODEC,
+    COMPRESS_MIN_SIZE,
+    COMPRESSION,
+    COUNTER_EXPIRE_TIME,
+    EXPIRE_TIME,
+    LOCAL_ENABLED,
+    LOCAL_EXPIRE_TIME,
+    LOCAL_MAX_SIZE,
+    LOCK_ENABLED,
+    LOCK_TTL,
+    LOCK_WAIT,
+    redis_client,
+)
+from users_app.cache.two_tier import InvalidationListener, TierStats, TwoTierCache
+from users_app.monitoring.metrics import cache_metrics
+from users_app.monitoring.profiling import record_cache
+
+logger = logging.getLogger(__name__)
+
+INCR_IF_EXISTS_SCRIPT = '''
+if redis.call('EXISTS', KEYS[1]) == 1 then
+    return redis.call('INCRBY', KEYS[1], ARGV[1])
+end
+return nil
+'''
+SET_IF_UNCHANGED_SCRIPT = '''
+local ttl = redis.call('PTTL', KEYS[1])
+if ttl < 0 or ttl > tonumber(ARGV[2]) then
+    return 0
+end
+redis.call('SET', KEYS[1], ARGV[1], 'PX', ARGV[3])
+return 1
+'''
 
 
 class RedisCache(AbstractCache):
     '''Cache with Redis client.'''
 
-    def __init__(self, cache_client: Redis) -> None:
-        '''Init instance with given client.'''
+    def __init__(self, cache_client: Redis, serializer: CacheSerializer | None = None) -> None:
+        '''Init instance with given client and values serializer.'''
         self.redis_client = cache_client
+        self.serializer = serializer or CacheSerializer()
+        self._incr_if_exists = cache_client.register_script(INCR_IF_EXISTS_SCRIPT)
+        self._set_if_unchanged = cache_client.register_script(SET_IF_UNCHANGED_SCRIPT)
 
     async def get(self, key: str):
-        '''Gets cached value.'''
-        value = await self.redis_client.get(key)
-        return json.loads(value) if value else None
+        '''Gets cached value, value which can not be decoded is considered missing.'''
+        started_at = time.perf_counter()
+        value = self._loads(key, await self.redis_client.get(key))
+        self._observe('get', started_at, (value,))
+        return value
 
-    async def set(self, key: str, value: str, expire_time=EXPIRE_TIME):
+    async def get_with_ttl(self, key: str) -> tuple:
+        '''Gets cached value with seconds left until it expires, `None` if it does not expire.'''
+        started_at = time.perf_counter()
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            value, ttl = await pipe.get(key).pttl(key).execute()
+        value = self._loads(key, value)
+        self._observe('get_with_ttl', started_at, (value,))
+        return value, ttl / 1000 if ttl >= 0 else None
+
+    async def set(self, key: str, value, expire_time=EXPIRE_TIME):
         '''Set value to cache.'''
-        value = json.dumps(jsonable_encoder(value))
-        await self.redis_client.set(key, value, expire_time)
+        started_at = time.perf_counter()
+        await self.redis_client.set(key, self.serializer.dumps(value), expire_time)
+        self._observe('set', started_at)
+
+    async def set_if_unchanged(self, key: str, value, time_left: float, expire_time: float) -> bool:
+        '''Atomically replaces value which had `time_left` seconds left when it was read.
+
+        Expiration time serves as generation of value: the key cleared since then is missing
+        and the key written again has more time left, neither of them is replaced.
+        '''
+        started_at = time.perf_counter()
+        replaced = await self._set_if_unchanged(
+            keys=[key],
+            args=[self.serializer.dumps(value), math.ceil(time_left * 1000), int(expire_time * 1000)],
+        )
+        self._observe('set_if_unchanged', started_at)
+        return bool(replaced)
+
+    async def get_many(self, keys: list[str]) -> list:
+        '''Gets cached values of keys with a single `MGET`, `None` for missing ones.'''
+        started_at = time.perf_counter()
+        values = await self.redis_client.mget(keys)
+        values = [self._loads(key, value) for key, value in zip(keys, values)]
+        self._observe('get_many', started_at, values)
+        return values
+
+    async def set_many(self, values: dict, expire_time=EXPIRE_TIME):
+        '''Set values of keys to cache with a single pipelined round trip.'''
+        started_at = time.perf_counter()
+        async with self.redis_client.pipeline(transaction=False) as pipe:
+            for key, value in values.items():
+                pipe.set(key, self.serializer.dumps(value), expire_time)
+            await pipe.execute()
+        self._observe('set_many', started_at)
+
+    async def clear(self, *keys: str):
+        '''Clear values from cache with a single command.'''
+        started_at = time.perf_counter()
+        await self.redis_client.delete(*keys)
+        self._observe('clear', started_at)
+
+    async def get_version(self, namespace: str) -> int:
+        '''Gets current generation of namespace, which should be a part of its keys.'''
+        started_at = time.perf_counter()
+        value = await self.redis_client.get(f'version-{namespace}')
+        self._observe('get_version', started_at, (value,))
+        return int(value) if value is not None else 0
+
+    async def invalidate(self, namespace: str):
+        '''Invalidates all values of namespace at once by bumping its generation.
+
+        Values stored under previous generations are never read again and expire by TTL.
+        '''
+        started_at = time.perf_counter()
+        await self.redis_client.incr(f'version-{namespace}')
+        self._observe('invalidate', started_at)
+
+    async def get_counter(self, key: str) -> int | None:
+        '''Gets counter value, `None` if it is not set or has expired.'''
+        started_at = time.perf_counter()
+        value = await self.redis_client.get(key)
+        self._observe('get_counter', started_at, (value,))
+        return int(value) if value is not None else None
+
+    async def set_counter(self, key: str, value: int, expire_time=COUNTER_EXPIRE_TIME, nx: bool = False):
+        '''Sets counter value, which is dropped for reconciliation after `expire_time`.
+
+        With `nx` counter is only set if it is missing, so it does not overwrite one set meanwhile.
+        '''
+        started_at = time.perf_counter()
+        await self.redis_client.set(key, value, expire_time, nx=nx)
+        self._observe('set_counter', started_at)
+
+    async def incr_counter(self, key: str, amount: int = 1):
+        '''Atomically adjusts counter by `amount` if it is set, keeps its expiration time.'''
+        started_at = time.perf_counter()
+        await self._incr_if_exists(keys=[key], args=[amount])
+        self._observe('incr_counter', started_at)
+
+    def _observe(self, operation: str, started_at: float, values: tuple | list = ()) -> None:
+        '''Counts operation in metrics if they are collected and in profile of request, `None` values are misses.'''
+        duration = time.perf_counter() - started_at
+        record_cache(duration)
+        if cache_metrics is None:
+            return
+        misses = sum(value is None for value in values)
+        cache_metrics.observe(operation, duration, len(values) - misses, misses)
+
+    def _loads(self, key: str, value: bytes | None):
+        '''Decodes cached value, value which can not be decoded is considered missing.'''
+        if not value:
+            return None
+        try:
+            return self.serializer.loads(value)
+        except CodecError as exc:
+            logger.warning('Cached value %s can not be decoded: %s', key, exc)
+            return None
+
+
+serializer = CacheSerializer(CODEC, COMPRESSION, COMPRESS_MIN_SIZE)
+local_cache = LocalCache(max_size=LOCAL_MAX_SIZE, expire_time=LOCAL_EXPIRE_TIME)
+tier_stats = TierStats(cache_metrics)
+invalidation_listener = InvalidationListener(redis_client, local_cache)
+single_flight = SingleFlight()
+refresher = Refresher()
+
 
-    async def clear(self, key: str):
-        '''Clear value or values frim cache.'''
-        if key == 'all':
-            async for key in self.redis_client.scan_iter('users-*'):
-                await self.redis_client.delete(key)
-        else:
-            await self.redis_client.delete(key)
+def get_cache() -> AbstractCache:
+    '''Returns `RedisCache` or `TwoTierCache` instance for dependency injection.'''
+    cache = RedisCache(cache_client=redis_client, serializer=serializer)
+    if LOCAL_ENABLED:
+        return TwoTierCache(cache, local_cache, redis_client, tier_stats)
+    return cache
 
 
-def get_cache():
-    '''Returns `RedisCache` instance for dependency injection.'''
-    return RedisCache(cache_client=redis_client)
+def get_cache_loader(cache: AbstractCache = Depends(get_cache)) -> CacheLoader:
+    '''Returns `CacheLoader` instance, which coalesces misses of worker, for dependency injection.'''
+    return CacheLoader(
+        cache,
+        single_flight,
+        refresher,
+        lock_client=redis_client if LOCK_ENABLED else None,
+        lock_ttl=LOCK_TTL,
+        lock_wait=LOCK_WAIT,
+    )
@@ -1,6 +1,26 @@
 import aioredis
 
-from config import REDIS_DB, REDIS_EXP, REDIS_HOST
+from config import (
+    CACHE_CITIES_EXP,
+    CACHE_CODEC,
+    CACHE_COMPRESS_MIN_SIZE,
+    CACHE_COMPRESSION,
+    CACHE_LOCAL_ENABLED,
+    CACHE_LOCAL_EXP,
+    CACHE_LOCAL_SIZE,
+    CACHE_LOCK_ENABLED,
+    CACHE_LOCK_TTL,
+    CACHE_LOCK_WAIT,
+    CACHE_USER_EXP,
+    CACHE_USER_STALE_EXP,
+    CACHE_USERS_EXP,
+    CACHE_USERS_STALE_EXP,
+    REDIS_COUNTER_EXP,
+    REDIS_DB,
+    REDIS_EXP,
+    REDIS_HOST,
+)
+from users_app.cache.loader import CacheTTL
 
 redis_client = aioredis.from_url(
     f'redis://{REDIS_HOST}',
@@ -8,3 +28,22 @@ redis_client = aioredis.from_url(
 )
 
 EXPIRE_TIME = REDIS_EXP
+COUNTER_EXPIRE_TIME = REDIS_COUNTER_EXP
+
+LOCAL_ENABLED = CACHE_LOCAL_ENABLED
+LOCAL_MAX_SIZE = int(CACHE_LOCAL_SIZE)
+LOCAL_EXPIRE_TIME = float(CACHE_LOCAL_EXP)
+
+CODEC = CACHE_CODEC
+COMPRESSION = CACHE_COMPRESSION
+COMPRESS_MIN_SIZE = int(CACHE_COMPRESS_MIN_SIZE)
+
+LOCK_ENABLED = CACHE_LOCK_ENABLED
+LOCK_TTL = float(CACHE_LOCK_TTL)
+LOCK_WAIT = float(CACHE_LOCK_WAIT)
+
+# Values are served for `*_EXP` seconds, refreshed in background for `*_STALE_EXP` more after that.
+USER_TTL = CacheTTL(int(CACHE_USER_EXP), int(CACHE_USER_EXP) + int(CACHE_USER_STALE_EXP))
+USERS_TTL = CacheTTL(int(CACHE_USERS_EXP), int(CACHE_USERS_EXP) + int(CACHE_USERS_STALE_EXP))
+# Cities are read in batches of missing ones, without background refresh.
+CITIES_EXPIRE_TIME = int(CACHE_CITIES_EXP)
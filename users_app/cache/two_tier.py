@@ -0,0 +1,236 @@
+import asyncio
+import logging
+import time
+
+from aioredis.client import Redis
+
+from users_app.cache.abstract_cache import AbstractCache
+from users_app.cache.local import LocalCache
+
+logger = logging.getLogger(__name__)
+
+INVALIDATION_CHANNEL = 'cache-invalidation'
+
+
+class TierStats:
+    '''Hit and miss counters of both cache tiers within the process, exported to metrics if they are given.'''
+
+    def __init__(self, metrics=None) -> None:
+        '''Init `TierStats` instance with zero counters and optional `CacheMetrics`.'''
+        self.metrics = metrics
+        self.local_hits = 0
+        self.local_misses = 0
+        self.remote_hits = 0
+        self.remote_misses = 0
+
+    def count(self, tier: str, hit: bool) -> None:
+        '''Counts lookup in `local` or `remote` tier.'''
+        if tier == 'local':
+            self.local_hits += hit
+            self.local_misses += not hit
+        else:
+            self.remote_hits += hit
+            self.remote_misses += not hit
+        if self.metrics is not None:
+            self.metrics.observe_tier(tier, hit)
+
+    def as_dict(self) -> dict:
+        '''Returns counters with hit ratio of each tier.'''
+        return {
+            'local_hits': self.local_hits,
+            'local_misses': self.local_misses,
+            'local_hit_ratio': _ratio(self.local_hits, self.local_misses),
+            'remote_hits': self.remote_hits,
+            'remote_misses': self.remote_misses,
+            'remote_hit_ratio': _ratio(self.remote_hits, self.remote_misses),
+        }
+
+
+class TwoTierCache(AbstractCache):
+    '''Cache which keeps hot values in process memory in front of shared remote cache.
+
+    Local entries are dropped on every process through Redis pub/sub when they are
+    invalidated, and expire shortly anyway in case a message was missed, never later than in remote tier.
+    Values returned from the local tier are shared between requests and must not be mutated.
+    '''
+
+    def __init__(self, cache_client: AbstractCache, local_cache: LocalCache,
+                 publisher: Redis, stats: TierStats) -> None:
+        '''Init instance with given remote cache and in-process storage.'''
+        self.remote_cache = cache_client
+        self.local_cache = local_cache
+        self.publisher = publisher
+        self.stats = stats
+
+    async def get(self, key: str):
+        '''Gets cached value from local tier, falls back to remote one.'''
+        hit, value, _ = self._get_local(key)
+        if hit:
+            return value
+        value = await self.remote_cache.get(key)
+        self._store_local(key, value)
+        return value
+
+    async def get_with_ttl(self, key: str) -> tuple:
+        '''Gets cached value with seconds left until it expires in remote tier.
+
+        Local copies keep remote expiration time, those read without it are looked up in remote tier.
+        '''
+        hit, value, expires_at = self._get_local(key)
+        if hit and expires_at is not None:
+            return value, expires_at - time.monotonic()
+        value, ttl = await self.remote_cache.get_with_ttl(key)
+        self._store_local(key, value, ttl)
+        return value, ttl
+
+    async def set(self, key: str, value, *args, **kwargs):
+        '''Set value to remote cache, it is kept locally after the first read.'''
+        await self.remote_cache.set(key, value, *args, **kwargs)
+        self.local_cache.delete(key)
+
+    async def set_if_unchanged(self, key: str, value, *args, **kwargs) -> bool:
+        '''Replaces value in remote cache unless it was written or cleared since it was read.'''
+        replaced = await self.remote_cache.set_if_unchanged(key, value, *args, **kwargs)
+        self.local_cache.delete(key)
+        return replaced
+
+    async def get_many(self, keys: list[str]) -> list:
+        '''Gets cached values from local tier, falls back to remote one for missing ones at once.'''
+        values = {}
+        remote_keys = []
+        for key in keys:
+            hit, value, _ = self._get_local(key)
+            if hit:
+                values[key] = value
+            else:
+                remote_keys.append(key)
+        if remote_keys:
+            for key, value in zip(remote_keys, await self.remote_cache.get_many(remote_keys)):
+                self._store_local(key, value)
+                values[key] = value
+        return [values[key] for key in keys]
+
+    async def set_many(self, values: dict, *args, **kwargs):
+        '''Set values to remote cache, they are kept locally after the first read.'''
+        await self.remote_cache.set_many(values, *args, **kwargs)
+        for key in values:
+            self.local_cache.delete(key)
+
+    async def clear(self, *keys: str):
+        '''Clear values from both tiers of all processes.'''
+        await self.remote_cache.clear(*keys)
+        await self._drop(*keys)
+
+    async def get_version(self, namespace: str) -> int:
+        '''Gets current generation of namespace.'''
+        key = f'version-{namespace}'
+        hit, version, _ = self._get_local(key)
+        if hit:
+            return version
+        version = await self.remote_cache.get_version(namespace)
+        self._store_local(key, version)
+        return version
+
+    async def invalidate(self, namespace: str):
+        '''Invalidates all values of namespace in all processes.'''
+        await self.remote_cache.invalidate(namespace)
+        await self._drop(f'version-{namespace}')
+
+    async def get_counter(self, key: str) -> int | None:
+        '''Gets counter value.'''
+        hit, value, _ = self._get_local(key)
+        if hit:
+            return value
+        value = await self.remote_cache.get_counter(key)
+        self._store_local(key, value)
+        return value
+
+    async def set_counter(self, key: str, value: int, *args, **kwargs):
+        '''Sets counter value and drops its local copies.'''
+        await self.remote_cache.set_counter(key, value, *args, **kwargs)
+        await self._drop(key)
+
+    async def incr_counter(self, key: str, amount: int = 1):
+        '''Adjusts counter and drops its local copies.'''
+        await self.remote_cache.incr_counter(key, amount)
+        await self._drop(key)
+
+    def _get_local(self, key: str) -> tuple:
+        '''Looks value up in local tier and counts the result.
+
+        Returns hit flag, value and its remote expiration time, `None` if it is unknown or the value does not expire.
+        '''
+        hit, entry = self.local_cache.get(key)
+        self.stats.count('local', hit)
+        if not hit:
+            return False, None, None
+        return True, *entry
+
+    def _store_local(self, key: str, value, time_left: float | None = None) -> None:
+        '''Counts result of remote lookup and keeps found value locally along with its remote expiration time.'''
+        self.stats.count('remote', value is not None)
+        if value is None:
+            return
+        if time_left is None:
+            self.local_cache.set(key, (value, None))
+            return
+        expire_time = min(time_left, self.local_cache.expire_time)
+        self.local_cache.set(key, (value, time.monotonic() + time_left), expire_time=expire_time)
+
+    async def _drop(self, *keys: str) -> None:
+        '''Drops local copies of values and notifies other processes with a single message.'''
+        for key in keys:
+            self.local_cache.delete(key)
+        await self.publisher.publish(INVALIDATION_CHANNEL, '\n'.join(keys))
+
+
+class InvalidationListener:
+    '''Background task which drops local cache entries invalidated by other processes.'''
+
+    def __init__(self, redis_client: Redis, local_cache: LocalCache, retry_delay: float = 1.0) -> None:
+        '''Init `InvalidationListener` instance.'''
+        self.redis_client = redis_client
+        self.local_cache = local_cache
+        self.retry_delay = retry_delay
+        self._task: asyncio.Task | None = None
+
+    def start(self) -> None:
+        '''Starts listening in background.'''
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen())
+
+    async def stop(self) -> None:
+        '''Stops listening.'''
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _listen(self) -> None:
+        '''Subscribes to invalidation channel and resubscribes after connection errors.'''
+        while True:
+            pubsub = self.redis_client.pubsub()
+            try:
+                await pubsub.subscribe(INVALIDATION_CHANNEL)
+                # Messages could be missed while there was no subscription.
+                self.local_cache.clear()
+                async for message in pubsub.listen():
+                    if message['type'] == 'message':
+                        for key in message['data'].decode().split('\n'):
+                            self.local_cache.delete(key)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception('Cache invalidation listener failed, resubscribing.')
+            finally:
+                await pubsub.reset()
+            await asyncio.sleep(self.retry_delay)
+
+
+def _ratio(hits: int, misses: int) -> float:
+    '''Returns hit ratio, zero if there were no lookups.'''
+    total = hits + misses
+    return hits / total if total else 0.0
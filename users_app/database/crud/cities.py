@@ -16,3 +16,11 @@ class CityCRUD:
         query = select(City).where(City.id == city_id)
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
+
+    async def read_many(self, city_ids: list[int]) -> list[City]:
+        '''Read cities by list of `id` fields with a single query.'''
+        if not city_ids:
+            return []
+        query = select(City).where(City.id.in_(city_ids)).order_by(City.id)
+        result = await self.session.execute(query)
+        return result.scalars().all()
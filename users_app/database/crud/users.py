@@ -1,7 +1,32 @@
-from sqlalchemy import func, select, update
+from typing import AsyncIterator, Sequence
+
+from sqlalchemy import (
+    ColumnElement,
+    Float,
+    Integer,
+    Row,
+    String,
+    Values,
+    and_,
+    any_,
+    bindparam,
+    case,
+    cast,
+    column,
+    delete,
+    exists,
+    func,
+    or_,
+    select,
+    table,
+    text,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import ARRAY, insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from users_app.database.models import User
+from users_app.database.models import City, User
 from users_app.validation.schemas import (
     PrivateCreateUserModel,
     PrivateUpdateUserModel,
@@ -9,6 +34,29 @@ from users_app.validation.schemas import (
     UpdateUserModel,
 )
 
+IMPORT_COLUMNS = (
+    'first_name',
+    'last_name',
+    '_hashed_password',
+    'email',
+    'is_admin',
+    'other_name',
+    'phone',
+    'birthday',
+    'city',
+    'additional_info',
+)
+# Query arguments limit of PostgreSQL protocol.
+MAX_BIND_PARAMS = 32767
+# Keyset columns of users list sorts, each ends with `id` so order is stable. Composite indexes serve unfiltered sorts.
+SORT_KEYS = {
+    'id': ('id',),
+    'last_name': ('last_name', 'id'),
+    'birthday': ('birthday', 'id'),
+}
+
+user_import = table('user_import', column('line'), *(column(name) for name in IMPORT_COLUMNS))
+
 
 class UserCRUD:
     '''`User` class which provides CRUD operations.'''
@@ -17,12 +65,68 @@ class UserCRUD:
         '''Init `UserCRUD` instance with given session.'''
         self.session = session
 
-    async def read_all(self, query: QueryParams) -> list[User | None]:
-        '''Read all users with pagination.'''
-        offset = (query.page - 1) * query.size
-        query = select(User).order_by(User.id).offset(offset).limit(query.size)
-        result = await self.session.execute(query)
-        return result.scalars().all()
+    async def read_all(self, query: QueryParams, after: tuple | None = None) -> list[User | None]:
+        '''Read users matching filters of query in its sort order with pagination.
+
+        Users are paginated by keyset if `after` values of sort key columns (see `SORT_KEYS`)
+        are given or by offset otherwise. Keyset page which crosses from users with `birthday`
+        to those without it is read by two queries.
+        '''
+        sort = query.sort or 'id'
+        descending = sort.startswith('-')
+        columns = [getattr(User, name) for name in SORT_KEYS[sort.lstrip('-')]]
+        stmt = select(User).where(*_filter_clauses(query)).order_by(
+            *(column_.desc() if descending else column_ for column_ in columns)
+        ).limit(query.size)
+        if after is None:
+            result = await self.session.execute(stmt.offset((query.page - 1) * query.size))
+            return result.scalars().all()
+        users = []
+        for clause in _after_clauses(columns, after, descending):
+            result = await self.session.execute(stmt.where(clause).limit(query.size - len(users)))
+            users.extend(result.scalars().all())
+            if len(users) == query.size:
+                break
+        return users
+
+    async def count_filtered(self, query: QueryParams) -> int:
+        '''Count users matching filters of query.'''
+        result = await self.session.execute(
+            select(func.count()).select_from(User).where(*_filter_clauses(query))
+        )
+        return result.scalar_one()
+
+    async def search(self, search: str, query: QueryParams,
+                     after: tuple[float, int] | None = None) -> list[tuple[User, float]]:
+        '''Search users by prefix or similarity of email and names, returns them with their rank.
+
+        `search` must be lowercase. Users are ordered by rank and `id`, paginated by keyset
+        if `after` rank and `id` are given or by offset otherwise.
+        '''
+        match, rank = _search_clauses(search)
+        stmt = select(User, rank).where(match, *_filter_clauses(query)).order_by(rank.desc(), User.id).limit(query.size)
+        if after is not None:
+            after_rank, after_id = after
+            stmt = stmt.where(or_(rank < after_rank, and_(rank == after_rank, User.id > after_id)))
+        else:
+            stmt = stmt.offset((query.page - 1) * query.size)
+        result = await self.session.execute(stmt)
+        return [(user, user_rank) for user, user_rank in result.all()]
+
+    async def count_search(self, search: str, query: QueryParams) -> int:
+        '''Count users found by `search` and matching filters of query.'''
+        match, _ = _search_clauses(search)
+        result = await self.session.execute(
+            select(func.count()).select_from(User).where(match, *_filter_clauses(query))
+        )
+        return result.scalar_one()
+
+    async def stream_all(self, columns: Sequence[str], batch_size: int) -> AsyncIterator[Sequence[Row]]:
+        '''Stream given columns of all users ordered by `id` through server-side cursor, in batches.'''
+        stmt = select(*(User.__table__.c[name] for name in columns)).order_by(User.id)
+        result = await self.session.stream(stmt.execution_options(yield_per=batch_size))
+        async for rows in result.partitions():
+            yield rows
 
     async def read(self, user_id=int) -> User:
         '''Read specific user by `id` field.'''
@@ -30,15 +134,21 @@ class UserCRUD:
         result = await self.session.execute(query)
         return result.scalar_one()
 
+    async def read_many(self, user_ids: list[int]) -> list[User]:
+        '''Read users by list of `id` fields with a single query.'''
+        query = select(User).where(_any_of(User.id, user_ids, Integer))
+        result = await self.session.execute(query)
+        return result.scalars().all()
+
     async def read_by_login(self, login: str):
         '''Read specific user by `email` field.'''
         query = select(User).where(User.email == login)
         result = await self.session.execute(query)
         return result.scalar_one_or_none()
 
-    async def create(self, data: PrivateCreateUserModel):
-        '''Create new user.'''
-        new_user = User(**data.dict())
+    async def create(self, data: PrivateCreateUserModel, hashed_password: str):
+        '''Create new user with password hashed beforehand, so hashing does not block the event loop.'''
+        new_user = User(**data.dict(exclude={'password'}), _hashed_password=hashed_password)
         self.session.add(new_user)
         await self.session.commit()
         await self.session.refresh(new_user)
@@ -59,8 +169,162 @@ class UserCRUD:
         await self.session.delete(user)
         await self.session.commit()
 
+    async def read_ids_by_email(self, emails: list[str]) -> dict[str, int]:
+        '''Read ids of users with given emails.'''
+        query = select(User.email, User.id).where(_any_of(User.email, emails, String))
+        result = await self.session.execute(query)
+        return dict(result.all())
+
+    async def bulk_update(self, groups: list[list[dict]]) -> list[int]:
+        '''Update many users in one transaction with `UPDATE ... FROM (VALUES ...)` and commit.
+
+        Values of each group keep `id` and the same set of fields to update.
+        Returns ids of updated users, missing ones are skipped.
+        '''
+        updated = []
+        for group in groups:
+            names = list(group[0])
+            chunk_size = MAX_BIND_PARAMS // len(names)
+            for start in range(0, len(group), chunk_size):
+                rows = [tuple(values[name] for name in names) for values in group[start:start + chunk_size]]
+                if len(names) == 1:
+                    # Nothing to change, existing users are considered updated.
+                    query = select(User.id).where(_any_of(User.id, [row[0] for row in rows], Integer))
+                else:
+                    source = Values(
+                        *(column(name, User.__table__.c[name].type) for name in names),
+                        name='data',
+                    ).data(rows)
+                    # Casts keep column types for values which are NULL in every row.
+                    query = update(User).where(User.id == source.c.id).values({
+                        name: cast(source.c[name], User.__table__.c[name].type)
+                        for name in names if name != 'id'
+                    }).returning(User.id).execution_options(synchronize_session=False)
+                result = await self.session.execute(query)
+                updated.extend(result.scalars())
+        await self.session.commit()
+        return updated
+
+    async def bulk_delete(self, user_ids: list[int]) -> list[int]:
+        '''Delete many users with a single statement and commit, returns ids of deleted ones.'''
+        stmt = delete(User).where(_any_of(User.id, user_ids, Integer)).returning(User.id)
+        result = await self.session.execute(stmt.execution_options(synchronize_session=False))
+        deleted = result.scalars().all()
+        await self.session.commit()
+        return deleted
+
     async def count_all(self):
         '''Count all users.'''
         query = select(func.count()).select_from(User)
         result = await self.session.execute(query)
         return result.scalar_one()
+
+    async def create_import(self):
+        '''Create temporary staging table for bulk import, it is dropped on commit.'''
+        columns = ', '.join(IMPORT_COLUMNS)
+        await self.session.execute(text(
+            f'CREATE TEMP TABLE user_import ON COMMIT DROP AS '
+            f'SELECT 0 AS line, {columns} FROM user_account WITH NO DATA'
+        ))
+
+    async def copy_to_import(self, records: list[tuple]):
+        '''Load records of `line` and `IMPORT_COLUMNS` values to staging table with `COPY`.'''
+        connection = await self.session.connection()
+        raw_connection = await connection.get_raw_connection()
+        await raw_connection.driver_connection.copy_records_to_table(
+            'user_import',
+            records=records,
+            columns=['line', *IMPORT_COLUMNS],
+        )
+
+    async def merge_import(self) -> tuple[int, dict[str, list]]:
+        '''Move valid staged users to `user_account` and commit.
+
+        Returns quantity of created users and lines rejected as duplicates in the file,
+        duplicates of existing users or ones with unknown city.
+        '''
+        await self.session.execute(text('CREATE INDEX ON user_import (email)'))
+        await self.session.execute(text('ANALYZE user_import'))
+        earlier = user_import.alias('earlier')
+        duplicate_in_file = exists().where(
+            earlier.c.email == user_import.c.email,
+            earlier.c.line < user_import.c.line,
+        )
+        known_city = user_import.c.city.is_(None) | exists().where(City.id == user_import.c.city)
+        rejected = {}
+        for reason, condition in (
+            ('duplicate_in_file', duplicate_in_file),
+            ('email_exists', exists().where(User.email == user_import.c.email)),
+            ('city_not_found', ~known_city),
+        ):
+            query = select(user_import.c.line, user_import.c.email).where(condition).order_by(user_import.c.line)
+            result = await self.session.execute(query)
+            rejected[reason] = result.all()
+
+        valid_users = select(*(user_import.c[name] for name in IMPORT_COLUMNS)).where(
+            ~duplicate_in_file,
+            known_city,
+        ).order_by(user_import.c.line)
+        stmt = insert(User).from_select(IMPORT_COLUMNS, valid_users).on_conflict_do_nothing(
+            index_elements=[User.email],
+        )
+        result = await self.session.execute(stmt)
+        await self.session.commit()
+        return result.rowcount, rejected
+
+
+def _any_of(column_, items: list, item_type):
+    '''Returns `column = ANY(:items)` condition with items bound as one array parameter.'''
+    return column_ == any_(bindparam(None, items, ARRAY(item_type)))
+
+
+def _filter_clauses(query: QueryParams) -> list[ColumnElement]:
+    '''Returns conditions of users list filters which are set in query.'''
+    clauses = []
+    if query.city is not None:
+        clauses.append(User.city == query.city)
+    if query.is_admin is not None:
+        # Bare column rather than a bound comparison, so the planner matches partial index of admins.
+        clauses.append(User.is_admin if query.is_admin else ~User.is_admin)
+    if query.birthday_from is not None:
+        clauses.append(User.birthday >= query.birthday_from)
+    if query.birthday_to is not None:
+        clauses.append(User.birthday <= query.birthday_to)
+    return clauses
+
+
+def _after_clauses(columns: list, after: tuple, descending: bool) -> list[ColumnElement]:
+    '''Returns conditions of rows following keyset values `after` in order of given columns.
+
+    Only the leading column may be nullable, nulls are ordered as PostgreSQL does by default: last
+    ascending and first descending. Rows with and without it are separate ranges of composite index
+    of the columns, so each range has its own condition and the next one is read only if the page
+    is not full yet. A single condition joined by `OR` would not be served by the index range.
+    '''
+    leading, *rest = columns
+    if after[0] is None:
+        following = and_(leading.is_(None), tuple_(*rest) < after[1:] if descending else tuple_(*rest) > after[1:])
+        return [following, leading.is_not(None)] if descending else [following]
+    if descending:
+        return [tuple_(*columns) < after]
+    following = tuple_(*columns) > after
+    return [following, leading.is_(None)] if leading.nullable else [following]
+
+
+def _search_clauses(search: str) -> tuple[ColumnElement, ColumnElement]:
+    '''Returns condition and rank of users search, which pattern and trigram indexes of lowercase columns serve.
+
+    Users match by prefix or by trigram similarity of email, first or last name. Exact email
+    ranks first, prefix matches rank above similar ones.
+    '''
+    columns = (func.lower(User.email), func.lower(User.first_name), func.lower(User.last_name))
+    pattern = search.replace('/', '//').replace('%', '/%').replace('_', '/_') + '%'
+    prefix = or_(*(column_.like(pattern, escape='/') for column_ in columns))
+    similar = or_(*(column_.op('%')(search) for column_ in columns))
+    rank = cast(
+        case((columns[0] == search, 2.0), else_=0.0)
+        + case((prefix, 1.0), else_=0.0)
+        + func.greatest(*(func.similarity(column_, search) for column_ in columns)),
+        Float,
+    )
+    return or_(prefix, similar), rank
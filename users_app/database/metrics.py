@@ -0,0 +1,99 @@
+import time
+
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+from sqlalchemy.exc import TimeoutError
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+from sqlalchemy.util.queue import AsyncAdaptedQueue, Empty
+
+
+class PoolMetrics:
+    '''Counters of connection pool usage, fed from pool events.'''
+
+    def __init__(self) -> None:
+        '''Init `PoolMetrics` instance with zero counters.'''
+        self.connects = 0
+        self.checkouts = 0
+        self.checkins = 0
+        self.invalidations = 0
+        self.timeouts = 0
+        self.wait_count = 0
+        self.wait_total = 0.0
+        self.wait_max = 0.0
+        self._engine: Engine | None = None
+
+    def pool_class(self) -> type[AsyncAdaptedQueuePool]:
+        '''Returns pool class which measures time of waiting for a connection into these metrics.
+
+        Only checkouts which get idle connection from the pool or wait for one are measured,
+        opening of new connections is not a part of the wait.
+        '''
+        metrics = self
+
+        class InstrumentedQueue(AsyncAdaptedQueue):
+            def get(self, block: bool = True, timeout: float | None = None):
+                started_at = time.perf_counter()
+                try:
+                    connection = super().get(block, timeout)
+                except Empty:
+                    if block:
+                        metrics.observe_wait(time.perf_counter() - started_at)
+                    raise
+                metrics.observe_wait(time.perf_counter() - started_at)
+                return connection
+
+        class InstrumentedPool(AsyncAdaptedQueuePool):
+            _queue_class = InstrumentedQueue
+
+            def connect(self):
+                try:
+                    return super().connect()
+                except TimeoutError:
+                    metrics.timeouts += 1
+                    raise
+
+        return InstrumentedPool
+
+    def attach(self, engine: AsyncEngine) -> None:
+        '''Subscribes to pool events of engine.'''
+        self._engine = engine.sync_engine
+        event.listen(engine.sync_engine, 'connect', self._on_connect)
+        event.listen(engine.sync_engine, 'checkout', self._on_checkout)
+        event.listen(engine.sync_engine, 'checkin', self._on_checkin)
+        event.listen(engine.sync_engine, 'invalidate', self._on_invalidate)
+
+    def observe_wait(self, seconds: float) -> None:
+        '''Counts time spent waiting for a connection.'''
+        self.wait_count += 1
+        self.wait_total += seconds
+        self.wait_max = max(self.wait_max, seconds)
+
+    def snapshot(self) -> dict:
+        '''Returns current pool state and counters since start.'''
+        pool = self._engine.pool if self._engine is not None else None
+        return {
+            'size': pool.size() if pool is not None else 0,
+            'checked_out': pool.checkedout() if pool is not None else 0,
+            'idle': pool.checkedin() if pool is not None else 0,
+            'overflow': max(pool.overflow(), 0) if pool is not None else 0,
+            'connects': self.connects,
+            'checkouts': self.checkouts,
+            'checkins': self.checkins,
+            'invalidations': self.invalidations,
+            'timeouts': self.timeouts,
+            'wait_avg_ms': self.wait_total / self.wait_count * 1000 if self.wait_count else 0.0,
+            'wait_max_ms': self.wait_max * 1000,
+        }
+
+    def _on_connect(self, dbapi_connection, connection_record) -> None:
+        self.connects += 1
+
+    def _on_checkout(self, dbapi_connection, connection_record, connection_proxy) -> None:
+        self.checkouts += 1
+
+    def _on_checkin(self, dbapi_connection, connection_record) -> None:
+        self.checkins += 1
+
+    def _on_invalidate(self, dbapi_connection, connection_record, exception) -> None:
+        self.invalidations += 1
@@ -1,4 +1,4 @@
-from sqlalchemy import Boolean, Date, ForeignKey, String
+from sqlalchemy import Boolean, Date, ForeignKey, Index, String, text
 from sqlalchemy.ext.hybrid import hybrid_property
 from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column, relationship
 
@@ -31,6 +31,20 @@ class User(Base):
         back_populates='user_relation',
     )
 
+    # Search by prefix and similarity, trigram indexes need `pg_trgm` extension.
+    # Sorts of lists and `city` filter in `id` order, admins are few so only they are indexed.
+    # A filter combined with another sort is served by one of these indexes only.
+    __table_args__ = (
+        Index('ix_user_account_lower_email', text('lower(email) text_pattern_ops')),
+        Index('ix_user_account_email_trgm', text('lower(email) gin_trgm_ops'), postgresql_using='gin'),
+        Index('ix_user_account_first_name_trgm', text('lower(first_name) gin_trgm_ops'), postgresql_using='gin'),
+        Index('ix_user_account_last_name_trgm', text('lower(last_name) gin_trgm_ops'), postgresql_using='gin'),
+        Index('ix_user_account_last_name_id', 'last_name', 'id'),
+        Index('ix_user_account_birthday_id', 'birthday', 'id'),
+        Index('ix_user_account_city_id', 'city', 'id'),
+        Index('ix_user_account_admin_id', 'id', postgresql_where=text('is_admin')),
+    )
+
     @hybrid_property
     def password(self):
         return self._hashed_password
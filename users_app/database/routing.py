@@ -0,0 +1,160 @@
+import asyncio
+import itertools
+import logging
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import MutableMapping
+
+from sqlalchemy import Select, text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+# Session info key of flag which makes session use primary only.
+PRIMARY = 'use_primary'
+# Session info key of client's session, which keeps time until client reads from primary.
+CLIENT_SESSION = 'client_session'
+CLIENT_PRIMARY_UNTIL = 'db_primary_until'
+# Zero on primary or on replica which replayed everything it received. Replica without streaming
+# WAL receiver falls behind primary unnoticed, so it gets no lag and is not used. Status of
+# the receiver is only visible to roles with `pg_read_all_stats` privileges.
+LAG_QUERY = text('''
+SELECT CASE
+    WHEN NOT pg_is_in_recovery() THEN 0
+    WHEN NOT EXISTS (SELECT 1 FROM pg_stat_wal_receiver WHERE status = 'streaming') THEN NULL
+    WHEN pg_last_wal_receive_lsn() = pg_last_wal_replay_lsn() THEN 0
+    ELSE EXTRACT(EPOCH FROM now() - pg_last_xact_replay_timestamp())
+END
+''')
+
+# Set while reading rows which are written next, see `primary_reads`.
+_primary_reads: ContextVar[bool] = ContextVar('primary_reads', default=False)
+# Set while reading values which fill shared cache, see `fresh_reads`.
+_fresh_since: ContextVar[float | None] = ContextVar('fresh_since', default=None)
+
+
+class ReplicaSet:
+    '''Replica engines, which are used for reads while their replication lag is within limit.'''
+
+    def __init__(self, engines: list[AsyncEngine], max_lag: float, check_interval: float = 1.0) -> None:
+        '''Init `ReplicaSet` instance, replicas are not used until their lag is checked.'''
+        self.engines = engines
+        self.max_lag = max_lag
+        self.check_interval = check_interval
+        self.lags: list[float | None] = [None] * len(engines)
+        # Time until which each replica has replayed writes of primary, as of its last check.
+        self.replayed_at: list[float | None] = [None] * len(engines)
+        self._counter = itertools.count()
+        self._task: asyncio.Task | None = None
+
+    @property
+    def write_window(self) -> float:
+        '''Seconds after a write until every healthy replica is known to have replayed it.'''
+        return self.max_lag + self.check_interval
+
+    def choose(self, since: float | None = None) -> AsyncEngine | None:
+        '''Returns next replica in round robin over healthy ones, `None` if there are none.
+
+        With `since` only replicas which have replayed writes committed before that time are healthy.
+        '''
+        healthy = [
+            engine for engine, lag, replayed_at in zip(self.engines, self.lags, self.replayed_at)
+            if lag is not None and lag <= self.max_lag and (since is None or replayed_at >= since)
+        ]
+        if not healthy:
+            return None
+        return healthy[next(self._counter) % len(healthy)]
+
+    async def check(self) -> None:
+        '''Measures replication lag of every replica, failed ones are not used.'''
+        for number, engine in enumerate(self.engines):
+            checked_at = time.time()
+            try:
+                async with engine.connect() as connection:
+                    lag = (await connection.execute(LAG_QUERY)).scalar()
+                self.lags[number] = float(lag) if lag is not None else None
+            except Exception as exc:
+                logger.warning('Replica %s lag check failed: %s', engine.url.host, exc)
+                self.lags[number] = None
+            lag = self.lags[number]
+            self.replayed_at[number] = checked_at - lag if lag is not None else None
+
+    def start(self) -> None:
+        '''Starts checking lag in background.'''
+        if self.engines and self._task is None:
+            self._task = asyncio.create_task(self._monitor())
+
+    async def stop(self) -> None:
+        '''Stops checking lag.'''
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _monitor(self) -> None:
+        '''Checks lag periodically.'''
+        while True:
+            await self.check()
+            await asyncio.sleep(self.check_interval)
+
+
+class RoutingSession(Session):
+    '''Session which reads from replicas and writes to primary engine given as `bind`.
+
+    Once session writes, it uses primary only, so it reads its own writes. Client whose
+    session has written reads from primary for replicas' lag limit as well.
+    '''
+
+    def get_bind(self, mapper=None, clause=None, **kwargs):
+        '''Returns replica for plain reads and primary engine for the rest.'''
+        is_read = isinstance(clause, Select) and clause._for_update_arg is None and not self._flushing
+        replicas: ReplicaSet | None = self.info.get('replicas')
+        if is_read and replicas is not None and not self.info.get(PRIMARY) and not _primary_reads.get():
+            replica = replicas.choose(_fresh_since.get())
+            if replica is not None:
+                return replica.sync_engine
+        if not is_read:
+            self.info[PRIMARY] = True
+            client_session = self.info.get(CLIENT_SESSION)
+            if client_session is not None and replicas is not None:
+                client_session[CLIENT_PRIMARY_UNTIL] = time.time() + replicas.max_lag
+        return super().get_bind(mapper=mapper, clause=clause, **kwargs)
+
+
+@contextmanager
+def primary_reads():
+    '''Makes sessions read from primary within the block, for rows which are written next.'''
+    token = _primary_reads.set(True)
+    try:
+        yield
+    finally:
+        _primary_reads.reset(token)
+
+
+@contextmanager
+def fresh_reads(since: float | None):
+    '''Makes sessions read within the block from replicas which have replayed writes committed before `since`.
+
+    Values read to fill shared cache must not come from a replica behind the latest invalidation,
+    otherwise older rows are cached under its new version for their whole TTL. Primary is read
+    if no replica has caught up yet, `None` allows any healthy replica.
+    '''
+    token = _fresh_since.set(since)
+    try:
+        yield
+    finally:
+        _fresh_since.reset(token)
+
+
+def bind_client(session: Session, client_session: MutableMapping | None) -> None:
+    '''Makes session use primary if client has written recently and remember its writes.'''
+    if client_session is None:
+        return
+    session.info[CLIENT_SESSION] = client_session
+    if client_session.get(CLIENT_PRIMARY_UNTIL, 0) > time.time():
+        session.info[PRIMARY] = True
@@ -1,19 +1,80 @@
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from fastapi import Request
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine
 from sqlalchemy.orm import sessionmaker
 
-from config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER
+from config import (
+    DB_ECHO,
+    DB_HOST,
+    DB_MAX_OVERFLOW,
+    DB_NAME,
+    DB_PASS,
+    DB_POOL_PRE_PING,
+    DB_POOL_RECYCLE,
+    DB_POOL_SIZE,
+    DB_POOL_TIMEOUT,
+    DB_PORT,
+    DB_REPLICA_CHECK_INTERVAL,
+    DB_REPLICA_HOSTS,
+    DB_REPLICA_MAX_LAG,
+    DB_STATEMENT_CACHE_SIZE,
+    DB_USER,
+)
+from users_app.database.metrics import PoolMetrics
+from users_app.database.routing import ReplicaSet, RoutingSession, bind_client
 
 SQLALCHEMY_DATABASE_URL = f'postgresql+asyncpg://{DB_USER}:{DB_PASS}@{DB_HOST}:{DB_PORT}/{DB_NAME}'
 
 
-engine = create_async_engine(SQLALCHEMY_DATABASE_URL, echo=True)
+def create_engine(url: str, **kwargs) -> AsyncEngine:
+    '''Returns engine with configured pool.'''
+    return create_async_engine(
+        # Prepared statements caches of SQLAlchemy and asyncpg, zero disables them for PgBouncer.
+        f'{url}?prepared_statement_cache_size={int(DB_STATEMENT_CACHE_SIZE)}',
+        echo=DB_ECHO,
+        pool_size=int(DB_POOL_SIZE),
+        max_overflow=int(DB_MAX_OVERFLOW),
+        pool_timeout=float(DB_POOL_TIMEOUT),
+        pool_recycle=int(DB_POOL_RECYCLE),
+        pool_pre_ping=DB_POOL_PRE_PING,
+        connect_args={'statement_cache_size': int(DB_STATEMENT_CACHE_SIZE)},
+        **kwargs,
+    )
+
+
+pool_metrics = PoolMetrics()
+engine = create_engine(SQLALCHEMY_DATABASE_URL, poolclass=pool_metrics.pool_class())
+pool_metrics.attach(engine)
+replica_set = ReplicaSet(
+    engines=[
+        create_engine(f'postgresql+asyncpg://{DB_USER}:{DB_PASS}@{address}/{DB_NAME}')
+        for address in (
+            host.strip() if ':' in host else f'{host.strip()}:{DB_PORT}'
+            for host in DB_REPLICA_HOSTS.split(',') if host.strip()
+        )
+    ],
+    max_lag=float(DB_REPLICA_MAX_LAG),
+    check_interval=float(DB_REPLICA_CHECK_INTERVAL),
+)
 async_session = sessionmaker(
     engine,
     class_=AsyncSession,
+    sync_session_class=RoutingSession,
     expire_on_commit=False,
+    info={'replicas': replica_set} if replica_set.engines else None,
 )
 
 
-async def get_session():
+async def get_session(request: Request):
     async with async_session() as session:
+        bind_client(session.sync_session, request.scope.get('session'))
         yield session
+
+
+def get_session_factory() -> sessionmaker:
+    '''Returns factory of sessions which are not bound to the request, for dependency injection.'''
+    return async_session
+
+
+def get_replicas() -> ReplicaSet | None:
+    '''Returns replicas used for reads, `None` if there are none, for dependency injection.'''
+    return replica_set if replica_set.engines else None
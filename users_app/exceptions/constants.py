@@ -3,6 +3,10 @@ from users_app.validation.schemas import CodelessErrorResponseModel, ErrorRespon
 E400 = {
     400: {'description': 'Bad Request', 'model': ErrorResponseModel},
 }
+E400_429 = {
+    400: {'description': 'Bad Request', 'model': ErrorResponseModel},
+    429: {'description': 'Too Many Requests', 'model': CodelessErrorResponseModel},
+}
 E400_401 = {
     400: {'description': 'Bad Request', 'model': ErrorResponseModel},
     401: {'description': 'Unauthorized', 'model': CodelessErrorResponseModel},
@@ -21,6 +25,12 @@ E400_401_404 = {
     401: {'description': 'Unauthorized', 'model': CodelessErrorResponseModel},
     404: {'description': 'Not Found', 'model': CodelessErrorResponseModel},
 }
+E400_401_403_415 = {
+    400: {'description': 'Bad Request', 'model': ErrorResponseModel},
+    401: {'description': 'Unauthorized', 'model': CodelessErrorResponseModel},
+    403: {'description': 'Forbidden', 'model': CodelessErrorResponseModel},
+    415: {'description': 'Unsupported Media Type', 'model': CodelessErrorResponseModel},
+}
 E400_401_403_404 = {
     400: {'description': 'Bad Request', 'model': ErrorResponseModel},
     401: {'description': 'Unauthorized', 'model': CodelessErrorResponseModel},
@@ -35,3 +45,14 @@ MSG_INVALID_CREDS = 'Invalid login or password.'
 MSG_EMAIL_EXISTS = 'User with email {email} already exists.'
 MSG_CITY_NOT_FOUND = 'City with given ID not found.'
 MSG_USER_NOT_FOUND = 'User not found.'
+MSG_INVALID_CURSOR = 'Invalid pagination cursor.'
+MSG_SEARCH_SORT = 'Search results are ordered by relevance, sort is not supported with q.'
+MSG_SERVICE_BUSY = 'Service is busy, please retry later.'
+MSG_TOO_MANY_ATTEMPTS = 'Too many login attempts, please retry later.'
+MSG_UNSUPPORTED_IMPORT_FORMAT = 'Unsupported content type, use application/x-ndjson or text/csv.'
+MSG_IMPORT_INVALID_ROW = 'Invalid row: {error}.'
+MSG_IMPORT_DUPLICATE_EMAIL = 'Email {email} is duplicated in imported data.'
+MSG_BULK_DUPLICATE_ID = 'User IDs must be unique.'
+MSG_BULK_DUPLICATE_EMAIL = 'Email {email} is duplicated in request.'
+MSG_BULK_INVALID_VALUES = 'Invalid values: {error}.'
+MSG_BULK_CONFLICT = 'Users were changed concurrently, please retry.'
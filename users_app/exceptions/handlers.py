@@ -22,7 +22,18 @@ class ClientExceptionHandler:
         if exc.status_code == HTTPStatus.BAD_REQUEST:
             error_response = ErrorResponseModel(code=exc.status_code.value, message=exc.detail)
             return JSONResponse(content=error_response.dict(), status_code=exc.status_code)
-        if exc.status_code in (HTTPStatus.UNAUTHORIZED, HTTPStatus.FORBIDDEN, HTTPStatus.NOT_FOUND):
+        if exc.status_code in (
+            HTTPStatus.UNAUTHORIZED,
+            HTTPStatus.FORBIDDEN,
+            HTTPStatus.NOT_FOUND,
+            HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+            HTTPStatus.TOO_MANY_REQUESTS,
+            HTTPStatus.SERVICE_UNAVAILABLE,
+        ):
             error_response = CodelessErrorResponseModel(message=exc.detail)
-            return JSONResponse(content=error_response.dict(), status_code=exc.status_code)
+            return JSONResponse(
+                content=error_response.dict(),
+                status_code=exc.status_code,
+                headers=exc.headers,
+            )
         return exc
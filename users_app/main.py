@@ -4,12 +4,28 @@ from starlette.middleware.sessions import SessionMiddleware
 from config import SECRET_KEY
 from users_app.api.v1.routers.admin import router as admin_router
 from users_app.api.v1.routers.auth import router as auth_router
+from users_app.api.v1.routers.metrics import router as metrics_router
 from users_app.api.v1.routers.user import router as user_router
+from users_app.cache.module import invalidation_listener, refresher
+from users_app.cache.settings import LOCAL_ENABLED
+from users_app.database.settings import engine, pool_metrics, replica_set
 from users_app.exceptions.handlers import (
     ClientExceptionHandler,
     InternalExceptionHandler,
 )
 from users_app.middleware.auth import AuthdMidddleware
+from users_app.middleware.metrics import MetricsMiddleware
+from users_app.middleware.profiling import ProfilingMiddleware
+from users_app.monitoring import profiling
+from users_app.monitoring.metrics import ENABLED as METRICS_ENABLED
+from users_app.monitoring.metrics import (
+    SAMPLE_INTERVAL,
+    PoolSampler,
+    database_metrics,
+    mark_process_dead,
+    request_metrics,
+)
+from users_app.security.hasher import hasher
 
 app = FastAPI(
     title='Users API',
@@ -25,3 +41,40 @@ app.add_middleware(SessionMiddleware, secret_key=SECRET_KEY)
 app.add_middleware(AuthdMidddleware)
 app.add_exception_handler(500, InternalExceptionHandler())
 app.add_exception_handler(HTTPException, ClientExceptionHandler())
+
+if profiling.ENABLED:
+    app.add_middleware(ProfilingMiddleware)
+    profiling.attach(engine)
+    for replica_engine in replica_set.engines:
+        profiling.attach(replica_engine)
+
+pool_sampler = None
+if METRICS_ENABLED:
+    app.include_router(metrics_router)
+    app.add_middleware(MetricsMiddleware, metrics=request_metrics, routes=app.routes)
+    database_metrics.attach(engine, 'primary')
+    for replica_engine in replica_set.engines:
+        database_metrics.attach(replica_engine, 'replica')
+    pool_sampler = PoolSampler(pool_metrics, SAMPLE_INTERVAL)
+
+
+@app.on_event('startup')
+async def startup():
+    '''Starts background tasks.'''
+    if LOCAL_ENABLED:
+        invalidation_listener.start()
+    replica_set.start()
+    if pool_sampler is not None:
+        pool_sampler.start()
+
+
+@app.on_event('shutdown')
+async def shutdown():
+    '''Stops background tasks.'''
+    await invalidation_listener.stop()
+    await refresher.stop()
+    await replica_set.stop()
+    if pool_sampler is not None:
+        await pool_sampler.stop()
+        mark_process_dead()
+    hasher.executor.shutdown(wait=False)
@@ -1,36 +1,44 @@
-import re
-from http import HTTPStatus
-from typing import Callable
-
-from fastapi import HTTPException, Request
+from fastapi import HTTPException
 from fastapi.responses import JSONResponse
-from starlette.middleware.base import BaseHTTPMiddleware
+from starlette.requests import HTTPConnection
+from starlette.types import ASGIApp, Receive, Scope, Send
 
+from users_app.api.v1.routers.constants import PRIVATE_PREFIX, USER_PREFIX
 from users_app.services.auth import AuthService, get_auth_service
 from users_app.validation.schemas import CodelessErrorResponseModel
 
 
-class AuthdMidddleware(BaseHTTPMiddleware):
-    '''Custom middleware for authentification and authorization handling.'''
+class AuthdMidddleware:
+    '''Custom ASGI middleware for authentification and authorization handling.
+
+    JWT is decoded once per request, its `Payload` is stored in `request.state.payload`.
+    '''
 
-    def __init__(self, *args, **kwargs) -> None:
+    def __init__(self, app: ASGIApp) -> None:
         '''Init `AuthdMidddleware` instance.'''
-        super().__init__(*args, **kwargs)
+        self.app = app
         self.auth_service: AuthService = get_auth_service()
-        self.user_routes_schema = r'^\/users.*'
-        self.private_routes_schema = r'^\/private.*'
+        self.user_routes_prefixes = (USER_PREFIX,)
+        self.private_routes_prefixes = (PRIVATE_PREFIX,)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        '''Gets and checks JWT in request's cookie for protected paths.'''
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        path = scope['path']
+        if path.startswith(self.private_routes_prefixes):
+            check_jwt = self.auth_service.check_jwt_private
+        elif path.startswith(self.user_routes_prefixes):
+            check_jwt = self.auth_service.check_jwt
+        else:
+            return await self.app(scope, receive, send)
 
-    async def dispatch(self, request: Request, call_next: Callable):
-        '''Custom `disptatch` method for getting and cheching JWT in request's cookie.'''
+        session_token = HTTPConnection(scope).cookies.get('jwt_token')
         try:
-            if re.match(self.private_routes_schema, request.url.path):
-                await self.auth_service.check_jwt_private(request)
-            if re.match(self.user_routes_schema, request.url.path):
-                await self.auth_service.check_jwt(request)
+            payload = await check_jwt(session_token)
         except HTTPException as exc:
-            if exc.status_code == HTTPStatus.UNAUTHORIZED:
-                error_response = CodelessErrorResponseModel(message=exc.detail)
-            if exc.status_code == HTTPStatus.FORBIDDEN:
-                error_response = CodelessErrorResponseModel(message=exc.detail)
-            return JSONResponse(content=error_response.dict(), status_code=exc.status_code)
-        return await call_next(request)
+            error_response = CodelessErrorResponseModel(message=exc.detail)
+            response = JSONResponse(content=error_response.dict(), status_code=exc.status_code)
+            return await response(scope, receive, send)
+        scope.setdefault('state', {})['payload'] = payload
+        await self.app(scope, receive, send)
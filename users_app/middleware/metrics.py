@@ -0,0 +1,50 @@
+import time
+
+from starlette.routing import Match
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from users_app.monitoring.metrics import RequestMetrics
+
+
+class MetricsMiddleware:
+    '''Custom ASGI middleware which measures latency of requests per route.
+
+    Route is known only after routing, so it is taken from `endpoint` which router sets in scope.
+    Requests rejected before routing, such as unauthenticated ones, are matched against routes.
+    '''
+
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics, routes: list) -> None:
+        '''Init `MetricsMiddleware` instance, `routes` are those of application.'''
+        self.app = app
+        self.metrics = metrics
+        self.metrics.bind_routes(routes)
+        self.routes = routes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        '''Measures request from its start until response is sent.'''
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        started_at = time.perf_counter()
+        status = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status
+            if message['type'] == 'http.response.start':
+                status = message['status']
+            await send(message)
+
+        self.metrics.in_progress.inc()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            self.metrics.in_progress.dec()
+            endpoint = scope.get('endpoint') or self._match(scope)
+            self.metrics.observe(endpoint, scope['method'], status, time.perf_counter() - started_at)
+
+    def _match(self, scope: Scope):
+        '''Returns endpoint of route which matches request path, `None` if there is none.'''
+        for route in self.routes:
+            match, _ = route.matches(scope)
+            if match != Match.NONE:
+                return getattr(route, 'endpoint', None)
+        return None
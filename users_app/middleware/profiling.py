@@ -0,0 +1,45 @@
+import logging
+
+from starlette.datastructures import MutableHeaders
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from users_app.monitoring.profiling import RequestProfile, current_profile
+
+logger = logging.getLogger(__name__)
+
+
+class ProfilingMiddleware:
+    '''Custom ASGI middleware which profiles SQL statements, cache and hasher calls of requests.
+
+    Totals are sent in `Server-Timing` header, requests over budget are logged.
+    Statements of streamed responses made after headers are sent are logged only.
+    '''
+
+    def __init__(self, app: ASGIApp) -> None:
+        '''Init `ProfilingMiddleware` instance.'''
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        '''Profiles request and adds `Server-Timing` header to its response.'''
+        if scope['type'] != 'http':
+            return await self.app(scope, receive, send)
+        profile = RequestProfile()
+        token = current_profile.set(profile)
+
+        async def send_with_timing(message: Message) -> None:
+            if message['type'] == 'http.response.start':
+                MutableHeaders(scope=message).append('Server-Timing', profile.server_timing())
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_timing)
+        finally:
+            current_profile.reset(token)
+            if profile.over_budget():
+                logger.warning(
+                    'Request %s %s is over budget: %d queries in %.1f ms, %d cache calls in %.1f ms, '
+                    'hashing %.1f ms, total %.1f ms',
+                    scope['method'], scope['path'], profile.db_count, profile.db_time * 1000,
+                    profile.cache_count, profile.cache_time * 1000, profile.hash_time * 1000,
+                    profile.duration * 1000,
+                )
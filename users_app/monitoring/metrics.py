@@ -0,0 +1,209 @@
+import asyncio
+import logging
+import os
+import time
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config import METRICS_ENABLED, METRICS_SAMPLE_INTERVAL, METRICS_TOKEN
+
+try:
+    import prometheus_client
+    from prometheus_client import multiprocess
+except ImportError:
+    prometheus_client = None
+
+logger = logging.getLogger(__name__)
+
+# Metrics are collected only if `prometheus_client` is installed.
+ENABLED = METRICS_ENABLED and prometheus_client is not None
+if METRICS_ENABLED and not ENABLED:
+    logger.warning('Metrics are enabled, but prometheus_client is not installed, they are not collected.')
+SAMPLE_INTERVAL = float(METRICS_SAMPLE_INTERVAL)
+# Bearer token of scrapers, metrics are not served to anyone without it.
+TOKEN = METRICS_TOKEN
+if ENABLED and not TOKEN:
+    logger.warning('Metrics are enabled, but METRICS_TOKEN is not set, they are not served.')
+# Directory which makes `prometheus_client` keep metrics of every worker process in files.
+MULTIPROC_DIR = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+
+UNMATCHED_ROUTE = 'unmatched'
+HTTP_METHODS = frozenset(('GET', 'HEAD', 'POST', 'PUT', 'PATCH', 'DELETE', 'OPTIONS'))
+CACHE_OPERATIONS = (
+    'get', 'get_many', 'get_with_ttl', 'set', 'set_if_unchanged', 'set_many', 'clear',
+    'get_version', 'invalidate', 'get_counter', 'set_counter', 'incr_counter',
+)
+CACHE_TIERS = ('local', 'remote')
+DB_ROLES = ('primary', 'replica')
+POOL_GAUGES = ('size', 'checked_out', 'idle', 'overflow')
+POOL_COUNTERS = ('timeouts', 'invalidations')
+
+
+class RequestMetrics:
+    '''Latency histogram of requests per route and gauge of requests in progress.'''
+
+    def __init__(self, latency=None, in_progress=None) -> None:
+        '''Init `RequestMetrics` instance, collectors of `prometheus_client` are created unless they are given.'''
+        self.latency = latency or prometheus_client.Histogram(
+            'http_request_duration_seconds', 'Request latency.', ('method', 'route', 'status'),
+        )
+        self.in_progress = in_progress or prometheus_client.Gauge(
+            'http_requests_in_progress', 'Requests in progress.', multiprocess_mode='livesum',
+        )
+        self._routes: dict = {}
+        self._children: dict[tuple, object] = {}
+
+    def bind_routes(self, routes: list) -> None:
+        '''Remembers route templates of endpoints, so latency of paths with ids is labeled by route.'''
+        self._routes = {route.endpoint: route.path for route in routes if hasattr(route, 'endpoint')}
+
+    def observe(self, endpoint, method: str, status: int, seconds: float) -> None:
+        '''Counts request, label children are created once per endpoint, method and status.'''
+        if method not in HTTP_METHODS:
+            method = 'OTHER'
+        key = (endpoint, method, status)
+        child = self._children.get(key)
+        if child is None:
+            route = self._routes.get(endpoint, UNMATCHED_ROUTE)
+            child = self._children[key] = self.latency.labels(method, route, str(int(status)))
+        child.observe(seconds)
+
+
+class CacheMetrics:
+    '''Hits, misses and latency of remote cache operations, hits and misses of two-tier cache tiers.'''
+
+    def __init__(self) -> None:
+        '''Init `CacheMetrics` instance with label children bound for every operation and tier.'''
+        hits = prometheus_client.Counter('cache_hits_total', 'Cache hits.', ('operation',))
+        misses = prometheus_client.Counter('cache_misses_total', 'Cache misses.', ('operation',))
+        tier_hits = prometheus_client.Counter('cache_tier_hits_total', 'Two-tier cache hits.', ('tier',))
+        tier_misses = prometheus_client.Counter('cache_tier_misses_total', 'Two-tier cache misses.', ('tier',))
+        latency = prometheus_client.Histogram(
+            'cache_operation_duration_seconds', 'Cache operation latency.', ('operation',),
+            buckets=(.0005, .001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.0),
+        )
+        self.hits = {operation: hits.labels(operation) for operation in CACHE_OPERATIONS}
+        self.misses = {operation: misses.labels(operation) for operation in CACHE_OPERATIONS}
+        self.latency = {operation: latency.labels(operation) for operation in CACHE_OPERATIONS}
+        self.tier_hits = {tier: tier_hits.labels(tier) for tier in CACHE_TIERS}
+        self.tier_misses = {tier: tier_misses.labels(tier) for tier in CACHE_TIERS}
+
+    def observe(self, operation: str, seconds: float, hits: int = 0, misses: int = 0) -> None:
+        '''Counts cache operation.'''
+        self.latency[operation].observe(seconds)
+        if hits:
+            self.hits[operation].inc(hits)
+        if misses:
+            self.misses[operation].inc(misses)
+
+    def observe_tier(self, tier: str, hit: bool) -> None:
+        '''Counts lookup in a tier of two-tier cache.'''
+        (self.tier_hits if hit else self.tier_misses)[tier].inc()
+
+
+class DatabaseMetrics:
+    '''Counts and durations of SQL statements, fed from engine events.'''
+
+    def __init__(self) -> None:
+        '''Init `DatabaseMetrics` instance with label children bound for every engine role.'''
+        latency = prometheus_client.Histogram(
+            'db_query_duration_seconds', 'SQL statement latency.', ('role',),
+            buckets=(.001, .0025, .005, .01, .025, .05, .1, .25, .5, 1.0, 2.5, 5.0),
+        )
+        self.latency = {role: latency.labels(role) for role in DB_ROLES}
+
+    def attach(self, engine: AsyncEngine, role: str) -> None:
+        '''Subscribes to statement execution events of engine.'''
+        latency = self.latency[role]
+
+        def before_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+            context._metrics_started_at = time.perf_counter()
+
+        def after_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+            latency.observe(time.perf_counter() - context._metrics_started_at)
+
+        event.listen(engine.sync_engine, 'before_cursor_execute', before_execute)
+        event.listen(engine.sync_engine, 'after_cursor_execute', after_execute)
+
+
+class HasherMetrics:
+    '''Duration of password checks, including wait for a free hasher worker.'''
+
+    def __init__(self) -> None:
+        '''Init `HasherMetrics` instance.'''
+        self.verify_latency = prometheus_client.Histogram(
+            'password_verify_duration_seconds', 'Password check latency.',
+            buckets=(.01, .025, .05, .1, .25, .5, 1.0, 2.5, 5.0),
+        )
+
+
+class PoolSampler:
+    '''Copies connection pool state to gauges of the process periodically.'''
+
+    def __init__(self, pool_metrics, interval: float) -> None:
+        '''Init `PoolSampler` instance for `PoolMetrics` of primary engine.'''
+        self.pool_metrics = pool_metrics
+        self.interval = interval
+        self.gauges = {
+            name: prometheus_client.Gauge(f'db_pool_{name}', f'Pool {name} connections.', multiprocess_mode='livesum')
+            for name in POOL_GAUGES
+        }
+        self.counters = {
+            name: prometheus_client.Counter(f'db_pool_{name}', f'Pool {name}.')
+            for name in POOL_COUNTERS
+        }
+        self._counted = dict.fromkeys(POOL_COUNTERS, 0)
+        self._task: asyncio.Task | None = None
+
+    def sample(self) -> None:
+        '''Sets gauges to current pool state and adds counters' growth since previous sample.'''
+        snapshot = self.pool_metrics.snapshot()
+        for name, gauge in self.gauges.items():
+            gauge.set(snapshot[name])
+        for name, counter in self.counters.items():
+            counter.inc(snapshot[name] - self._counted[name])
+            self._counted[name] = snapshot[name]
+
+    def start(self) -> None:
+        '''Starts sampling in background.'''
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        '''Stops sampling.'''
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def _run(self) -> None:
+        '''Samples pool periodically.'''
+        while True:
+            self.sample()
+            await asyncio.sleep(self.interval)
+
+
+def generate_latest() -> bytes:
+    '''Returns metrics of all worker processes in text format.'''
+    if MULTIPROC_DIR:
+        registry = prometheus_client.CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+        return prometheus_client.generate_latest(registry)
+    return prometheus_client.generate_latest()
+
+
+def mark_process_dead() -> None:
+    '''Drops live gauges of stopping worker process.'''
+    if MULTIPROC_DIR:
+        multiprocess.mark_process_dead(os.getpid())
+
+
+request_metrics = RequestMetrics() if ENABLED else None
+cache_metrics = CacheMetrics() if ENABLED else None
+database_metrics = DatabaseMetrics() if ENABLED else None
+hasher_metrics = HasherMetrics() if ENABLED else None
+CONTENT_TYPE = prometheus_client.CONTENT_TYPE_LATEST if prometheus_client is not None else 'text/plain'
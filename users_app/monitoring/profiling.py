@@ -0,0 +1,86 @@
+import time
+from contextvars import ContextVar
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config import PROFILING_ENABLED, PROFILING_MAX_DURATION, PROFILING_MAX_QUERIES
+
+ENABLED = PROFILING_ENABLED
+# Budgets of a request, going over them is logged.
+MAX_QUERIES = int(PROFILING_MAX_QUERIES)
+MAX_DURATION = float(PROFILING_MAX_DURATION) / 1000
+
+
+class RequestProfile:
+    '''Quantity and total time of SQL statements, cache and password hasher calls of a request.'''
+
+    __slots__ = ('started_at', 'db_count', 'db_time', 'cache_count', 'cache_time', 'hash_count', 'hash_time')
+
+    def __init__(self) -> None:
+        '''Init `RequestProfile` instance with zero counters.'''
+        self.started_at = time.perf_counter()
+        self.db_count = self.cache_count = self.hash_count = 0
+        self.db_time = self.cache_time = self.hash_time = 0.0
+
+    @property
+    def duration(self) -> float:
+        '''Seconds since request has started.'''
+        return time.perf_counter() - self.started_at
+
+    def server_timing(self) -> str:
+        '''Returns value of `Server-Timing` header with durations in milliseconds.'''
+        return (
+            f'db;dur={self.db_time * 1000:.1f};desc="{self.db_count} queries", '
+            f'cache;dur={self.cache_time * 1000:.1f};desc="{self.cache_count} calls", '
+            f'hash;dur={self.hash_time * 1000:.1f}, '
+            f'total;dur={self.duration * 1000:.1f}'
+        )
+
+    def over_budget(self) -> bool:
+        '''Checks whether request has made too many queries or taken too long.'''
+        return self.db_count > MAX_QUERIES or self.duration > MAX_DURATION
+
+
+current_profile: ContextVar[RequestProfile | None] = ContextVar('current_profile', default=None)
+
+
+def record_cache(seconds: float) -> None:
+    '''Adds cache call to profile of current request if it is profiled.'''
+    profile = current_profile.get()
+    if profile is not None:
+        profile.cache_count += 1
+        profile.cache_time += seconds
+
+
+def record_hash(seconds: float) -> None:
+    '''Adds password hasher call to profile of current request if it is profiled.'''
+    profile = current_profile.get()
+    if profile is not None:
+        profile.hash_count += 1
+        profile.hash_time += seconds
+
+
+def attach(engine: AsyncEngine) -> None:
+    '''Subscribes to statement execution events of engine to profile statements of requests.'''
+    event.listen(engine.sync_engine, 'before_cursor_execute', _before_execute)
+    event.listen(engine.sync_engine, 'after_cursor_execute', _after_execute)
+
+
+def detach(engine: AsyncEngine) -> None:
+    '''Unsubscribes from statement execution events of engine.'''
+    event.remove(engine.sync_engine, 'before_cursor_execute', _before_execute)
+    event.remove(engine.sync_engine, 'after_cursor_execute', _after_execute)
+
+
+def _before_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    '''Remembers start time of statement.'''
+    context._profile_started_at = time.perf_counter()
+
+
+def _after_execute(conn, cursor, statement, parameters, context, executemany) -> None:
+    '''Adds statement to profile of current request if it is profiled.'''
+    profile = current_profile.get()
+    if profile is not None:
+        profile.db_count += 1
+        profile.db_time += time.perf_counter() - context._profile_started_at
@@ -1,27 +1,71 @@
+import hashlib
+import time
+
 import jwt
+from pydantic import ValidationError
 
-from config import JWT_ALGORITHM, JWT_KEY
+from config import JWT_ALGORITHM, JWT_CACHE_SIZE, JWT_EXP, JWT_KEY
+from users_app.cache.local import LocalCache
 from users_app.validation.schemas import Payload
 
 
 class Cifer:
-    '''Cifer which provides cryptographic operations for JWT handling.'''
+    '''Cifer which provides cryptographic operations for JWT handling.
+
+    With positive `cache_size` verified tokens are kept in LRU cache until they expire,
+    so a token presented again is not verified and parsed again.
+    '''
 
-    def __init__(self, secret_key: str, algorithm: str) -> None:
+    def __init__(self, secret_key: str, algorithm: str, expire_time: int = 3600, cache_size: int = 0) -> None:
         self.secret_key = secret_key
         self.algorithm = algorithm
+        self.expire_time = expire_time
+        self.cache = LocalCache(max_size=cache_size, expire_time=expire_time) if cache_size > 0 else None
+        self.cache_hits = 0
+        self.cache_misses = 0
 
     def encode(self, payload: Payload) -> str:
-        '''Encodesgiven payload to JWT.'''
-        encoded_jwt = jwt.encode(payload.dict(), self.secret_key, algorithm=self.algorithm)
+        '''Encodesgiven payload to JWT which expires in `expire_time` seconds.'''
+        claims = payload.dict()
+        claims['exp'] = int(time.time()) + self.expire_time
+        encoded_jwt = jwt.encode(claims, self.secret_key, algorithm=self.algorithm)
         return encoded_jwt
 
     def decode(self, encoded_jwt: str) -> Payload:
         '''Decodesgiven JWT and returns payload.'''
-        payload = jwt.decode(encoded_jwt, self.secret_key, algorithms=[self.algorithm])
+        if self.cache is None:
+            return self._decode(encoded_jwt)[0]
+        key = hashlib.blake2b(encoded_jwt.encode(), digest_size=16).hexdigest()
+        hit, payload = self.cache.get(key)
+        if hit:
+            self.cache_hits += 1
+            return payload
+        self.cache_misses += 1
+        payload, expires_at = self._decode(encoded_jwt)
+        if expires_at is not None:
+            self.cache.set(key, payload, expire_time=expires_at - time.time())
         return payload
 
+    def stats(self) -> dict:
+        '''Returns counters of verified tokens cache.'''
+        return {
+            'cache_size': len(self.cache) if self.cache is not None else 0,
+            'cache_hits': self.cache_hits,
+            'cache_misses': self.cache_misses,
+        }
+
+    def _decode(self, encoded_jwt: str) -> tuple[Payload, float | None]:
+        '''Verifies JWT and returns its payload with expiration time.'''
+        claims = jwt.decode(encoded_jwt, self.secret_key, algorithms=[self.algorithm])
+        try:
+            return Payload(**claims), claims.get('exp')
+        except ValidationError as exc:
+            raise jwt.InvalidTokenError('Invalid payload.') from exc
+
+
+cifer = Cifer(JWT_KEY, JWT_ALGORITHM, int(JWT_EXP), int(JWT_CACHE_SIZE))  # type: ignore
+
 
 def get_cifer() -> Cifer:
     '''Returns `Cifer` instance for dependency injection.'''
-    return Cifer(JWT_KEY, JWT_ALGORITHM)  # type: ignore
+    return cifer
@@ -1,8 +1,134 @@
+import asyncio
+import os
+import time
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from functools import lru_cache
+from typing import Callable
+
 from passlib.context import CryptContext
 
-from config import HASH_SCHEMA
+from config import HASH_EXECUTOR, HASH_QUEUE_SIZE, HASH_SCHEMA, HASH_WORKERS
+from users_app.monitoring.profiling import record_hash
+
+
+class HasherBusyError(Exception):
+    '''Raised when hashing queue is full.'''
+
+
+class PasswordHasher:
+    '''Runs password hashing and verification in executor, off the event loop.
+
+    At most `max_workers` jobs run at once, the rest wait in a queue bounded by `max_queue`.
+    '''
+
+    def __init__(self, executor: Executor, schema: str, max_workers: int, max_queue: int) -> None:
+        '''Init `PasswordHasher` instance.'''
+        self.executor = executor
+        self.schema = schema
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self._slots = asyncio.Semaphore(max_workers)
+        self.pending = 0
+        self.tasks_total = 0
+        self.rejected_total = 0
+        self.wait_time_total = 0.0
+        self.wait_time_max = 0.0
+
+    async def hash(self, password: str) -> str:
+        '''Returns hash of given password.'''
+        return await self._run(_hash_password, self.schema, password)
+
+    async def hash_many(self, passwords: list[str]) -> list[str]:
+        '''Returns hashes of given passwords.
+
+        Waits for free workers instead of being rejected, but takes at most `max_workers`
+        places in the queue at once, so other callers are not starved.
+        '''
+        hashes: list[str] = []
+        for start in range(0, len(passwords), self.max_workers):
+            chunk = passwords[start:start + self.max_workers]
+            hashes.extend(await asyncio.gather(*(
+                self._run(_hash_password, self.schema, password, bounded=False) for password in chunk
+            )))
+        return hashes
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        '''Checks password against its hash.'''
+        return await self._run(_verify_password, self.schema, plain_password, hashed_password)
+
+    @property
+    def queue_depth(self) -> int:
+        '''Quantity of jobs waiting for a free worker.'''
+        return max(self.pending - self.max_workers, 0)
+
+    def stats(self) -> dict:
+        '''Returns queue and wait time metrics.'''
+        return {
+            'queue_depth': self.queue_depth,
+            'in_progress': min(self.pending, self.max_workers),
+            'tasks_total': self.tasks_total,
+            'rejected_total': self.rejected_total,
+            'wait_time_total': self.wait_time_total,
+            'wait_time_max': self.wait_time_max,
+        }
+
+    async def _run(self, func: Callable, *args, bounded: bool = True):
+        '''Runs job in executor once there is a free worker, rejects it if queue is full.'''
+        if bounded and self.pending >= self.max_workers + self.max_queue:
+            self.rejected_total += 1
+            raise HasherBusyError
+        self.pending += 1
+        queued_at = time.perf_counter()
+        try:
+            async with self._slots:
+                wait_time = time.perf_counter() - queued_at
+                self.tasks_total += 1
+                self.wait_time_total += wait_time
+                self.wait_time_max = max(self.wait_time_max, wait_time)
+                loop = asyncio.get_running_loop()
+                return await loop.run_in_executor(self.executor, func, *args)
+        finally:
+            self.pending -= 1
+            record_hash(time.perf_counter() - queued_at)
+
+
+@lru_cache
+def _get_crypt_context(schema: str) -> CryptContext:
+    '''Returns `CryptContext` of given schema, one per process.'''
+    return CryptContext(schemes=[schema], deprecated='auto')
+
+
+def _hash_password(schema: str, password: str) -> str:
+    '''Hashes password, runs in executor.'''
+    return _get_crypt_context(schema).hash(password)
+
+
+def _verify_password(schema: str, plain_password: str, hashed_password: str) -> bool:
+    '''Verifies password, runs in executor.'''
+    return _get_crypt_context(schema).verify(plain_password, hashed_password)
+
+
+def _create_executor(kind: str, max_workers: int) -> Executor:
+    '''Returns thread or process pool executor.'''
+    if kind == 'process':
+        return ProcessPoolExecutor(max_workers=max_workers)
+    return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='hasher')
+
+
+_workers = int(HASH_WORKERS or os.cpu_count() or 1)
+hasher = PasswordHasher(
+    executor=_create_executor(HASH_EXECUTOR, _workers),
+    schema=HASH_SCHEMA,
+    max_workers=_workers,
+    max_queue=int(HASH_QUEUE_SIZE),
+)
 
 
 def get_pwd_context():
     '''Returns `CryptContext` instance for dependency injection.'''
     return CryptContext(schemes=[HASH_SCHEMA], deprecated='auto')
+
+
+def get_hasher() -> PasswordHasher:
+    '''Returns `PasswordHasher` instance for dependency injection.'''
+    return hasher
@@ -0,0 +1,153 @@
+import hashlib
+import logging
+import math
+import secrets
+import time
+
+from aioredis.client import Redis
+from aioredis.exceptions import RedisError
+
+from config import (
+    LOGIN_LIMIT_PER_CLIENT,
+    LOGIN_LIMIT_PER_LOGIN,
+    LOGIN_THROTTLE_ENABLED,
+    LOGIN_WINDOW,
+)
+from users_app.cache.local import LocalCache
+from users_app.cache.settings import redis_client
+
+logger = logging.getLogger(__name__)
+
+# Sliding window log per key: registers attempt in every key only if none of them is over limit.
+# Returns time in milliseconds until each key allows the next attempt, zero if it allows it now.
+SLIDING_WINDOW_SCRIPT = '''
+local now = tonumber(ARGV[1])
+local window = tonumber(ARGV[2])
+local retry_after = {}
+local throttled = false
+for i, key in ipairs(KEYS) do
+    redis.call('ZREMRANGEBYSCORE', key, '-inf', now - window)
+    retry_after[i] = 0
+    if redis.call('ZCARD', key) >= tonumber(ARGV[3 + i]) then
+        local oldest = redis.call('ZRANGE', key, 0, 0, 'WITHSCORES')
+        retry_after[i] = math.max(tonumber(oldest[2]) + window - now, 1)
+        throttled = true
+    end
+end
+if not throttled then
+    for i, key in ipairs(KEYS) do
+        redis.call('ZADD', key, now, ARGV[3])
+        redis.call('PEXPIRE', key, window)
+    end
+end
+return retry_after
+'''
+
+
+class ThrottledError(Exception):
+    '''Raised when login attempts limit is exceeded.'''
+
+    def __init__(self, retry_after: float) -> None:
+        super().__init__(retry_after)
+        self.retry_after = retry_after
+
+
+class LoginThrottle:
+    '''Limits failed login attempts per login and per client within sliding window.
+
+    Attempts are registered before credentials are checked, so concurrent attempts are
+    limited too, and successful ones are forgotten afterwards. Counters live in Redis,
+    keys which are known to be over limit are also kept in process memory, so repeated
+    attempts are rejected without a round trip.
+    '''
+
+    def __init__(self, cache_client: Redis, window: int, login_limit: int,
+                 client_limit: int, local_max_size: int = 10000) -> None:
+        '''Init `LoginThrottle` instance, `window` is given in seconds.'''
+        self.window = window
+        self.login_limit = login_limit
+        self.client_limit = client_limit
+        self._redis_client = cache_client
+        self._sliding_window = cache_client.register_script(SLIDING_WINDOW_SCRIPT)
+        self._blocked = LocalCache(max_size=local_max_size, expire_time=window)
+
+    async def check(self, login: str, client: str | None) -> str | None:
+        '''Registers login attempt, raises `ThrottledError` if it is over limit.
+
+        Returns id of the attempt, `None` if it was not registered. Attempts of unknown
+        clients are only limited per login.
+        '''
+        keys = self._get_keys(login, client)
+        limits = [self.login_limit, self.client_limit][:len(keys)]
+        for key in keys:
+            hit, blocked_until = self._blocked.get(key)
+            if hit:
+                raise ThrottledError(retry_after=blocked_until - time.monotonic())
+
+        now = int(time.time() * 1000)
+        member = f'{now}-{secrets.token_hex(4)}'
+        try:
+            retry_after = await self._sliding_window(
+                keys=keys,
+                args=[now, self.window * 1000, member, *limits],
+            )
+        except RedisError:
+            logger.warning('Login throttling is unavailable, attempt is allowed.', exc_info=True)
+            return None
+        retry_after = [int(milliseconds) / 1000 for milliseconds in retry_after]
+        if not any(retry_after):
+            return member
+        for key, seconds in zip(keys, retry_after):
+            if seconds:
+                self._blocked.set(key, time.monotonic() + seconds, expire_time=seconds)
+        raise ThrottledError(retry_after=max(retry_after))
+
+    async def succeed(self, login: str, client: str | None, attempt: str | None) -> None:
+        '''Forgets failed attempts of login and the successful attempt of client.'''
+        if attempt is None:
+            return
+        login_key, *client_keys = self._get_keys(login, client)
+        try:
+            async with self._redis_client.pipeline(transaction=False) as pipe:
+                pipe.delete(login_key)
+                for key in client_keys:
+                    pipe.zrem(key, attempt)
+                await pipe.execute()
+        except RedisError:
+            logger.warning('Login throttling is unavailable, attempt is not forgotten.', exc_info=True)
+
+    def _get_keys(self, login: str, client: str | None) -> list[str]:
+        '''Returns keys of attempts of login and of client if it is known.'''
+        login_digest = hashlib.blake2b(login.lower().encode(), digest_size=16).hexdigest()
+        keys = [f'throttle-login-{login_digest}']
+        if client:
+            keys.append(f'throttle-client-{client}')
+        return keys
+
+
+class DisabledLoginThrottle:
+    '''Throttle which allows every attempt.'''
+
+    async def check(self, login: str, client: str | None) -> None:
+        '''Allows login attempt.'''
+
+    async def succeed(self, login: str, client: str | None, attempt: None) -> None:
+        '''Does nothing, attempts are not counted.'''
+
+
+def retry_after_header(retry_after: float) -> dict:
+    '''Returns `Retry-After` header in whole seconds.'''
+    return {'Retry-After': str(max(math.ceil(retry_after), 1))}
+
+
+login_throttle = LoginThrottle(
+    cache_client=redis_client,
+    window=int(LOGIN_WINDOW),
+    login_limit=int(LOGIN_LIMIT_PER_LOGIN),
+    client_limit=int(LOGIN_LIMIT_PER_CLIENT),
+) if LOGIN_THROTTLE_ENABLED else DisabledLoginThrottle()
+
+
+def get_login_throttle() -> LoginThrottle | DisabledLoginThrottle:
+    '''Returns login throttle instance for dependency injection.'''
+    return login_throttle
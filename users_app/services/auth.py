@@ -1,7 +1,8 @@
+import time
 from http import HTTPStatus
 
+import jwt
 from fastapi import Depends, HTTPException, Request
-from passlib.context import CryptContext
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from users_app.database.crud.users import UserCRUD
@@ -10,62 +11,102 @@ from users_app.exceptions.constants import (
     MSG_INVALID_CREDS,
     MSG_NOT_AUTHENTICATED,
     MSG_NOT_AUTHORIZED,
+    MSG_SERVICE_BUSY,
+    MSG_TOO_MANY_ATTEMPTS,
 )
+from users_app.monitoring.metrics import hasher_metrics
 from users_app.security.cifer import Cifer, get_cifer
-from users_app.security.hasher import get_pwd_context
+from users_app.security.hasher import HasherBusyError, PasswordHasher, get_hasher
+from users_app.security.throttling import (
+    LoginThrottle,
+    ThrottledError,
+    get_login_throttle,
+    retry_after_header,
+)
 from users_app.validation.schemas import CurrentUserResponseModel, LoginModel, Payload
 
 
 class AuthService:
-    def __init__(self, user_crud: UserCRUD, pwd_context: CryptContext) -> None:
+    def __init__(self, user_crud: UserCRUD, hasher: PasswordHasher, throttle: LoginThrottle) -> None:
         '''Init `AuthService` instance.'''
         self.user_crud = user_crud
-        self.pwd_context = pwd_context
+        self.hasher = hasher
+        self.throttle = throttle
         self.cifer: Cifer = get_cifer()
 
-    async def authenticate_user(self, credentials: LoginModel) -> CurrentUserResponseModel:
-        '''Checks recieved credentials.'''
+    async def authenticate_user(self, credentials: LoginModel, client: str | None) -> CurrentUserResponseModel:
+        '''Checks recieved credentials, rejects attempts over limit before any hashing.'''
+        try:
+            attempt = await self.throttle.check(login=credentials.login, client=client)
+        except ThrottledError as exc:
+            raise HTTPException(
+                status_code=HTTPStatus.TOO_MANY_REQUESTS,
+                detail=MSG_TOO_MANY_ATTEMPTS,
+                headers=retry_after_header(exc.retry_after),
+            )
         user = await self.user_crud.read_by_login(credentials.login)
-        if not user or not self._verify_password(credentials.password, user.password):
+        if not user or not await self._verify_password(credentials.password, user.password):
             raise HTTPException(
                 status_code=HTTPStatus.BAD_REQUEST,
                 detail=MSG_INVALID_CREDS,
             )
+        await self.throttle.succeed(login=credentials.login, client=client, attempt=attempt)
         return user
 
     async def encode_token(self, payload: Payload) -> str:
         '''Encodespayload to JWT.'''
         return self.cifer.encode(payload)
 
-    async def check_jwt(self, request: Request) -> Payload:
-        '''ChecksJWT in request's cookie.'''
-        session_token = request.cookies.get('jwt_token')
+    async def check_jwt(self, session_token: str | None) -> Payload:
+        '''ChecksJWT from request's cookie and returns its payload.'''
         if not session_token:
             raise HTTPException(
                 status_code=HTTPStatus.UNAUTHORIZED,
                 detail=MSG_NOT_AUTHENTICATED,
             )
-        payload = self.cifer.decode(session_token)
-        return payload
+        try:
+            return self.cifer.decode(session_token)
+        except jwt.InvalidTokenError:
+            raise HTTPException(
+                status_code=HTTPStatus.UNAUTHORIZED,
+                detail=MSG_NOT_AUTHENTICATED,
+            )
 
-    async def check_jwt_private(self, request: Request) -> None:
-        '''ChecksJWT in request's cookie and validate `is_admin` field in payload.'''
-        payload = await self.check_jwt(request)
-        if not payload.get('is_admin'):
+    async def check_jwt_private(self, session_token: str | None) -> Payload:
+        '''ChecksJWT from request's cookie and validate `is_admin` field in payload.'''
+        payload = await self.check_jwt(session_token)
+        if not payload.is_admin:
             raise HTTPException(
                 status_code=HTTPStatus.FORBIDDEN,
                 detail=MSG_NOT_AUTHORIZED,
             )
+        return payload
 
-    def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
+    async def _verify_password(self, plain_password: str, hashed_password: str) -> bool:
         '''Checkspassword in recieved credentialds and hashed password in database.'''
-        return self.pwd_context.verify(plain_password, hashed_password)
+        started_at = time.perf_counter()
+        try:
+            return await self.hasher.verify(plain_password, hashed_password)
+        except HasherBusyError:
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail=MSG_SERVICE_BUSY,
+            )
+        finally:
+            if hasher_metrics is not None:
+                hasher_metrics.verify_latency.observe(time.perf_counter() - started_at)
+
+
+def get_payload(request: Request) -> Payload:
+    '''Returns `Payload` decoded by `AuthdMidddleware` for dependency injection.'''
+    return request.state.payload
 
 
 def get_auth_service(
     session: AsyncSession = Depends(get_session),
-    pwd_context: CryptContext = Depends(get_pwd_context)
+    hasher: PasswordHasher = Depends(get_hasher),
+    throttle: LoginThrottle = Depends(get_login_throttle),
 ):
     '''Returns `AuthService` instance for dependency injection.'''
     user_crud = UserCRUD(session)
-    return AuthService(user_crud, pwd_context)
+    return AuthService(user_crud, hasher, throttle)
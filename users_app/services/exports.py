@@ -0,0 +1,47 @@
+import csv
+import io
+import json
+from typing import AsyncIterator, Sequence
+
+from users_app.services.imports import CSV, NDJSON
+
+EXPORT_COLUMNS = (
+    'id',
+    'first_name',
+    'last_name',
+    'other_name',
+    'email',
+    'phone',
+    'birthday',
+    'city',
+    'additional_info',
+    'is_admin',
+)
+EXPORT_MEDIA_TYPES = {
+    NDJSON: 'application/x-ndjson',
+    CSV: 'text/csv',
+}
+
+
+async def serialize_rows(batches: AsyncIterator[Sequence[tuple]],
+                         export_format: str) -> AsyncIterator[str]:
+    '''Serializes batches of `EXPORT_COLUMNS` rows to NDJSON or CSV, yields one chunk per batch.
+
+    CSV output starts with header line, `None` values are written empty.
+    '''
+    if export_format == CSV:
+        yield _to_csv([EXPORT_COLUMNS])
+    async for rows in batches:
+        if export_format == NDJSON:
+            yield ''.join(
+                json.dumps(dict(zip(EXPORT_COLUMNS, row)), default=str) + '\n' for row in rows
+            )
+        else:
+            yield _to_csv(rows)
+
+
+def _to_csv(rows: Sequence[Sequence]) -> str:
+    '''Returns rows as CSV lines.'''
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator='\n').writerows(rows)
+    return buffer.getvalue()
@@ -0,0 +1,89 @@
+import csv
+import json
+from typing import AsyncIterator
+
+from pydantic import ValidationError
+
+from users_app.database.models import User
+from users_app.validation.schemas import PrivateCreateUserModel
+
+NDJSON = 'ndjson'
+CSV = 'csv'
+IMPORT_FORMATS = {
+    'application/x-ndjson': NDJSON,
+    'application/ndjson': NDJSON,
+    'text/csv': CSV,
+}
+
+
+def get_import_format(content_type: str) -> str | None:
+    '''Returns import format by request's content type.'''
+    return IMPORT_FORMATS.get(content_type.split(';')[0].strip().lower())
+
+
+async def parse_records(chunks: AsyncIterator[bytes],
+                        import_format: str) -> AsyncIterator[tuple[int, dict | None, str | None]]:
+    '''Parses streamed NDJSON or CSV body, yields line number with record or error.
+
+    CSV body starts with header line and keeps one record per line, empty values are omitted.
+    '''
+    header = None
+    async for number, line in _iter_lines(chunks):
+        if not line.strip():
+            continue
+        if import_format == NDJSON:
+            try:
+                record = json.loads(line)
+            except json.JSONDecodeError:
+                yield number, None, 'malformed JSON'
+                continue
+            if not isinstance(record, dict):
+                yield number, None, 'JSON object expected'
+                continue
+            yield number, record, None
+        else:
+            values = next(csv.reader([line]))
+            if header is None:
+                header = values
+                continue
+            if len(values) != len(header):
+                yield number, None, f'{len(header)} values expected'
+                continue
+            yield number, {field: value for field, value in zip(header, values) if value != ''}, None
+
+
+def validate_record(record: dict) -> tuple[PrivateCreateUserModel | None, str | None]:
+    '''Returns validated user data or error.'''
+    try:
+        data = PrivateCreateUserModel(**record)
+    except ValidationError as exc:
+        return None, '; '.join(
+            f'{".".join(map(str, error["loc"]))}: {error["msg"]}' for error in exc.errors()
+        )
+    error = check_lengths(data.dict())
+    if error is not None:
+        return None, error
+    return data, None
+
+
+def check_lengths(values: dict) -> str | None:
+    '''Returns error if a string value is longer than its `User` column allows.'''
+    for field, value in values.items():
+        length = getattr(User.__table__.c[field].type, 'length', None) if field in User.__table__.c else None
+        if isinstance(value, str) and length is not None and len(value) > length:
+            return f'{field}: ensure this value has at most {length} characters'
+    return None
+
+
+async def _iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[tuple[int, str]]:
+    '''Splits streamed body to numbered lines.'''
+    number = 0
+    buffer = b''
+    async for chunk in chunks:
+        buffer += chunk
+        *lines, buffer = buffer.split(b'\n')
+        for line in lines:
+            number += 1
+            yield number, line.decode(errors='replace').rstrip('\r')
+    if buffer:
+        yield number + 1, buffer.decode(errors='replace').rstrip('\r')
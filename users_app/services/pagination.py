@@ -0,0 +1,21 @@
+import base64
+import binascii
+import json
+
+
+def encode_cursor(values: dict) -> str:
+    '''Encodes keyset values of the last row on a page to an opaque cursor.'''
+    raw = json.dumps(values, separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).rstrip(b'=').decode()
+
+
+def decode_cursor(cursor: str) -> dict:
+    '''Decodes opaque cursor back to keyset values, raises `ValueError` if it is malformed.'''
+    padded = cursor + '=' * (-len(cursor) % 4)
+    try:
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except (binascii.Error, UnicodeDecodeError, json.JSONDecodeError) as exc:
+        raise ValueError('Malformed cursor.') from exc
+    if not isinstance(values, dict):
+        raise ValueError('Malformed cursor.')
+    return values
@@ -1,28 +1,60 @@
+import math
+import time
+from collections import defaultdict
+from datetime import date
 from http import HTTPStatus
+from typing import AsyncIterator, Awaitable, Callable
 
 from fastapi import Depends, HTTPException
-from passlib.context import CryptContext
+from pydantic import BaseModel
 from sqlalchemy.exc import IntegrityError, NoResultFound
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from config import FAST_SERIALIZATION
 from users_app.cache.abstract_cache import AbstractCache
-from users_app.cache.module import get_cache
+from users_app.cache.loader import CacheLoader, SingleFlight
+from users_app.cache.module import get_cache, get_cache_loader
+from users_app.cache.settings import CITIES_EXPIRE_TIME, USER_TTL, USERS_TTL
 from users_app.database.crud.cities import CityCRUD
-from users_app.database.crud.users import UserCRUD
+from users_app.database.crud.users import IMPORT_COLUMNS, SORT_KEYS, UserCRUD
 from users_app.database.models import User
-from users_app.database.settings import get_session
+from users_app.database.routing import ReplicaSet, fresh_reads, primary_reads
+from users_app.database.settings import get_replicas, get_session, get_session_factory
 from users_app.exceptions.constants import (
+    MSG_BULK_CONFLICT,
+    MSG_BULK_DUPLICATE_EMAIL,
+    MSG_BULK_DUPLICATE_ID,
+    MSG_BULK_INVALID_VALUES,
     MSG_CITY_NOT_FOUND,
     MSG_EMAIL_EXISTS,
+    MSG_IMPORT_DUPLICATE_EMAIL,
+    MSG_IMPORT_INVALID_ROW,
+    MSG_INVALID_CURSOR,
+    MSG_SEARCH_SORT,
+    MSG_SERVICE_BUSY,
+    MSG_UNSUPPORTED_IMPORT_FORMAT,
     MSG_USER_NOT_FOUND,
 )
-from users_app.security.hasher import get_pwd_context
+from users_app.security.hasher import HasherBusyError, PasswordHasher, get_hasher
+from users_app.services.exports import EXPORT_COLUMNS, serialize_rows
+from users_app.services.imports import (
+    check_lengths,
+    get_import_format,
+    parse_records,
+    validate_record,
+)
+from users_app.services.pagination import decode_cursor, encode_cursor
 from users_app.validation.schemas import (
+    BulkImportErrorModel,
+    BulkImportResponseModel,
+    BulkUserResultModel,
+    BulkUsersResponseModel,
     CitiesHintModel,
     PaginatedMetaDataModel,
     PrivateCreateUserModel,
     PrivateDetailUserResponseModel,
     PrivateUpdateUserModel,
+    PrivateUsersBatchResponseModel,
     PrivateUsersListHintMetaModel,
     PrivateUsersListMetaDataModel,
     PrivateUsersListResponseModel,
@@ -32,6 +64,21 @@ from users_app.validation.schemas import (
     UsersListResponseModel,
 )
 
+USERS_NAMESPACE = 'users'
+USERS_COUNT_KEY = 'count-users'
+# Time of the latest write of users in milliseconds, kept while replicas may not have replayed it.
+WRITTEN_AT_KEY = 'written-users'
+IMPORT_BATCH_SIZE = 1000
+EXPORT_BATCH_SIZE = 1000
+# Users list parameters which select users, in order of their canonical form in cache keys.
+FILTER_PARAMS = ('city', 'is_admin', 'birthday_from', 'birthday_to')
+# Types of keyset values in cursors of users lists.
+CURSOR_TYPES = {
+    'id': int,
+    'last_name': str,
+    'birthday': (str, type(None)),
+}
+
 
 class UserService:
     def __init__(
@@ -39,77 +86,108 @@ class UserService:
         cache: AbstractCache,
         user_crud: UserCRUD,
         city_crud: CityCRUD,
-        pwd_context: CryptContext,
+        hasher: PasswordHasher,
+        fast_serialization: bool = False,
+        loader: CacheLoader | None = None,
+        session_factory: Callable[[], AsyncSession] | None = None,
+        replicas: ReplicaSet | None = None,
     ) -> None:
-        '''Init `UserService` instance.'''
+        '''Init `UserService` instance.
+
+        With `fast_serialization` list responses are built from trusted data without validation.
+        `loader` reads users and pages through cache, its misses are loaded once for concurrent requests.
+        Stale cached values are refreshed in background with sessions of `session_factory`, without it
+        they are served until they expire. With `replicas` cache is filled only from those of them
+        which have replayed the latest write of users.
+        '''
         self.cache = cache
+        self.loader = loader or CacheLoader(cache, SingleFlight())
+        self.session_factory = session_factory
+        self.replicas = replicas
         self.user_crud = user_crud
-        self.pwd_context = pwd_context
+        self.hasher = hasher
         self.city_crud = city_crud
+        self.fast_serialization = fast_serialization
 
     async def get_list(self, query: QueryParams) -> UsersListResponseModel:
         '''Gets list of users and returns response serialized for `user` paths.'''
-        users_count, users_list = await self._get_list(query)
-        return UsersListResponseModel(
+        users_count, users_list, next_cursor = await self._get_list(query)
+        return self._build(
+            UsersListResponseModel,
             data=users_list,
             meta=UsersListMetaDataModel(
-                pagination=PaginatedMetaDataModel(
-                    total=users_count,
-                    page=query.page,
-                    size=query.size
-                )
+                pagination=self._get_pagination(query, users_count, next_cursor),
             )
         )
 
     async def get_list_private(self, query: QueryParams) -> PrivateUsersListResponseModel:
         '''Gets list of users and returns response serialized for `private` paths.'''
-        users_count, users_list = await self._get_list(query)
-        if users_list == []:
-            cities_list = []
-        else:
-            cities_list = [
-                await self._get_city(
-                    city_id=getattr(user, 'city', None)) for user in users_list  # type: ignore
-            ]
+        users_count, users_list, next_cursor = await self._get_list(query)
+        cities_list = await self._get_cities(users_list)
 
-        return PrivateUsersListResponseModel(
+        return self._build(
+            PrivateUsersListResponseModel,
             data=users_list,
             meta=PrivateUsersListMetaDataModel(
-                pagination=PaginatedMetaDataModel(
-                    total=users_count,
-                    page=query.page,
-                    size=query.size
-                ),
+                pagination=self._get_pagination(query, users_count, next_cursor),
                 hint=PrivateUsersListHintMetaModel(city=cities_list),
             )
         )
 
     async def get_detail(self, user_id: int) -> User:
         '''Returns a specific `User`.'''
-        cache_key = f'user-{user_id}'
-        user = await self.cache.get(cache_key)
-        if not user:
-            try:
-                user = await self.user_crud.read(user_id=user_id)
-                await self.cache.set(cache_key, user)
-            except NoResultFound:
-                raise HTTPException(
-                    status_code=HTTPStatus.NOT_FOUND,
-                    detail=MSG_USER_NOT_FOUND
+        try:
+            return await self.loader.get_or_load(
+                f'user-{user_id}',
+                self._from_replicas(lambda: self.user_crud.read(user_id=user_id)),
+                USER_TTL,
+                refresh=self._in_own_session(lambda session: UserCRUD(session).read(user_id=user_id)),
+            )
+        except NoResultFound:
+            raise HTTPException(
+                status_code=HTTPStatus.NOT_FOUND,
+                detail=MSG_USER_NOT_FOUND
+            )
+
+    async def get_many(self, user_ids: list[int]) -> PrivateUsersBatchResponseModel:
+        '''Returns users in requested order with one cache and at most one database round trip.'''
+        user_ids = list(dict.fromkeys(user_ids))
+        cache_keys = [f'user-{user_id}' for user_id in user_ids]
+        users = dict(zip(user_ids, await self.cache.get_many(cache_keys)))
+        missing_ids = [user_id for user_id, user in users.items() if not user]
+        if missing_ids:
+            found_users = await self._from_replicas(lambda: self.user_crud.read_many(user_ids=missing_ids))()
+            for user in found_users:
+                users[user.id] = user
+            if found_users:
+                await self.cache.set_many(
+                    {f'user-{user.id}': user for user in found_users}, expire_time=USER_TTL.hard,
                 )
-        return user
+        return self._build(
+            PrivateUsersBatchResponseModel,
+            data=[user for user in users.values() if user],
+            not_found=[user_id for user_id, user in users.items() if not user],
+        )
 
     async def create(self, data: PrivateCreateUserModel) -> PrivateDetailUserResponseModel:
         '''Creates new `User`.'''
         try:
-            user = await self.user_crud.create(data=data)
-            await self.cache.clear('all')
+            hashed_password = await self.hasher.hash(data.password)
+        except HasherBusyError:
+            raise HTTPException(
+                status_code=HTTPStatus.SERVICE_UNAVAILABLE,
+                detail=MSG_SERVICE_BUSY,
+            )
+        try:
+            user = await self.user_crud.create(data=data, hashed_password=hashed_password)
+            await self.cache.incr_counter(USERS_COUNT_KEY)
+            await self._invalidate()
             return user
         except IntegrityError as e:
             if 'UniqueViolationError' in str(e.orig):
                 raise HTTPException(
                     status_code=HTTPStatus.BAD_REQUEST,
-                    detail=MSG_EMAIL_EXISTS.format(data.email)
+                    detail=MSG_EMAIL_EXISTS.format(email=data.email)
                 )
             elif 'ForeignKeyViolationError' in str(e.orig):
                 raise HTTPException(
@@ -119,14 +197,64 @@ class UserService:
             else:
                 raise
 
+    async def bulk_create(self, chunks: AsyncIterator[bytes], content_type: str) -> BulkImportResponseModel:
+        '''Creates users from streamed NDJSON or CSV body in one transaction.
+
+        Rows are validated and hashed in batches, loaded to staging table with `COPY`
+        and merged at once, invalid rows are reported by line number.
+        '''
+        import_format = get_import_format(content_type)
+        if import_format is None:
+            raise HTTPException(
+                status_code=HTTPStatus.UNSUPPORTED_MEDIA_TYPE,
+                detail=MSG_UNSUPPORTED_IMPORT_FORMAT,
+            )
+        errors = {}
+        batch: list[tuple[int, PrivateCreateUserModel]] = []
+        await self.user_crud.create_import()
+        async for line, record, error in parse_records(chunks, import_format):
+            data = None
+            if record is not None:
+                data, error = validate_record(record)
+            if data is None:
+                errors[line] = MSG_IMPORT_INVALID_ROW.format(error=error)
+                continue
+            batch.append((line, data))
+            if len(batch) >= IMPORT_BATCH_SIZE:
+                await self._stage_import(batch)
+                batch = []
+        await self._stage_import(batch)
+
+        created, rejected = await self.user_crud.merge_import()
+        messages = {
+            'duplicate_in_file': MSG_IMPORT_DUPLICATE_EMAIL,
+            'email_exists': MSG_EMAIL_EXISTS,
+            'city_not_found': MSG_CITY_NOT_FOUND,
+        }
+        for reason, rows in rejected.items():
+            for line, email in rows:
+                errors.setdefault(line, messages[reason].format(email=email))
+        if created:
+            await self.cache.incr_counter(USERS_COUNT_KEY, created)
+            await self._invalidate()
+        return BulkImportResponseModel(
+            created=created,
+            errors=[BulkImportErrorModel(line=line, message=errors[line]) for line in sorted(errors)],
+        )
+
+    def export(self, export_format: str) -> AsyncIterator[str]:
+        '''Returns all users serialized to NDJSON or CSV chunks, fetched by batches of server-side cursor.'''
+        batches = self.user_crud.stream_all(EXPORT_COLUMNS, EXPORT_BATCH_SIZE)
+        return serialize_rows(batches, export_format)
+
     async def update(self, user_id: int,
                      data: UpdateUserModel | PrivateUpdateUserModel) -> User:
         '''Updates specific `User`.'''
         try:
-            user = await self.user_crud.read(user_id=user_id)
+            with primary_reads():
+                user = await self.user_crud.read(user_id=user_id)
             updated_user = await self.user_crud.update(user=user, data=data)
-            await self.cache.clear(f'user-{user_id}')
-            await self.cache.clear('all')
+            await self._invalidate(user_id)
             return updated_user
         except NoResultFound:
             raise HTTPException(
@@ -137,7 +265,7 @@ class UserService:
             if 'UniqueViolationError' in str(e.orig):
                 raise HTTPException(
                     status_code=HTTPStatus.BAD_REQUEST,
-                    detail=MSG_EMAIL_EXISTS.format(data.email)
+                    detail=MSG_EMAIL_EXISTS.format(email=data.email)
                 )
             if 'ForeignKeyViolationError' in str(e.orig):
                 raise HTTPException(
@@ -150,44 +278,340 @@ class UserService:
     async def delete(self, user_id: int) -> None:
         '''Delete `User`.'''
         try:
-            await self.user_crud.delete(user_id=user_id)
-            await self.cache.clear(f'user-{user_id}')
-            await self.cache.clear('all')
+            with primary_reads():
+                await self.user_crud.delete(user_id=user_id)
+            await self.cache.incr_counter(USERS_COUNT_KEY, -1)
+            await self._invalidate(user_id)
         except NoResultFound:
             raise HTTPException(
                 status_code=HTTPStatus.NOT_FOUND,
                 detail=MSG_USER_NOT_FOUND,
             )
 
-    async def _get_list(self, query: QueryParams) -> tuple[int, list[User | None]]:
-        '''Gets list of users and returns it with quantity of all users.'''
-        users_count = await self._count_users()
-        max_pages = (users_count + query.size - 1) // query.size
-        if query.page > max_pages:
+    async def bulk_update(self, items: list[PrivateUpdateUserModel]) -> BulkUsersResponseModel:
+        '''Updates many users in one transaction, reports outcome for each of them.
+
+        Users whose changes are invalid are skipped, the rest are updated by groups
+        of the same fields with a single statement each.
+        '''
+        user_ids = [item.id for item in items]
+        if len(set(user_ids)) != len(user_ids):
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail=MSG_BULK_DUPLICATE_ID,
+            )
+        changes = {item.id: item.dict(exclude_unset=True) for item in items}
+        errors = await self._check_changes(changes)
+        groups = defaultdict(list)
+        for user_id, values in changes.items():
+            if user_id not in errors:
+                groups[tuple(values)].append(values)
+        updated = set()
+        if groups:
+            try:
+                updated = set(await self.user_crud.bulk_update(list(groups.values())))
+            except IntegrityError:
+                # Emails or cities were changed by concurrent requests after the checks.
+                raise HTTPException(
+                    status_code=HTTPStatus.BAD_REQUEST,
+                    detail=MSG_BULK_CONFLICT,
+                )
+        if updated:
+            await self._invalidate(*updated)
+        return self._get_bulk_results(user_ids, updated, errors)
+
+    async def bulk_delete(self, user_ids: list[int]) -> BulkUsersResponseModel:
+        '''Deletes many users with a single statement, reports outcome for each of them.'''
+        user_ids = list(dict.fromkeys(user_ids))
+        deleted = set(await self.user_crud.bulk_delete(user_ids)) if user_ids else set()
+        if deleted:
+            await self.cache.incr_counter(USERS_COUNT_KEY, -len(deleted))
+            await self._invalidate(*deleted)
+        return self._get_bulk_results(user_ids, deleted, {})
+
+    async def _check_changes(self, changes: dict[int, dict]) -> dict[int, tuple[HTTPStatus, str]]:
+        '''Returns errors of users' changes which would violate constraints, by user id.'''
+        errors = {}
+        for user_id, values in changes.items():
+            error = check_lengths(values)
+            required = [
+                field for field, value in values.items()
+                if value is None and not User.__table__.c[field].nullable
+            ]
+            if required:
+                error = f'{", ".join(required)}: none is not an allowed value'
+            if error is not None:
+                errors[user_id] = (HTTPStatus.BAD_REQUEST, MSG_BULK_INVALID_VALUES.format(error=error))
+
+        emails = defaultdict(list)
+        for user_id, values in changes.items():
+            if values.get('email') is not None and user_id not in errors:
+                emails[values['email']].append(user_id)
+        owners = await self.user_crud.read_ids_by_email(list(emails)) if emails else {}
+        for email, email_user_ids in emails.items():
+            for user_id in email_user_ids[1:]:
+                errors[user_id] = (HTTPStatus.BAD_REQUEST, MSG_BULK_DUPLICATE_EMAIL.format(email=email))
+            owner_id = owners.get(email)
+            if owner_id is not None and owner_id != email_user_ids[0]:
+                errors[email_user_ids[0]] = (HTTPStatus.BAD_REQUEST, MSG_EMAIL_EXISTS.format(email=email))
+
+        city_ids = {values.get('city') for values in changes.values()}
+        city_ids.discard(None)
+        known_city_ids = {city.id for city in await self.city_crud.read_many(city_ids=sorted(city_ids))}
+        for user_id, values in changes.items():
+            if values.get('city') is not None and values['city'] not in known_city_ids:
+                errors.setdefault(user_id, (HTTPStatus.NOT_FOUND, MSG_CITY_NOT_FOUND))
+        return errors
+
+    def _get_bulk_results(self, user_ids: list[int], succeeded: set[int],
+                          errors: dict[int, tuple[HTTPStatus, str]]) -> BulkUsersResponseModel:
+        '''Returns outcome of bulk operation for each user in requested order.'''
+        results = []
+        for user_id in user_ids:
+            if user_id in errors:
+                status, message = errors[user_id]
+            elif user_id in succeeded:
+                status, message = HTTPStatus.OK, None
+            else:
+                status, message = HTTPStatus.NOT_FOUND, MSG_USER_NOT_FOUND
+            results.append(BulkUserResultModel(id=user_id, status=status, message=message))
+        return BulkUsersResponseModel(results=results)
+
+    async def _stage_import(self, batch: list[tuple[int, PrivateCreateUserModel]]) -> None:
+        '''Hashes passwords of batch in parallel and loads it to staging table.'''
+        if not batch:
+            return
+        hashes = await self.hasher.hash_many([data.password for _, data in batch])
+        records = []
+        for (line, data), hashed_password in zip(batch, hashes):
+            values = data.dict(exclude={'password'})
+            values['_hashed_password'] = hashed_password
+            records.append((line, *(values[name] for name in IMPORT_COLUMNS)))
+        await self.user_crud.copy_to_import(records)
+
+    def _build(self, model: type[BaseModel], **values) -> BaseModel:
+        '''Returns response model, not validated in fast serialization mode.'''
+        if self.fast_serialization:
+            return model.construct(**values)
+        return model(**values)
+
+    async def _get_list(self, query: QueryParams) -> tuple[int | None, list[User | None], str | None]:
+        '''Gets list of users and returns it with quantity of all users if it is requested and next cursor.
+
+        Equivalent queries share cache entries, their keys hold canonical form of filters and sort.
+        '''
+        if query.q:
+            return await self._search(query)
+        sort = query.sort or 'id'
+        keys = SORT_KEYS[sort.lstrip('-')]
+        after = self._get_keyset(query.after, keys) if query.after else None
+        filters = _get_filters_key(query)
+        version = await self.cache.get_version(USERS_NAMESPACE)
+        cache_key = f'{USERS_NAMESPACE}-v{version}-where={filters}'
+        users_count = None
+        if query.with_total and filters:
+            users_count = await self.loader.get_or_load(
+                f'{cache_key}-total',
+                self._from_replicas(lambda: self.user_crud.count_filtered(query)),
+                USERS_TTL,
+                refresh=self._in_own_session(lambda session: UserCRUD(session).count_filtered(query)),
+            )
+        elif query.with_total:
+            users_count = await self._count_users()
+        max_pages = None
+        if users_count is not None and after is None:
+            max_pages = (users_count + query.size - 1) // query.size
+        if max_pages is not None and query.page > max_pages:
             users_list = []
         else:
-            cache_key = f'users-{query}'
-            users_list = await self.cache.get(cache_key)
-            if not users_list:
-                users_list = await self.user_crud.read_all(query)
-                await self.cache.set(cache_key, users_list)
-        return (users_count, users_list)
+            users_list = await self.loader.get_or_load(
+                f'{cache_key}-sort={sort}-{_get_page_key(query, after)}',
+                self._from_replicas(lambda: self.user_crud.read_all(query, after=after)),
+                USERS_TTL,
+                refresh=self._in_own_session(lambda session: UserCRUD(session).read_all(query, after=after)),
+            )
+        next_cursor = None
+        if users_list and len(users_list) == query.size:
+            next_cursor = encode_cursor({name: _get_cursor_field(users_list[-1], name) for name in keys})
+        return (users_count, users_list, next_cursor)
+
+    async def _search(self, query: QueryParams) -> tuple[int | None, list[User | None], str | None]:
+        '''Searches users ranked by relevance, returns them with quantity of found ones and next cursor.'''
+        if query.sort:
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail=MSG_SEARCH_SORT,
+            )
+        search = query.q.lower()
+        after = None
+        if query.after:
+            cursor = self._get_cursor_values(query.after, rank=(int, float), id=int)
+            after = (float(cursor['rank']), cursor['id'])
+        version = await self.cache.get_version(USERS_NAMESPACE)
+        cache_key = f'{USERS_NAMESPACE}-v{version}-q={search}-where={_get_filters_key(query)}'
+        users_count = None
+        if query.with_total:
+            users_count = await self.loader.get_or_load(
+                f'{cache_key}-total',
+                self._from_replicas(lambda: self.user_crud.count_search(search, query)),
+                USERS_TTL,
+                refresh=self._in_own_session(lambda session: UserCRUD(session).count_search(search, query)),
+            )
+        found = await self.loader.get_or_load(
+            f'{cache_key}-{_get_page_key(query, after)}',
+            self._from_replicas(lambda: self.user_crud.search(search, query, after=after)),
+            USERS_TTL,
+            refresh=self._in_own_session(lambda session: UserCRUD(session).search(search, query, after=after)),
+        )
+        next_cursor = None
+        if found and len(found) == query.size:
+            last_user, last_rank = found[-1]
+            next_cursor = encode_cursor({'rank': last_rank, 'id': _get_field(last_user, 'id')})
+        return (users_count, [user for user, _ in found], next_cursor)
+
+    def _get_pagination(self, query: QueryParams, users_count: int | None,
+                        next_cursor: str | None) -> PaginatedMetaDataModel:
+        '''Returns pagination metadata with a cursor of the next page if there may be one.'''
+        return PaginatedMetaDataModel(
+            total=users_count,
+            page=query.page,
+            size=query.size,
+            next_cursor=next_cursor,
+        )
+
+    def _get_cursor_values(self, cursor: str, **types) -> dict:
+        '''Decodes keyset values of given types from pagination cursor.'''
+        try:
+            values = decode_cursor(cursor)
+        except ValueError:
+            values = {}
+        if values.keys() != types.keys() or any(
+            not isinstance(values[name], type_) or isinstance(values[name], bool) for name, type_ in types.items()
+        ):
+            raise HTTPException(
+                status_code=HTTPStatus.BAD_REQUEST,
+                detail=MSG_INVALID_CURSOR,
+            )
+        return values
+
+    def _get_keyset(self, cursor: str, keys: tuple[str, ...]) -> tuple:
+        '''Decodes values of sort key columns of users list from pagination cursor.'''
+        values = self._get_cursor_values(cursor, **{name: CURSOR_TYPES[name] for name in keys})
+        if values.get('birthday') is not None:
+            try:
+                values['birthday'] = date.fromisoformat(values['birthday'])
+            except ValueError:
+                raise HTTPException(
+                    status_code=HTTPStatus.BAD_REQUEST,
+                    detail=MSG_INVALID_CURSOR,
+                )
+        return tuple(values[name] for name in keys)
+
+    async def _get_cities(self, users_list: list) -> list[CitiesHintModel]:
+        '''Gets distinct cities of given users, cached per city, with a single query for missing ones.'''
+        city_ids = {_get_field(user, 'city') for user in users_list}
+        city_ids.discard(None)
+        if not city_ids:
+            return []
+        city_ids = sorted(city_ids)
+        cities = dict(zip(city_ids, await self.cache.get_many([f'city-{city_id}' for city_id in city_ids])))
+        missing_ids = [city_id for city_id, city in cities.items() if not city]
+        if missing_ids:
+            found_cities = await self.city_crud.read_many(city_ids=missing_ids)
+            for city in found_cities:
+                cities[city.id] = city
+            if found_cities:
+                await self.cache.set_many(
+                    {f'city-{city.id}': city for city in found_cities}, expire_time=CITIES_EXPIRE_TIME,
+                )
+        return [city for city in cities.values() if city]
+
+    async def _invalidate(self, *user_ids: int) -> None:
+        '''Drops cached users and lists after users were written.
+
+        With replicas time of the write is kept until every healthy replica has replayed it.
+        '''
+        if self.replicas is not None:
+            await self.cache.set_counter(
+                WRITTEN_AT_KEY, int(time.time() * 1000), expire_time=math.ceil(self.replicas.write_window),
+            )
+        if user_ids:
+            await self.cache.clear(*(f'user-{user_id}' for user_id in user_ids))
+        await self.cache.invalidate(USERS_NAMESPACE)
+
+    async def _written_at(self) -> float | None:
+        '''Returns time of the latest write of users which replicas may not have replayed.'''
+        if self.replicas is None:
+            return None
+        written_at = await self.cache.get_counter(WRITTEN_AT_KEY)
+        return written_at / 1000 if written_at is not None else None
+
+    def _from_replicas(self, read: Callable[[], Awaitable]) -> Callable[[], Awaitable]:
+        '''Returns loader which reads from replicas up to date with the latest write of users, see `fresh_reads`.'''
+        async def load():
+            with fresh_reads(await self._written_at()):
+                return await read()
+        return load
+
+    def _in_own_session(self, read: Callable[[AsyncSession], Awaitable]) -> Callable[[], Awaitable] | None:
+        '''Returns loader which reads with a session of its own, so it can outlive the request.'''
+        if self.session_factory is None:
+            return None
+
+        async def load():
+            async with self.session_factory() as session:
+                with fresh_reads(await self._written_at()):
+                    return await read(session)
+        return load
+
+    async def _count_users(self) -> int:
+        '''Returns maintained quantity of all users, reconciles it with the table when it expires.'''
+        users_count = await self.cache.get_counter(USERS_COUNT_KEY)
+        if users_count is None:
+            users_count = await self._from_replicas(self.user_crud.count_all)()
+            # Counter set and adjusted by others since it expired is newer than the count.
+            await self.cache.set_counter(USERS_COUNT_KEY, users_count, nx=True)
+        return users_count
+
+
+def _get_field(user: User | dict, field: str):
+    '''Gets field value of `User` instance or its cached representation.'''
+    if isinstance(user, dict):
+        return user.get(field)
+    return getattr(user, field, None)
+
+
+def _get_cursor_field(user: User | dict, field: str):
+    '''Gets field value of user in form of pagination cursor.'''
+    value = _get_field(user, field)
+    return value.isoformat() if isinstance(value, date) else value
+
+
+def _get_filters_key(query: QueryParams) -> str:
+    '''Returns canonical form of filters set in query, equal for equivalent queries.'''
+    return '&'.join(
+        f'{name}={getattr(query, name)}' for name in FILTER_PARAMS if getattr(query, name) is not None
+    )
 
-    async def _get_city(self, city_id: int) -> CitiesHintModel | None:
-        '''Gets a specific `City`.'''
-        return await self.city_crud.read(city_id=city_id)
 
-    async def _count_users(self):
-        '''Counts all users.'''
-        return await self.user_crud.count_all()
+def _get_page_key(query: QueryParams, after: tuple | None) -> str:
+    '''Returns canonical form of page of query, page number is ignored when keyset values are given.'''
+    if after is not None:
+        return f'size={query.size}-after={",".join(map(str, after))}'
+    return f'size={query.size}-page={query.page}'
 
 
 def get_user_service(
     session: AsyncSession = Depends(get_session),
     cache: AbstractCache = Depends(get_cache),
-    pwd_context: CryptContext = Depends(get_pwd_context),
+    hasher: PasswordHasher = Depends(get_hasher),
+    loader: CacheLoader = Depends(get_cache_loader),
+    session_factory: Callable[[], AsyncSession] = Depends(get_session_factory),
+    replicas: ReplicaSet | None = Depends(get_replicas),
 ) -> UserService:
     '''Returns `UserService` instance for dependency injection.'''
     user_crud = UserCRUD(session)
     city_crud = CityCRUD(session)
-    return UserService(cache, user_crud, city_crud, pwd_context)
+    return UserService(
+        cache, user_crud, city_crud, hasher, FAST_SERIALIZATION, loader, session_factory, replicas,
+    )
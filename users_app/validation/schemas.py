@@ -1,7 +1,10 @@
 from datetime import date
+from typing import Literal
 
 from fastapi import Query
-from pydantic import BaseModel, root_validator
+from pydantic import BaseModel, conint, constr, root_validator, validator
+
+from config import MAX_PAGE_SIZE
 
 
 # Auth
@@ -35,9 +38,10 @@ class CurrentUserResponseModel(BaseModel):
 
 # User list
 class PaginatedMetaDataModel(BaseModel):
-    total: int
+    total: int | None
     page: int
     size: int
+    next_cursor: str | None = None
 
 
 class UsersListElementModel(BaseModel):
@@ -126,9 +130,12 @@ class CitiesHintModel(BaseModel):
     id: int
     name: str
 
+    class Config:
+        orm_mode = True
+
 
 class PrivateUsersListHintMetaModel(BaseModel):
-    city: list[CitiesHintModel | None]
+    city: list[CitiesHintModel]
 
 
 class PrivateUsersListMetaDataModel(UsersListMetaDataModel):
@@ -139,6 +146,12 @@ class PrivateUsersListResponseModel(UsersListResponseModel):
     meta: PrivateUsersListMetaDataModel
 
 
+# Private batch detail
+class PrivateUsersBatchResponseModel(BaseModel):
+    data: list[PrivateDetailUserResponseModel]
+    not_found: list[int]
+
+
 # Private create
 class PrivateCreateUserModel(BaseModel):
     first_name: str
@@ -156,6 +169,17 @@ class PrivateCreateUserModel(BaseModel):
         orm_mode = True
 
 
+# Private bulk create
+class BulkImportErrorModel(BaseModel):
+    line: int
+    message: str
+
+
+class BulkImportResponseModel(BaseModel):
+    created: int
+    errors: list[BulkImportErrorModel]
+
+
 # Private update
 class PrivateUpdateUserModel(BaseModel):
     id: int
@@ -170,6 +194,21 @@ class PrivateUpdateUserModel(BaseModel):
     is_admin: bool | None
 
 
+# Private bulk update and delete
+class PrivateBulkDeleteUsersModel(BaseModel):
+    ids: list[int]
+
+
+class BulkUserResultModel(BaseModel):
+    id: int
+    status: int
+    message: str | None = None
+
+
+class BulkUsersResponseModel(BaseModel):
+    results: list[BulkUserResultModel]
+
+
 # Errors
 class CodelessErrorResponseModel(BaseModel):
     message: str
@@ -181,12 +220,40 @@ class ErrorResponseModel(BaseModel):
 
 
 # Query
+# Forms and clients send parameters without value, such as `q=`, instead of omitting them.
+# FastAPI validates query parameters by their annotations before the model is built, so optional
+# ones accept blank value as well, the model takes it for not set.
+Blank = constr(strip_whitespace=True, max_length=0)
+
+
 class QueryParams(BaseModel):
-    page: int = Query(ge=1)
-    size: int = Query(ge=1)
+    page: int = Query(default=1, ge=1)
+    size: int = Query(ge=1, le=int(MAX_PAGE_SIZE))
+    after: str | None = Query(default=None)
+    with_total: bool = Query(default=True)
+    # Search text is stripped before its length is checked.
+    q: constr(strip_whitespace=True, min_length=2, max_length=64) | Blank | None = Query(default=None)
+    city: conint(ge=1) | Blank | None = Query(default=None)
+    is_admin: bool | Blank | None = Query(default=None)
+    birthday_from: date | Blank | None = Query(default=None)
+    birthday_to: date | Blank | None = Query(default=None)
+    sort: Literal['id', '-id', 'last_name', '-last_name', 'birthday', '-birthday'] | Blank | None = Query(default=None)
+
+    @validator('*', pre=True)
+    def blank_as_none(cls, value):
+        if isinstance(value, str) and not value.strip():
+            return None
+        return value
+
+
+class ExportQueryParams(BaseModel):
+    format: Literal['ndjson', 'csv'] = Query(default='ndjson')
 
 
 # Security
 class Payload(BaseModel):
     user_id: int
     is_admin: bool
+
+    class Config:
+        allow_mutation = False
@@ -0,0 +1,94 @@
+import json
+from http import HTTPStatus
+from typing import Any, Callable
+
+from fastapi.responses import JSONResponse
+from pydantic import BaseModel
+
+from users_app.cache.codecs import orjson, to_builtins
+from users_app.validation.schemas import (
+    CitiesHintModel,
+    CurrentUserResponseModel,
+    PrivateDetailUserResponseModel,
+    PrivateUsersBatchResponseModel,
+    UpdateUserResponseModel,
+    UsersListElementModel,
+    UsersListResponseModel,
+)
+
+# Values which `root_validator`s of response models set instead of empty ones.
+EMPTY_DEFAULTS = {
+    'other_name': '',
+    'phone': '',
+    'city': 0,
+    'additional_info': '',
+}
+
+
+class FastJSONResponse(JSONResponse):
+    '''JSON response rendered with `orjson` if it is installed.'''
+
+    def render(self, content: Any) -> bytes:
+        '''Returns content serialized to JSON.'''
+        if orjson is not None:
+            return orjson.dumps(content, default=to_builtins, option=orjson.OPT_NON_STR_KEYS)
+        return json.dumps(content, default=to_builtins, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+def make_serializer(model: type[BaseModel]) -> Callable[[Any], dict]:
+    '''Returns function which converts `User`-like ORM instance or cached dict to model's dict.
+
+    The function applies `EMPTY_DEFAULTS` as model's validators do and validates nothing,
+    so it must only be given trusted data.
+    '''
+    names = tuple(model.__fields__)
+    defaults = {name: EMPTY_DEFAULTS[name] for name in names if name in EMPTY_DEFAULTS}
+
+    def serialize(obj) -> dict:
+        if isinstance(obj, dict):
+            values = {name: obj.get(name) for name in names}
+        else:
+            values = {name: getattr(obj, name) for name in names}
+        for name, default in defaults.items():
+            if not values[name]:
+                values[name] = default
+        return values
+
+    return serialize
+
+
+serialize_current_user = make_serializer(CurrentUserResponseModel)
+serialize_updated_user = make_serializer(UpdateUserResponseModel)
+serialize_private_user = make_serializer(PrivateDetailUserResponseModel)
+serialize_users_list_element = make_serializer(UsersListElementModel)
+serialize_city_hint = make_serializer(CitiesHintModel)
+
+
+def serialize_users_list(response: UsersListResponseModel) -> dict:
+    '''Converts users list response, which may be built with `construct()`, to dict.'''
+    meta = {'pagination': response.meta.pagination.dict()}
+    hint = getattr(response.meta, 'hint', None)
+    if hint is not None:
+        meta['hint'] = {'city': [serialize_city_hint(city) for city in hint.city]}
+    return {
+        'data': [serialize_users_list_element(user) for user in response.data],
+        'meta': meta,
+    }
+
+
+def serialize_users_batch(response: PrivateUsersBatchResponseModel) -> dict:
+    '''Converts users batch response, which may be built with `construct()`, to dict.'''
+    return {
+        'data': [serialize_private_user(user) for user in response.data],
+        'not_found': response.not_found,
+    }
+
+
+def render(content: Any, serializer: Callable[[Any], dict], status_code: int = HTTPStatus.OK, *, fast: bool):
+    '''Returns content serialized in advance if `fast` serialization is enabled, content itself otherwise.
+
+    Returned `Response` is sent as is, without validation against route's `response_model`.
+    '''
+    if not fast:
+        return content
+    return FastJSONResponse(content=serializer(content), status_code=status_code)